@@ -0,0 +1,161 @@
+# base/bootprof.py
+# 启动/导入耗时分析（可选）：根目录存在 /bootprof 标志文件时由 boot.py 启用
+# - 替换 __import__，按模块名记录导入耗时（含/不含子模块）与堆占用；
+#   已加载的模块和内建模块（time、machine 等，MicroPython 不放进 sys.modules）不计，
+#   卸载后重新导入的同名模块累加到同一行并计次
+# - phase() 用 ticks_us 给启动阶段打点
+# - finish() 输出按耗时排序的报告；标志文件内容为 "store" 时只写入 /bootprof.txt，下次启动可查看
+#
+# 用法：
+#     echo > /bootprof          # 启用，报告打印到串口
+#     echo store > /bootprof    # 启用，报告保存到 /bootprof.txt
+#     import bootprof; print(bootprof.last())   # 查看上次保存的报告
+
+import builtins
+import gc
+import sys
+import time
+
+FLAG_FILE = "/bootprof"
+REPORT_FILE = "/bootprof.txt"
+
+_orig_import = None
+_t0 = 0
+_last_mark = 0
+_phases = []    # (阶段名, 耗时us)
+_imports = []   # [模块名, 总耗时us, 子模块耗时us, 堆占用bytes, 深度, 次数]，按首次导入顺序
+_by_name = {}   # 模块名 -> _imports 中的记录
+_builtin = set()  # 导入后不在 sys.modules 里的模块（内建），以后直接跳过
+_stack = []     # 正在导入的记录，用于扣除子模块耗时
+mode = "print"
+finished = False
+
+
+def _resolve(name, globals, level):
+    """相对导入换算成绝对模块名"""
+    if not level:
+        return name
+    g = globals or {}
+    pkg = g.get("__package__") or g.get("__name__", "").rpartition(".")[0]
+    for _ in range(level - 1):
+        pkg = pkg.rpartition(".")[0]
+    return pkg + "." + name if name else pkg
+
+
+def _import(name, globals=None, locals=None, fromlist=(), level=0):
+    key = _resolve(name, globals, level)
+    if fromlist and key in sys.modules:
+        # `from pkg import mod`：包已加载时真正要加载的是子模块
+        for f in fromlist:
+            sub = key + "." + f
+            if sub not in sys.modules and sub not in _builtin:
+                key = sub
+                break
+    # 已加载的模块和内建模块直接走原始 __import__
+    if key in sys.modules or key in _builtin:
+        return _orig_import(name, globals, locals, fromlist, level)
+    rec = _by_name.get(key)
+    new = rec is None
+    if new:
+        rec = [key, 0, 0, 0, len(_stack), 0]
+    _stack.append(rec)
+    free0 = gc.mem_free()
+    t = time.ticks_us()
+    ok = False
+    try:
+        mod = _orig_import(name, globals, locals, fromlist, level)
+        ok = True
+        return mod
+    finally:
+        us = time.ticks_diff(time.ticks_us(), t)
+        _stack.pop()
+        if ok and key not in sys.modules:
+            _builtin.add(key)
+        else:
+            rec[1] += us
+            rec[3] += free0 - gc.mem_free()
+            rec[5] += 1
+            if new:
+                _imports.append(rec)
+                _by_name[key] = rec
+        if _stack:
+            _stack[-1][2] += us
+
+
+def start(t0=None, flag_mode="print"):
+    """安装导入钩子；t0 为 boot.py 最开始的 ticks_us()"""
+    global _orig_import, _t0, _last_mark, mode
+    if _orig_import is not None:
+        return
+    mode = flag_mode
+    _t0 = _last_mark = t0 if t0 is not None else time.ticks_us()
+    _orig_import = builtins.__import__
+    builtins.__import__ = _import
+
+
+def phase(name):
+    """标记一个启动阶段结束，耗时为距上一次打点的时间"""
+    global _last_mark
+    now = time.ticks_us()
+    _phases.append((name, time.ticks_diff(now, _last_mark)))
+    _last_mark = now
+
+
+def mark():
+    """记录当前各模块的累计值，配合 report(since=...) 只看之后的导入"""
+    return {r[0]: (r[1], r[2], r[3], r[5]) for r in _imports}
+
+
+def report(since=None):
+    lines = []
+    recs = _imports
+    if since is not None:
+        # 只保留之后有新导入的模块，数值为增量
+        recs = []
+        for r in _imports:
+            t, c, h, n = since.get(r[0], (0, 0, 0, 0))
+            if r[5] > n:
+                recs.append([r[0], r[1] - t, r[2] - c, r[3] - h, r[4], r[5] - n])
+    else:
+        total = time.ticks_diff(_last_mark, _t0)
+        lines.append("== 启动阶段 (共 %d us) ==" % total)
+        for name, us in _phases:
+            lines.append("%-24s %8d us" % (name, us))
+    lines.append("== 模块导入（按自身耗时排序）==")
+    lines.append("%-24s %8s %8s %8s %3s" % ("module", "self us", "total us", "heap B", "n"))
+    recs = sorted(recs, key=lambda r: r[1] - r[2], reverse=True)
+    for name, total, child, heap, depth, n in recs:
+        lines.append("%-24s %8d %8d %8d %3d" % (" " * depth + name, total - child, total, heap, n))
+    return "\n".join(lines)
+
+
+def finish():
+    """启动完成：打印或保存报告（导入钩子保留，用于统计后续示例导入）"""
+    global finished
+    finished = True
+    text = report()
+    if mode == "store":
+        try:
+            with open(REPORT_FILE, "w") as f:
+                f.write(text)
+        except OSError:
+            pass
+    else:
+        print(text)
+
+
+def stop():
+    """卸载导入钩子"""
+    global _orig_import
+    if _orig_import is not None:
+        builtins.__import__ = _orig_import
+        _orig_import = None
+
+
+def last():
+    """读取上次保存的报告"""
+    try:
+        with open(REPORT_FILE) as f:
+            return f.read()
+    except OSError:
+        return ""
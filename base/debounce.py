@@ -0,0 +1,149 @@
+# base/debounce.py
+# 单定时器向量化去抖：一个 base.scheduler 周期任务一次读出全部 GPIO 输入寄存器，
+# 用 2 位垂直计数器（每个引脚一位，按位并行运算）判定稳定电平，
+# 连续 4 次采样与当前状态不同才翻转，翻转后经 base.events 总线发出边沿事件。
+# 每次采样的开销与登记的引脚数无关（不支持直读寄存器的芯片退化为逐个读引脚）。
+#
+# 用法：
+#     from base import debounce, events
+#     src = debounce.add(25, name="K1")               # 返回 events 来源id
+#     events.subscribe(src, lambda level, ts_us: ...)  # 只收到干净的边沿
+#
+# 去抖时间 = 4 * PERIOD_MS。GPIO0-29 和 GPIO32-53 分两组（各自的位都在小整数范围内，运算不分配内存）。
+# 引脚最好按编号传入；传 Pin 对象时从它的 repr 里取编号（"Pin(25)"、"Pin(GPIO25)" 都可以）。
+# 注意：ESP32 的 GPIO34-39 只能输入、没有内部上下拉，按键要接外部上拉电阻。
+
+import os
+from machine import Pin
+
+from base import events, resources, scheduler
+
+PERIOD_MS = 5
+SAMPLES = 4  # 2 位垂直计数器
+
+try:
+    from machine import mem32
+except ImportError:
+    mem32 = None
+
+# (GPIO_IN_REG, GPIO_IN1_REG)
+_REGS = {"ESP32S2": (0x3F40403C, 0x3F404040), "ESP32S3": (0x6000403C, 0x60004040)}
+
+
+def _regs():
+    if mem32 is None:
+        return None
+    m = os.uname().machine
+    for chip, regs in _REGS.items():
+        if chip in m.replace("-", ""):
+            return regs
+    if "ESP32" in m and "C3" not in m and "C6" not in m:
+        return 0x3FF4403C, 0x3FF44040
+    return None
+
+
+_in_regs = _regs()
+_pins = {}        # gpio -> Pin（退化为逐个读引脚时使用）
+_bit_src = ({}, {})  # 每组：位掩码 -> 来源id
+_mask = [0, 0]
+_state = [0, 0]
+_cnt0 = [0, 0]
+_cnt1 = [0, 0]
+_job = None
+edges = 0
+
+
+def _pin_no(pin):
+    if isinstance(pin, int):
+        return pin
+    # 各端口 / 版本的 repr 不同："Pin(25)"、"Pin(GPIO25)"、"Pin(25, mode=IN, ...)"，取第一段数字
+    s = str(pin)
+    i = 0
+    while i < len(s) and not s[i].isdigit():
+        i += 1
+    j = i
+    while j < len(s) and s[j].isdigit():
+        j += 1
+    if i == j:
+        raise ValueError("无法识别引脚编号: %s，请直接传入 GPIO 编号" % s)
+    return int(s[i:j])
+
+
+def _sample():
+    if _in_regs:
+        return mem32[_in_regs[0]] & _mask[0], mem32[_in_regs[1]] & _mask[1]
+    lo = hi = 0
+    for n, p in _pins.items():
+        if p.value():
+            if n < 32:
+                lo |= 1 << n
+            else:
+                hi |= 1 << (n - 32)
+    return lo, hi
+
+
+def _tick():
+    global edges
+    raw = _sample()
+    for b in (0, 1):
+        state = _state[b]
+        delta = raw[b] ^ state
+        c1 = (_cnt1[b] ^ _cnt0[b]) & delta
+        c0 = ~_cnt0[b] & delta
+        _cnt1[b] = c1
+        _cnt0[b] = c0
+        # 计数器回到 0 且仍有差异 = 连续 SAMPLES 次不同
+        changes = delta & ~(c0 | c1)
+        if changes:
+            state ^= changes
+            _state[b] = state
+            srcs = _bit_src[b]
+            while changes:
+                bit = changes & -changes
+                changes ^= bit
+                edges += 1
+                events.post(srcs[bit], 1 if state & bit else 0)
+
+
+def add(pin, pull=Pin.PULL_UP, name=None):
+    """登记一个输入引脚（编号或 Pin），返回 events 来源id；首次登记时启动采样任务"""
+    global _job
+    n = _pin_no(pin)
+    if 29 < n < 32:
+        # 第一组只用 30 位，保持在小整数范围内
+        raise ValueError("GPIO%d 不支持" % n)
+    p = pin if not isinstance(pin, int) else Pin(n, Pin.IN, pull)
+    b, bit = (0, 1 << n) if n < 32 else (1, 1 << (n - 32))
+    if bit in _bit_src[b]:
+        return _bit_src[b][bit]
+    src = events.source(name or "GPIO%d" % n)
+    _bit_src[b][bit] = src
+    _pins[n] = p
+    _mask[b] |= bit
+    if p.value():
+        _state[b] |= bit
+    else:
+        _state[b] &= ~bit
+    if _job is None:
+        _job = scheduler.every(PERIOD_MS, _tick, name="debounce")
+        # events.reset 会在示例退出时清掉来源，这里跟着清空登记
+        resources.register(None, reset)
+    return src
+
+
+def value(pin):
+    """去抖后的电平"""
+    n = _pin_no(pin)
+    b, bit = (0, 1 << n) if n < 32 else (1, 1 << (n - 32))
+    return 1 if _state[b] & bit else 0
+
+
+def reset():
+    global _job
+    if _job is not None:
+        _job.cancel()
+        _job = None
+    _pins.clear()
+    for b in (0, 1):
+        _bit_src[b].clear()
+        _mask[b] = _state[b] = _cnt0[b] = _cnt1[b] = 0
@@ -0,0 +1,134 @@
+# base/events.py
+# IRQ -> 任务的事件总线：硬中断往预分配的环形缓冲写 (来源id, 时间戳us, 值)，
+# 由一次 micropython.schedule 在主线程里取出并分发给订阅者
+# - post() 不分配内存，可以在 hard=True 的中断里调用
+# - 同一时刻最多只挂一个 schedule；环满时丢弃新事件并计数 dropped
+#
+# 用法：
+#     from base import events
+#     src = events.pin_source(btn, Pin.IRQ_FALLING, name="K1")
+#     events.subscribe(src, lambda value, ts_us: ...)
+#
+# 订阅者在主线程执行，可以分配内存；ts_us 是中断发生时的 ticks_us。
+# 第一次登记来源时向 base.resources 登记 reset()，示例退出时解绑全部来源和订阅。
+
+import time
+import micropython
+from array import array
+
+from base import resources
+
+CAPACITY = 64  # 必须是 2 的幂
+
+_mask = CAPACITY - 1
+_src = array("H", bytes(2 * CAPACITY))
+_ts = array("i", bytes(4 * CAPACITY))
+_val = array("i", bytes(4 * CAPACITY))
+_head = 0          # 中断写入位置
+_tail = 0          # 分发读取位置
+_scheduled = False
+dropped = 0
+max_depth = 0
+
+_names = []        # 来源id -> 名称
+_subs = []         # 来源id -> 订阅回调列表
+_pins = []         # pin_source 绑定的引脚，reset 时解绑
+_registered = False
+
+
+def post(src, value):
+    """写入一个事件（可在硬中断中调用，不分配内存）"""
+    global _head, _scheduled, dropped
+    h = _head
+    nxt = (h + 1) & _mask
+    if nxt == _tail:
+        dropped += 1
+        return
+    _src[h] = src
+    _ts[h] = time.ticks_us()
+    _val[h] = value
+    _head = nxt
+    if not _scheduled:
+        _scheduled = True
+        try:
+            micropython.schedule(_drain_ref, 0)
+        except RuntimeError:
+            _scheduled = False  # 调度队列满，事件留在环里，下一次 post 再尝试
+
+
+def _drain(_):
+    global _tail, _scheduled, max_depth
+    _scheduled = False
+    depth = (_head - _tail) & _mask
+    if depth > max_depth:
+        max_depth = depth
+    while _tail != _head:
+        t = _tail
+        src, ts, value = _src[t], _ts[t], _val[t]
+        _tail = (t + 1) & _mask
+        if src < len(_subs):
+            for cb in _subs[src]:
+                try:
+                    cb(value, ts)
+                except Exception as e:
+                    print("events: %s 订阅者出错: %r" % (_names[src], e))
+
+
+_drain_ref = _drain  # 中断里引用模块级对象，避免查找/分配
+
+
+def source(name=None):
+    """登记一个事件来源，返回来源id"""
+    global _registered
+    if not _registered:
+        resources.register(None, reset)
+        _registered = True
+    _names.append(name or "src%d" % len(_names))
+    _subs.append([])
+    return len(_names) - 1
+
+
+def subscribe(src, cb):
+    """cb(value, ts_us) 在主线程中调用"""
+    _subs[src].append(cb)
+
+
+def pin_source(pin, trigger, name=None, read=None):
+    """把引脚中断接到总线上；read 为中断里取值的函数，缺省读该引脚电平
+
+    例如编码器 CLK 中断需要同时采 DT：read=dt.value
+    """
+    src = source(name)
+    rd = read or pin.value
+
+    def _irq(_p):
+        post(src, rd())
+
+    try:
+        pin.irq(trigger=trigger, handler=_irq, hard=True)
+    except TypeError:
+        pin.irq(trigger=trigger, handler=_irq)  # 不支持 hard 参数的端口
+    _pins.append(pin)
+    return src
+
+
+def name(src):
+    return _names[src]
+
+
+def stats():
+    return {"sources": len(_names), "pending": (_head - _tail) & _mask,
+            "max_depth": max_depth, "dropped": dropped}
+
+
+def reset():
+    """解绑全部引脚，清空来源、订阅和缓冲"""
+    global _head, _tail, _registered, dropped, max_depth
+    for pin in _pins:
+        pin.irq(handler=None)
+    del _pins[:]
+    del _names[:]
+    del _subs[:]
+    _head = _tail = 0
+    dropped = max_depth = 0
+    _registered = False
@@ -0,0 +1,179 @@
+# base/gait.py
+# 关键帧步态序列器：步态是数据而不是代码——每个关键帧 = 到达它的时长(ms) + 各通道角度，
+# 时长放在 array('H')，角度每通道 1 字节放在 bytearray（KEEP=255 表示该通道不动），
+# 由 base.motion 在关键帧之间插值播放。
+# - 每段动作的起点按绝对时间排（上一段的结束时刻），帧延迟不会在循环里累积
+# - 播放时可以循环、整体调速（speed=2 两倍速）、镜像（交换通道 / 反转角度）
+# - 可以存成 flash 文件：二进制 .gait，或便于手写的文本（每行 "ms 角度 角度 ... "，'-' 不动）
+#
+# 用法：
+#     from base import gait
+#     g = gait.frames(12, [(0,   90, 90, 90, ...),
+#                          (200, 90, 45, 60, ...)], name="lift")
+#     gait.save(g, "/gaits/lift.gait");  g = gait.load("/gaits/lift.gait")
+#     p = gait.Player(motion)
+#     p.play(g, loops=0, speed=1.5, mirror=(perm, flip))   # loops=0 无限循环
+#     p.wait(sleep=time.sleep_ms)  /  await p.done()  /  p.stop()
+
+import time
+import struct
+from array import array
+
+KEEP = 255
+MAGIC = b"GAIT"
+VERSION = 1
+_HEADER = "<4sBBH"   # magic, version, 通道数, 关键帧数
+
+
+class Gait:
+    def __init__(self, channels, times, angles, name=None):
+        self.channels = channels
+        self.times = times        # array('H')，第 k 个关键帧的过渡时长
+        self.angles = angles      # bytearray，len = 关键帧数 * channels
+        self.name = name
+
+    def __len__(self):
+        return len(self.times)
+
+    def duration_ms(self):
+        return sum(self.times)
+
+    def row(self, k):
+        c = self.channels
+        return self.angles[k * c:(k + 1) * c]
+
+    def mirrored(self, perm, flip=(), name=None):
+        """镜像：新通道 i 取原通道 perm[i] 的角度；flip 中的通道角度取 180-a"""
+        c = self.channels
+        out = bytearray(len(self.angles))
+        for k in range(len(self.times)):
+            base = k * c
+            for i in range(c):
+                a = self.angles[base + perm[i]]
+                if a != KEEP and i in flip:
+                    a = 180 - a
+                out[base + i] = a
+        return Gait(c, array("H", self.times), out, name or self.name)
+
+
+def frames(channels, rows, name=None):
+    """由 (ms, 角度...) 的行构造步态；角度为 None 表示不动"""
+    times = array("H")
+    angles = bytearray()
+    for r in rows:
+        if len(r) != channels + 1:
+            raise ValueError("关键帧应为 1 + %d 列" % channels)
+        times.append(r[0])
+        angles.extend(bytes([KEEP if a is None else a for a in r[1:]]))
+    return Gait(channels, times, angles, name)
+
+
+def save(g, path):
+    with open(path, "wb") as f:
+        f.write(struct.pack(_HEADER, MAGIC, VERSION, g.channels, len(g.times)))
+        f.write(struct.pack("<%dH" % len(g.times), *g.times))
+        f.write(g.angles)
+
+
+def _parse_text(data, name):
+    rows = []
+    for line in data.decode().split("\n"):
+        line = line.split("#", 1)[0].strip()
+        if line:
+            cols = line.split()
+            rows.append([int(cols[0])] + [None if a == "-" else int(a) for a in cols[1:]])
+    if not rows:
+        raise ValueError("空步态文件")
+    return frames(len(rows[0]) - 1, rows, name)
+
+
+def load(path, name=None):
+    """读取二进制 .gait 或文本步态文件"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if name is None:
+        name = path.rsplit("/", 1)[-1].split(".", 1)[0]
+    if data[:4] != MAGIC:
+        return _parse_text(data, name)
+    _, ver, channels, n = struct.unpack_from(_HEADER, data)
+    if ver != VERSION:
+        raise ValueError("不支持的步态版本 %d" % ver)
+    off = struct.calcsize(_HEADER)
+    times = array("H", struct.unpack_from("<%dH" % n, data, off))
+    off += 2 * n
+    return Gait(channels, times, bytearray(data[off:off + n * channels]), name)
+
+
+class Player:
+    """把步态交给 base.motion 播放；play() 立即返回，关键帧在运动引擎的帧任务里衔接"""
+
+    def __init__(self, motion):
+        self.motion = motion
+        self.gait = None
+        self.playing = False
+        self.loop = 0          # 已完成的循环数
+        self._loops = 1
+        self._durs = None
+        self._k = 0
+        self._t = 0
+        self._cb = self._next  # 绑定一次，on_done 用 is 判断是不是自己挂上的
+
+    def play(self, g, loops=1, speed=1, mirror=None):
+        """loops=0 无限循环；speed 为播放倍速；mirror=(perm, flip) 见 Gait.mirrored"""
+        if mirror:
+            g = g.mirrored(*mirror)
+        if g.channels != len(self.motion.pos):
+            raise ValueError("步态 %d 通道，运动引擎 %d 通道" % (g.channels, len(self.motion.pos)))
+        # 调速只在开始时算一次，播放过程中只用整数
+        durs = array("H", (int(t / speed) for t in g.times))
+        if not loops and not sum(durs):
+            raise ValueError("无限循环的步态总时长不能为 0")
+        self.gait = g
+        self._durs = durs
+        self._loops = loops
+        self.loop = 0
+        self._k = 0
+        self._t = time.ticks_ms()
+        self.playing = True
+        self.motion.on_done = self._cb
+        self._next()
+
+    def _next(self):
+        g = self.gait
+        if self._k == len(g.times):
+            self.loop += 1
+            if self._loops and self.loop >= self._loops:
+                self._finish()
+                return
+            self._k = 0
+        k = self._k
+        self._k = k + 1
+        t0 = self._t
+        dur = self._durs[k]
+        self._t = time.ticks_add(t0, dur)
+        self.motion.move([None if a == KEEP else a for a in g.row(k)], dur, t0=t0)
+
+    def _finish(self):
+        self.playing = False
+        if self.motion.on_done is self._cb:
+            self.motion.on_done = None
+
+    def stop(self):
+        """停在当前位置"""
+        self._finish()
+        self.motion.stop()
+
+    def wait(self, timeout_ms=None, sleep=None):
+        """阻塞到播放结束；超时返回 False；sleep 同 Motion.wait"""
+        sleep = sleep or time.sleep_ms
+        t0 = time.ticks_ms()
+        while self.playing:
+            if timeout_ms is not None and time.ticks_diff(time.ticks_ms(), t0) >= timeout_ms:
+                return False
+            sleep(self.motion.frame_ms // 2)
+        return True
+
+    async def done(self):
+        from base import runtime
+        while self.playing:
+            await runtime.sleep_ms(self.motion.frame_ms // 2)
@@ -0,0 +1,127 @@
+# base/gesture.py
+# 按键手势识别：在 base.debounce 的干净边沿上识别 单击 / 双击 / 长按 / 长按连发
+# 时间都按事件总线记录的边沿时间戳 ts_us 计算，与事件何时被分发无关；
+# 长按 / 双击超时由 base.scheduler 的单次任务驱动，不需要轮询。
+# 不启用双击时，单击在松开的那一次去抖后立即触发。
+#
+# 用法：
+#     from base import gesture
+#     def on_key(name, g):            # g 为 CLICK / DOUBLE / LONG / REPEAT
+#         ...
+#     gesture.Button(25, on_key, name="K1", double_ms=300, long_ms=1000, repeat_ms=150)
+#
+# 参数：
+#     long_ms    按住多久算长按（0 关闭）
+#     double_ms  两次单击的最大间隔（0 关闭双击，单击无延迟）
+#     repeat_ms  长按后每隔多久发一次 REPEAT（0 关闭）
+#     active     按下时的电平，上拉按键为 0
+
+import time
+from machine import Pin
+
+from base import debounce, events, scheduler
+
+CLICK = "click"
+DOUBLE = "double"
+LONG = "long"
+REPEAT = "repeat"
+
+
+class Button:
+    def __init__(self, pin, handler, name=None, long_ms=800, double_ms=0, repeat_ms=0,
+                 active=0, pull=Pin.PULL_UP):
+        self.name = name or str(pin)
+        self.handler = handler
+        self.long_ms = long_ms
+        self.double_ms = double_ms
+        self.repeat_ms = repeat_ms
+        self.active = active
+        self.pressed = False
+        self._t_down = 0          # 按下 / 松开边沿的 ticks_us
+        self._t_up = 0
+        self._long_job = None     # 长按 / 连发计时
+        self._click_job = None    # 等待第二次按下
+        self._second = False      # 当前是双击的第二次按下
+        self._long_fired = False
+        self.src = debounce.add(pin, pull=pull, name=self.name)
+        events.subscribe(self.src, self._on_edge)
+
+    def _emit(self, g):
+        self.handler(self.name, g)
+
+    def _cancel_long(self):
+        if self._long_job:
+            self._long_job.cancel()
+            self._long_job = None
+
+    def _on_edge(self, level, ts_us):
+        if (level == self.active) == self.pressed:
+            return
+        self.pressed = level == self.active
+        # 边沿到现在已过去的时间（分发延迟），从定时任务的延时里扣掉
+        late = time.ticks_diff(time.ticks_us(), ts_us) // 1000
+        if self.pressed:
+            self._t_down = ts_us
+            self._long_fired = False
+            if self._click_job:
+                self._click_job.cancel()
+                self._click_job = None
+                if time.ticks_diff(ts_us, self._t_up) // 1000 <= self.double_ms:
+                    # 双击间隔内再次按下
+                    self._second = True
+                else:
+                    # 超时任务还没来得及执行：上一次是单击
+                    self._emit(CLICK)
+            if self.long_ms:
+                self._long_job = scheduler.after(max(self.long_ms - late, 0), self._on_long,
+                                                 name=self.name + ".long")
+            return
+
+        # 松开
+        self._t_up = ts_us
+        self._cancel_long()
+        if not self._long_fired and self.long_ms and \
+                time.ticks_diff(ts_us, self._t_down) // 1000 >= self.long_ms:
+            # 按住已够长，只是长按任务还没执行
+            self._fire_long()
+        if self._long_fired:
+            self._second = False
+            return
+        if self._second:
+            self._second = False
+            self._emit(DOUBLE)
+        elif self.double_ms:
+            self._click_job = scheduler.after(max(self.double_ms - late, 0), self._on_click_timeout,
+                                              name=self.name + ".click")
+        else:
+            self._emit(CLICK)
+
+    def _on_click_timeout(self):
+        self._click_job = None
+        self._emit(CLICK)
+
+    def _fire_long(self):
+        self._long_fired = True
+        if self._second:
+            # 第二次按下变成长按：第一次算单击
+            self._second = False
+            self._emit(CLICK)
+        self._emit(LONG)
+
+    def _on_long(self):
+        self._fire_long()
+        if self.repeat_ms:
+            self._long_job = scheduler.every(self.repeat_ms, self._on_repeat,
+                                             phase_ms=self.repeat_ms, name=self.name + ".repeat")
+        else:
+            self._long_job = None
+
+    def _on_repeat(self):
+        if self.pressed:
+            self._emit(REPEAT)
+
+
+def buttons(pins, handler, names=None, **timing):
+    """批量创建：pins 与 names 一一对应，timing 为 Button 的时间参数"""
+    return [Button(p, handler, name=names[i] if names else None, **timing)
+            for i, p in enumerate(pins)]
@@ -0,0 +1,145 @@
+# base/motion.py
+# 多舵机插值运动引擎：给出所有通道的目标角度和总时长，各通道在同一帧里同时插值，
+# 固定 50Hz（与舵机 PWM 周期一致）由 base.scheduler 驱动，move() 立即返回。
+#
+# 用法：
+#     from base.motion import Motion
+#     m = Motion([w0, w1, w2], names=("HIP", "THIGH", "KNEE"))   # wN(pos) 写一个舵机
+#     m.move((90, 45, None), 500)         # None 表示该通道不动
+#     m.move({"KNEE": 120}, 300)          # 也可以按名字给目标
+#     m.wait()                            # 阻塞等待（期间 sleep，调度器照常出帧）
+#     m.wait(sleep=time.sleep_ms)         # 示例里传自己的 sleep，远程切换时能被打断
+#     await m.done()                      # 协程里等待
+#
+# 角度在内部以 0.1° 为单位的整数保存，写函数收到的也是 0.1° 整数，帧内只做整数运算。
+# 新的 move() 会从各通道的当前位置重新开始插值，不必等上一个动作结束。
+# on_done 在动作最后一帧写完后调用，可以在里面接着 move()（base.gait 用它串关键帧）。
+
+import time
+
+from base import scheduler
+
+FRAME_MS = 20   # 50Hz
+SCALE = 10      # 内部单位：0.1°
+
+
+class Motion:
+    def __init__(self, writers, names=None, start=90, frame_ms=FRAME_MS):
+        n = len(writers)
+        self.writers = list(writers)
+        self.names = list(names) if names else None
+        self.frame_ms = frame_ms
+        p = int(start * SCALE)
+        self.pos = [p] * n        # 当前位置（最近一次写出的值）
+        self._from = [p] * n
+        self._delta = [0] * n
+        self._active = []         # 本次动作中需要插值的通道
+        self._moving = False      # 动作进行中（没有通道要动时就是一段停顿）
+        self._t0 = 0
+        self._dur = 0
+        self._ease = False
+        self._job = None
+        self.on_done = None
+        self.frames = 0
+        self.frame_us_max = 0     # 单帧写全部通道的最长耗时
+
+    def _index(self, key):
+        if isinstance(key, int):
+            return key
+        return self.names.index(key)
+
+    def move(self, targets, duration_ms=0, ease=False, t0=None):
+        """开始一个动作并立即返回
+
+        targets: 与通道等长的序列（None 不动），或 {通道名/序号: 角度}
+        duration_ms: 0 立即写到位
+        ease: True 时两端减速（smoothstep），否则匀速
+        t0: 动作起点的 ticks_ms，缺省为现在；连续动作传上一段的结束时刻，帧延迟不会累积
+        """
+        if isinstance(targets, dict):
+            items = [(self._index(k), a) for k, a in targets.items()]
+        else:
+            items = [(i, a) for i, a in enumerate(targets)]
+        active = []
+        for i, a in items:
+            if a is None:
+                continue
+            self._from[i] = self.pos[i]
+            self._delta[i] = int(a * SCALE) - self.pos[i]
+            active.append(i)
+        # 上一个动作中还没走完、这次没给目标的通道停在当前位置
+        self._active = active
+        self._moving = True
+        self._t0 = time.ticks_ms() if t0 is None else t0
+        self._dur = duration_ms
+        self._ease = ease
+        if duration_ms <= 0:
+            self._frame()
+            return
+        if self._job is None or self._job.cancelled:
+            self._job = scheduler.every(self.frame_ms, self._frame, name="motion")
+
+    def _frame(self):
+        t_us = time.ticks_us()
+        el = time.ticks_diff(time.ticks_ms(), self._t0)
+        dur = self._dur
+        last = el >= dur
+        if last:
+            f = 1024
+        else:
+            f = (el << 10) // dur
+            if self._ease:
+                f = (f * f * (3072 - 2 * f)) >> 20
+        pos, frm, delta, writers = self.pos, self._from, self._delta, self.writers
+        for i in self._active:
+            p = frm[i] + ((delta[i] * f) >> 10)
+            # 最后一帧总是写出，保证目标一定落到舵机上
+            if p != pos[i] or last:
+                pos[i] = p
+                writers[i](p)
+        self.frames += 1
+        us = time.ticks_diff(time.ticks_us(), t_us)
+        if us > self.frame_us_max:
+            self.frame_us_max = us
+        if last:
+            self._active = []
+            self._moving = False
+            if self.on_done:
+                self.on_done()
+            # on_done 里开始了下一段动作时继续用同一个帧任务
+            if not self._moving and self._job:
+                self._job.cancel()
+                self._job = None
+
+    def busy(self):
+        return self._moving
+
+    def wait(self, timeout_ms=None, sleep=None):
+        """阻塞到动作结束；超时返回 False
+
+        sleep: 等待用的 sleep_ms，缺省 time.sleep_ms；示例传入自己模块的 time.sleep_ms，
+        这样 base.remote 替换的 time 能在等待中途抛出切换请求
+        """
+        sleep = sleep or time.sleep_ms
+        t0 = time.ticks_ms()
+        while self._moving:
+            if timeout_ms is not None and time.ticks_diff(time.ticks_ms(), t0) >= timeout_ms:
+                return False
+            sleep(self.frame_ms // 2)
+        return True
+
+    async def done(self):
+        from base import runtime
+        while self._moving:
+            await runtime.sleep_ms(self.frame_ms // 2)
+
+    def stop(self):
+        """停在当前位置，不再写输出"""
+        self._active = []
+        self._moving = False
+        if self._job:
+            self._job.cancel()
+            self._job = None
+
+    def angle(self, key):
+        return self.pos[self._index(key)] / SCALE
@@ -0,0 +1,121 @@
+# base/mpycache.py
+# 字节码缓存：优先导入 mpy-cross 预编译的 .mpy，省掉板上编译的时间和临时堆
+#
+# MicroPython 在同一目录下 .py 优先于 .mpy，所以 .mpy 放在单独的影子目录：
+#     /mpy/examples/*.mpy   /mpy/lib/*.mpy   /mpy/base/*.mpy
+# 由主机上的 tools/mpy_sync.py 编译并上传。install() 在 boot.py 里调用：
+#   - .mpy 比对应 .py 旧或版本不匹配 -> 删除，回退到源码
+#   - .py 已删除的孤儿 .mpy 也删除
+#   - examples 是平铺模块，逐个回退；base、lib 也会当作包导入（`from lib import ssd1306`），
+#     包只会在第一个找到的同名目录里查找，所以只有全部模块都新鲜时才启用
+#   - 包导入要把 /mpy 放到 '' 前面，这会让 /mpy 下的每个目录都盖过源码目录，
+#     因此只有 /mpy 下现存的影子目录全部启用时才这样做；清空的影子目录直接删掉
+#
+# 注意：本模块要以 `import mpycache`（/base 在 sys.path 中）平铺导入，
+# 不能写成 `from base import mpycache`，否则 base 包会先被锁定到源码目录。
+
+import os
+import sys
+
+MPY_ROOT = "/mpy"
+# (源码目录, 影子目录, 是否为包)
+DIRS = (
+    ("/examples", "/mpy/examples", False),
+    ("/lib", "/mpy/lib", True),
+    ("/base", "/mpy/base", True),
+)
+
+# 固件支持的 .mpy 版本号（低 8 位），旧固件没有 _mpy 时跳过检查
+_MPY_VER = getattr(sys.implementation, "_mpy", 0) & 0xFF
+
+status = {}  # 影子目录 -> (新鲜数, 删除数, 缺失数, 是否启用)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path)[8]
+    except OSError:
+        return None
+
+
+def _compatible(path):
+    if not _MPY_VER:
+        return True
+    try:
+        with open(path, "rb") as f:
+            hdr = f.read(2)
+    except OSError:
+        return False
+    return len(hdr) == 2 and hdr[0] == 0x4D and hdr[1] == _MPY_VER  # 'M'
+
+
+def check_dir(src_dir, mpy_dir):
+    """比对一个目录，删除过期/不兼容的 .mpy，返回 (新鲜数, 删除数, 缺失数)"""
+    try:
+        mpys = [n for n in os.listdir(mpy_dir) if n.endswith(".mpy")]
+    except OSError:
+        mpys = []
+    try:
+        srcs = [n for n in os.listdir(src_dir) if n.endswith(".py")]
+    except OSError:
+        srcs = []
+    fresh = removed = 0
+    for name in mpys:
+        mpy_path = mpy_dir + "/" + name
+        src_t = _mtime(src_dir + "/" + name[:-4] + ".py")
+        mpy_t = _mtime(mpy_path)
+        if src_t is None or mpy_t is None or mpy_t < src_t or not _compatible(mpy_path):
+            try:
+                os.remove(mpy_path)
+            except OSError:
+                pass
+            removed += 1
+        else:
+            fresh += 1
+    if not fresh:
+        # 空的影子目录也会在包查找时遮住源码目录
+        try:
+            os.rmdir(mpy_dir)
+        except OSError:
+            pass
+    missing = len(srcs) - fresh
+    return fresh, removed, missing if missing > 0 else 0
+
+
+def install():
+    """检查影子目录并把可用的放到 sys.path 前面，返回启用的目录数"""
+    if _mtime(MPY_ROOT) is None:
+        return 0
+    enabled = 0
+    as_root = True   # /mpy 下现存的影子目录是否全部可用
+    for src_dir, mpy_dir, is_pkg in DIRS:
+        fresh, removed, missing = check_dir(src_dir, mpy_dir)
+        on = fresh > 0 and not (is_pkg and missing)
+        status[mpy_dir] = (fresh, removed, missing, on)
+        if not on:
+            if _mtime(mpy_dir) is not None:
+                as_root = False
+            continue
+        # 扁平的 `import x` 走 /base、/lib、/examples
+        _prepend(mpy_dir, src_dir)
+        enabled += 1
+    if enabled and as_root:
+        # `from base import x` / `from lib import x` 通过根目录查找包
+        _prepend(MPY_ROOT, "")
+    return enabled
+
+
+def _prepend(path, before):
+    if path in sys.path:
+        return
+    try:
+        i = sys.path.index(before)
+    except ValueError:
+        i = 0
+    sys.path.insert(i, path)
+
+
+def report():
+    for mpy_dir, (fresh, removed, missing, on) in status.items():
+        print("%-14s %s  .mpy %d, 已删除过期 %d, 回退源码 %d" % (
+            mpy_dir, "启用" if on else "未用", fresh, removed, missing))
@@ -0,0 +1,237 @@
+# base/remote.py
+# 无人值守启动：从 autorun.json 读取要运行的示例，并通过 UART/UDP 接收启动/停止命令
+#
+# autorun.json 示例（所有字段都可省略）：
+#     {"example": "steering", "args": [],
+#      "uart": {"id": 1, "baudrate": 115200, "tx": 17, "rx": 16},
+#      "udp": 5005, "wifi": {"ssid": "xxx", "password": "xxx"},
+#      "watchdog": {"timeout_ms": 8000, "deadline_ms": 5000}}   # 见 base/supervisor.py
+#
+# 命令为一行文本，回复 "OK ..." 或 "ERR ..."：
+#     run <示例名> [JSON 参数]   切换到该示例（参数为列表或对象，传给 run()）；
+#                                "a,b" 同时运行多个协程示例（见 base/runtime.py）
+#     stop                       停止当前示例
+#     status / list              查询当前状态 / 可用示例
+#
+# 热切换原理：示例导入后，把它全局里的 time/sleep 换成会轮询命令的版本。
+# 示例主线程每次 sleep 都会检查命令，收到切换请求时抛出 SwitchRequest
+# （KeyboardInterrupt 的子类，示例原有的 Ctrl-C 清理逻辑照常执行）。
+
+import time
+
+try:
+    import json
+except ImportError:
+    import ujson as json
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+from base import log
+
+CONFIG_FILE = "autorun.json"
+POLL_MS = 50  # 命令轮询间隔，也是切换延迟的上限（示例不 sleep 时无法切换）
+
+_SLEEPS = ("sleep", "sleep_ms", "sleep_us")
+
+
+class SwitchRequest(KeyboardInterrupt):
+    """收到 run/stop 命令时在示例主线程中抛出"""
+    pass
+
+
+def load_config(path=CONFIG_FILE):
+    """读取配置；文件不存在返回 None（进入交互菜单）"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except OSError:
+        return None
+    except ValueError as e:
+        log.warn("remote", path, "格式错误:", e)
+        return None
+
+
+def parse_command(line):
+    """'run name [json]' -> ('run', name, args)；'stop' -> ('stop', None, None)"""
+    parts = line.strip().split(None, 2)
+    if not parts:
+        return None
+    op = parts[0].lower()
+    name = parts[1] if len(parts) > 1 else None
+    args = None
+    if len(parts) > 2:
+        args = json.loads(parts[2])
+    return op, name, args
+
+
+class _TimeProxy:
+    """代替示例全局里的 time 模块，只改写 sleep 系列"""
+
+    def __init__(self, mod, ctl):
+        self._mod = mod
+        self._ctl = ctl
+
+    def __getattr__(self, name):
+        return getattr(self._mod, name)
+
+    def sleep(self, s):
+        self._ctl.sleep_ms(int(s * 1000))
+
+    def sleep_ms(self, ms):
+        self._ctl.sleep_ms(ms)
+
+    def sleep_us(self, us):
+        if us >= 1000:
+            self._ctl.sleep_ms(us // 1000)
+        else:
+            self._mod.sleep_us(us)
+
+
+class Control:
+    """命令通道（UART 和/或 UDP），由启动器持有，跨示例保持"""
+
+    def __init__(self, cfg):
+        self.pending = None       # 待执行的命令元组
+        self.status = "idle"
+        self.examples = ()        # list 命令的回复内容
+        self.on_sleep = None      # 示例主线程每个 sleep 分片调用一次（如看门狗心跳）
+        self._uart = None
+        self._line = b""
+        self._sock = None
+        self._peer = None
+        self._last_poll = time.ticks_ms()
+        self._main = _thread.get_ident() if _thread else None
+
+        ucfg = cfg.get("uart")
+        if ucfg:
+            from machine import UART
+            self._uart = UART(ucfg.get("id", 1), baudrate=ucfg.get("baudrate", 115200),
+                              tx=ucfg.get("tx"), rx=ucfg.get("rx"))
+        port = cfg.get("udp")
+        if port:
+            if cfg.get("wifi"):
+                self._connect_wifi(cfg["wifi"])
+            import socket
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.bind(("0.0.0.0", port))
+            self._sock.setblocking(False)
+        log.info("remote", "命令通道: uart=%s udp=%s", bool(self._uart), port or "-")
+
+    def _connect_wifi(self, wcfg, timeout_ms=10000):
+        import network
+        sta = network.WLAN(network.STA_IF)
+        sta.active(True)
+        if not sta.isconnected():
+            sta.connect(wcfg["ssid"], wcfg.get("password", ""))
+            t0 = time.ticks_ms()
+            while not sta.isconnected() and time.ticks_diff(time.ticks_ms(), t0) < timeout_ms:
+                time.sleep_ms(100)
+        log.info("remote", "WiFi:", sta.ifconfig()[0] if sta.isconnected() else "未连接")
+
+    def _reply(self, text, peer=None):
+        msg = (text + "\n").encode()
+        if peer is not None:
+            try:
+                self._sock.sendto(msg, peer)
+            except OSError:
+                pass
+        elif self._uart:
+            self._uart.write(msg)
+
+    def _handle(self, line, peer=None):
+        try:
+            cmd = parse_command(line.decode())
+        except (ValueError, UnicodeError) as e:
+            self._reply(f"ERR {e}", peer)
+            return
+        if cmd is None:
+            return
+        op = cmd[0]
+        if op == "status":
+            self._reply("OK " + self.status, peer)
+        elif op == "list":
+            self._reply("OK " + ",".join(self.examples), peer)
+        elif op == "stop" or (op == "run" and cmd[1]):
+            if op == "run" and self.examples:
+                # "a,b" 逐个检查示例名
+                bad = [n for n in cmd[1].split(",") if n not in self.examples]
+                if bad:
+                    self._reply("ERR unknown " + ",".join(bad), peer)
+                    return
+            self.pending = cmd
+            self._reply("OK " + op + (" " + cmd[1] if cmd[1] else ""), peer)
+        else:
+            self._reply("ERR bad command", peer)
+
+    def poll(self):
+        """读取所有通道上的完整命令行，非阻塞"""
+        self._last_poll = time.ticks_ms()
+        if self._uart and self._uart.any():
+            self._line += self._uart.read()
+            while b"\n" in self._line:
+                line, self._line = self._line.split(b"\n", 1)
+                self._handle(line)
+            if len(self._line) > 128:  # 丢弃没有换行的垃圾数据
+                self._line = b""
+        if self._sock:
+            while True:
+                try:
+                    data, peer = self._sock.recvfrom(128)
+                except OSError:
+                    break
+                for line in data.split(b"\n"):
+                    self._handle(line, peer)
+
+    def take(self):
+        cmd, self.pending = self.pending, None
+        return cmd
+
+    def wait(self, timeout_ms=None):
+        """空闲时阻塞等待下一条命令；超时返回 None"""
+        t0 = time.ticks_ms()
+        while self.pending is None:
+            if timeout_ms is not None and time.ticks_diff(time.ticks_ms(), t0) >= timeout_ms:
+                return None
+            self.poll()
+            time.sleep_ms(POLL_MS)
+        return self.take()
+
+    def check(self):
+        """轮询一次命令（到期才真正读通道）；示例主线程中有待处理命令时抛出 SwitchRequest
+
+        也作为 runtime.run() 的 hook，让协程示例同样可以热切换。
+        """
+        if time.ticks_diff(time.ticks_ms(), self._last_poll) >= POLL_MS:
+            self.poll()
+        if self._in_main():
+            if self.pending is not None:
+                raise SwitchRequest()
+            if self.on_sleep:
+                self.on_sleep()
+
+    def sleep_ms(self, ms):
+        """示例用的 sleep：分片睡眠，每片调用 check()"""
+        end = time.ticks_add(time.ticks_ms(), ms)
+        while True:
+            self.check()
+            left = time.ticks_diff(end, time.ticks_ms())
+            if left <= 0:
+                return
+            time.sleep_ms(left if left < POLL_MS else POLL_MS)
+
+    def _in_main(self):
+        return self._main is None or _thread.get_ident() == self._main
+
+    def attach(self, module):
+        """替换示例模块全局里的 time/utime 及直接导入的 sleep 函数"""
+        g = module.__dict__
+        for name in ("time", "utime"):
+            if g.get(name) is time:
+                g[name] = _TimeProxy(time, self)
+        proxy = _TimeProxy(time, self)
+        for name in _SLEEPS:
+            if name in g and g[name] is getattr(time, name):
+                g[name] = getattr(proxy, name)
@@ -0,0 +1,74 @@
+# base/resources.py
+# 示例资源回收：启动器在示例退出时释放外设、解绑 IRQ，避免跨示例残留
+
+from base import log
+
+try:
+    import machine
+except ImportError:
+    machine = None
+
+# 可以安全 deinit 的外设类型（不同端口/版本不一定都有）
+_DEINIT_TYPES = ()
+if machine:
+    _DEINIT_TYPES = tuple(
+        t for t in (getattr(machine, n, None) for n in ("PWM", "Timer", "I2S", "SPI", "SoftSPI", "UART"))
+        if t is not None
+    )
+
+_items = []
+
+
+def register(obj, cleanup=None):
+    """
+    登记需要在示例退出时释放的对象（函数内部创建、模块全局扫描不到的外设）
+    cleanup: 无参可调用对象；缺省时调用 obj.deinit()
+    """
+    _items.append((obj, cleanup))
+    return obj
+
+
+def release_all():
+    """释放全部已登记对象，后登记的先释放；返回释放个数"""
+    n = 0
+    while _items:
+        obj, cleanup = _items.pop()
+        try:
+            if cleanup:
+                cleanup()
+            else:
+                obj.deinit()
+            n += 1
+        except Exception as e:
+            log.warn("res", "释放失败:", obj, e)
+    return n
+
+
+def _release_obj(obj):
+    if machine is None:
+        return 0
+    try:
+        if isinstance(obj, machine.Pin):
+            obj.irq(handler=None)  # 解绑 IRQ 回调，回调闭包随之可回收
+            return 1
+        if _DEINIT_TYPES and isinstance(obj, _DEINIT_TYPES):
+            obj.deinit()
+            return 1
+    except Exception as e:
+        log.warn("res", "释放失败:", obj, e)
+    return 0
+
+
+def release_module(module):
+    """扫描模块全局变量（含一层 dict/list/tuple）中的外设并释放；返回释放个数"""
+    n = 0
+    for obj in list(module.__dict__.values()):
+        if isinstance(obj, dict):
+            for v in obj.values():
+                n += _release_obj(v)
+        elif isinstance(obj, (list, tuple)):
+            for v in obj:
+                n += _release_obj(v)
+        else:
+            n += _release_obj(obj)
+    return n
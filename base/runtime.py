@@ -0,0 +1,152 @@
+# base/runtime.py
+# 共享的 asyncio 运行时：所有示例跑在同一个事件循环里，可以在一个核上同时运行多个
+# - every(period_ms, fn)：周期任务，按绝对时间排期不累积漂移，fn 可以是协程函数
+# - Edge(pin, trigger)：引脚边沿的 awaitable，中断经 base.events 总线送达
+# - panel(name, render)：登记显示面板，统一的显示任务定时刷新 base.display.screen
+# - run(*coros, hook=None)：运行到全部协程结束或 Ctrl-C；hook 每 50ms 调用一次
+#
+# 示例移植方式：提供 `async def main()`，`run()` 写成 `runtime.run(main())`，
+# 启动器看到 main 就走这里，并能把几个示例的 main() 放进同一个循环。
+
+import time
+from machine import Pin
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+from base import events
+
+DISPLAY_PERIOD_MS = 200
+PAGE_MS = 2000       # 面板行数超过屏幕时翻页的间隔
+SCREEN_LINES = 6
+HOOK_PERIOD_MS = 50
+
+_panels = {}         # 面板名 -> render()，render 返回行的元组
+
+
+def sleep_ms(ms):
+    return asyncio.sleep_ms(ms)
+
+
+async def every(period_ms, fn, *args):
+    """每 period_ms 调用一次 fn(*args)；fn 返回 False 时结束，处理超时则跳过错过的周期"""
+    next_t = time.ticks_ms()
+    while True:
+        r = fn(*args)
+        if hasattr(r, "send"):  # 协程
+            r = await r
+        if r is False:
+            return
+        next_t = time.ticks_add(next_t, period_ms)
+        wait = time.ticks_diff(next_t, time.ticks_ms())
+        if wait < 0:
+            next_t = time.ticks_ms()
+            wait = 0
+        await asyncio.sleep_ms(wait)
+
+
+class Edge:
+    """引脚边沿等待：await edge.wait() 返回 (电平, ticks_ms)
+
+    debounce=False：引脚中断经 base.events 总线送来电平；
+    debounce=True：由 base.debounce 统一采样去抖，只收到干净的边沿（按 trigger 过滤）。
+    两次 wait 之间的多次边沿合并为一次（取最后一次的电平），count 为累计边沿数。
+    """
+
+    def __init__(self, pin, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, debounce=False, name=None):
+        self.pin = pin
+        self.count = 0
+        self._t = 0
+        self._v = 0
+        self._flag = asyncio.ThreadSafeFlag()
+        self._want = None
+        if debounce:
+            from base import debounce as _db
+            self.src = _db.add(pin, name=name)
+            both = Pin.IRQ_FALLING | Pin.IRQ_RISING
+            if trigger & both != both:
+                self._want = 0 if trigger & Pin.IRQ_FALLING else 1
+        else:
+            self.src = events.pin_source(pin, trigger, name)
+        events.subscribe(self.src, self._on_event)
+
+    def _on_event(self, value, ts_us):
+        if self._want is not None and value != self._want:
+            return
+        self._t = time.ticks_ms()
+        self._v = value
+        self.count += 1
+        self._flag.set()
+
+    async def wait(self):
+        await self._flag.wait()
+        return self._v, self._t
+
+
+def panel(name, render):
+    """登记显示面板；render() 返回要显示的行"""
+    _panels[name] = render
+
+
+def remove_panel(name):
+    _panels.pop(name, None)
+
+
+async def _display_task(period_ms):
+    from base.display import screen
+    page = 0
+    page_t = time.ticks_ms()
+    while True:
+        if _panels:
+            lines = []
+            for render in _panels.values():
+                lines.extend(render())
+            pages = (len(lines) + SCREEN_LINES - 1) // SCREEN_LINES
+            if time.ticks_diff(time.ticks_ms(), page_t) >= PAGE_MS:
+                page_t = time.ticks_ms()
+                page += 1
+            if page >= pages:
+                page = 0
+            screen.show_lines(*lines[page * SCREEN_LINES:(page + 1) * SCREEN_LINES])
+        await asyncio.sleep_ms(period_ms)
+
+
+async def _main(coros, hook, display_ms):
+    tasks = [asyncio.create_task(c) for c in coros]
+    aux = [asyncio.create_task(_display_task(display_ms))]
+    err = []
+    if hook:
+        main_task = asyncio.current_task()
+
+        async def _hook_task():
+            try:
+                while True:
+                    hook()
+                    await asyncio.sleep_ms(HOOK_PERIOD_MS)
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:  # 包括 remote.SwitchRequest
+                err.append(e)
+                main_task.cancel()
+
+        aux.append(asyncio.create_task(_hook_task()))
+    try:
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        if err:
+            raise err[0]
+        raise
+    finally:
+        for t in tasks + aux:
+            t.cancel()
+
+
+def run(*coros, hook=None, display_ms=DISPLAY_PERIOD_MS):
+    """运行协程直到全部结束、Ctrl-C 或 hook 抛出异常；结束后清空面板并重置事件循环"""
+    try:
+        asyncio.run(_main(coros, hook, display_ms))
+    finally:
+        _panels.clear()
+        asyncio.new_event_loop()
@@ -0,0 +1,168 @@
+# base/scheduler.py
+# 定时器复用调度器：许多周期任务（周期、相位各不相同）共用一个 machine.Timer
+# - 任务按截止时间放在最小堆里，定时器单次模式只对准堆顶，到点后在定时器回调里
+#   执行所有到期任务，再对准下一个（ESP32 的 Timer 回调本身就是软回调，经
+#   MicroPython 调度器在主线程执行，不必再 micropython.schedule 一次）
+# - 每个任务统计迟到（抖动）和超时：执行太慢错过的周期直接跳过并计入 overruns
+#
+# 用法：
+#     from base import scheduler
+#     job = scheduler.every(1000, heartbeat)            # 每秒
+#     scheduler.every(100, sample, phase_ms=50)         # 与其它 100ms 任务错开
+#     scheduler.after(500, oneshot)
+#     job.cancel()
+#
+# 任务在主线程执行，可以分配内存，但不能长时间阻塞（会推迟所有其它任务）。
+# 首次添加任务时启动，并登记到 base.resources，示例退出时自动清空。
+# 定时器固定使用 Timer(2)（supervisor 用 Timer(3)，示例常用 Timer(0)）。
+
+import time
+
+try:
+    import heapq
+except ImportError:
+    import uheapq as heapq
+
+from machine import Timer
+
+from base import resources
+
+TIMER_ID = 2
+
+_heap = []        # [截止时间, 序号, Job]
+_seq = 0
+_timer = None
+_armed = None     # 当前定时器对准的截止时间
+_clock = 0        # 单调毫秒计数（堆里不能直接放会回绕的 ticks）
+_ref = 0
+
+
+class Job:
+    __slots__ = ("fn", "period", "name", "cancelled", "runs",
+                 "overruns", "late_max", "late_sum", "cost_max")
+
+    def __init__(self, fn, period, name):
+        self.fn = fn
+        self.period = period      # 0 表示单次
+        self.name = name or getattr(fn, "__name__", "job")
+        self.cancelled = False
+        self.runs = self.overruns = 0
+        self.late_max = self.late_sum = self.cost_max = 0
+
+    def cancel(self):
+        self.cancelled = True     # 惰性删除，轮到它时丢弃
+
+    def stats(self):
+        return {"runs": self.runs, "overruns": self.overruns, "late_max_ms": self.late_max,
+                "late_avg_ms": self.late_sum // (self.runs or 1), "cost_max_ms": self.cost_max}
+
+
+def _now():
+    global _clock, _ref
+    t = time.ticks_ms()
+    _clock += time.ticks_diff(t, _ref)
+    _ref = t
+    return _clock
+
+
+def _push(deadline, job):
+    global _seq
+    _seq += 1
+    heapq.heappush(_heap, [deadline, _seq, job])
+
+
+def _arm(now):
+    """把定时器对准堆顶"""
+    global _armed
+    while _heap and _heap[0][2].cancelled:
+        heapq.heappop(_heap)
+    if not _heap or _timer is None:
+        _armed = None
+        return
+    deadline = _heap[0][0]
+    if _armed == deadline:
+        return
+    _armed = deadline
+    _timer.init(mode=Timer.ONE_SHOT, period=max(1, deadline - now), callback=_on_timer)
+
+
+def _on_timer(_t):
+    global _armed
+    _armed = None
+    now = _now()
+    while _heap and _heap[0][0] <= now:
+        deadline, _, job = heapq.heappop(_heap)
+        if job.cancelled:
+            continue
+        late = now - deadline
+        job.runs += 1
+        job.late_sum += late
+        if late > job.late_max:
+            job.late_max = late
+        try:
+            job.fn()
+        except Exception as e:
+            print("scheduler: %s 出错: %r" % (job.name, e))
+        now = _now()
+        cost = now - deadline - late
+        if cost > job.cost_max:
+            job.cost_max = cost
+        if job.period and not job.cancelled:
+            nxt = deadline + job.period
+            if nxt <= now:
+                # 超时：跳过错过的周期，保持原有相位
+                missed = (now - nxt) // job.period + 1
+                job.overruns += missed
+                nxt += missed * job.period
+            _push(nxt, job)
+    _arm(now)
+
+
+def start():
+    global _timer, _ref
+    if _timer is not None:
+        return
+    _ref = time.ticks_ms()
+    _timer = Timer(TIMER_ID)
+    resources.register(_timer, stop)
+
+
+def stop():
+    """停止定时器并清空全部任务"""
+    global _timer, _armed
+    if _timer is not None:
+        _timer.deinit()
+        _timer = None
+    for entry in _heap:
+        entry[2].cancel()
+    del _heap[:]
+    _armed = None
+
+
+def every(period_ms, fn, phase_ms=0, name=None):
+    """每 period_ms 执行一次 fn()，第一次在 phase_ms 后"""
+    start()
+    job = Job(fn, period_ms, name)
+    now = _now()
+    _push(now + phase_ms, job)
+    _arm(now)
+    return job
+
+
+def after(delay_ms, fn, name=None):
+    """delay_ms 后执行一次 fn()"""
+    start()
+    job = Job(fn, 0, name)
+    now = _now()
+    _push(now + delay_ms, job)
+    _arm(now)
+    return job
+
+
+def stats():
+    """{任务名: 统计}"""
+    out = {}
+    for _, _, job in _heap:
+        if not job.cancelled:
+            out[job.name] = job.stats()
+    return out
@@ -0,0 +1,82 @@
+# base/servo.py
+# 舵机写入：每个舵机在构造时把 角度 -> 占空比 预先算成整数定点系数，
+# 写入路径只有 限幅 + 一次乘法 + 移位，不产生浮点对象、不打印日志。
+# - 优先用 duty_u16（50Hz 时 1 LSB ≈ 0.3us，1000us 行程约 3300 级，远好于
+#   duty() 10 位刻度的约 51 级）；固件没有 duty_u16 时退回 duty()
+# - 位置单位与 base.motion 相同：0.1° 的整数，Servo.write 可直接作为 Motion 的写函数
+#
+# 用法：
+#     from base.servo import Servo
+#     s = Servo(27, min_us=500, max_us=2500)          # 0°=0.5ms, 180°=2.5ms
+#     s.angle(90)                                     # 普通调用
+#     s.write(905)                                    # 热路径：90.5°
+#     Motion([s.write, ...])
+
+import time
+from machine import Pin, PWM
+
+from base import resources
+
+SCALE = 10        # 0.1°
+SHIFT = 12        # 定点小数位；占空比 < 2^16，乘积保持在小整数范围内
+
+
+class Servo:
+    __slots__ = ("pwm", "lo", "hi", "base", "slope", "_set")
+
+    def __init__(self, pin, min_us=1000, max_us=2000, lo=0, hi=180, freq=50, span=180):
+        """pin: 引脚号、Pin 或已建好的 PWM（调用方负责释放）
+        min_us/max_us: 0° 与 span° 的脉宽；lo/hi: 限位角度
+        """
+        if isinstance(pin, PWM):
+            self.pwm = pin
+        else:
+            # 先不输出脉冲，第一次 write 才让舵机动作；包在 Servo 里的 PWM 模块扫描不到，登记回收
+            self.pwm = resources.register(PWM(pin if isinstance(pin, Pin) else Pin(pin), freq=freq, duty=0))
+        if hasattr(self.pwm, "duty_u16"):
+            full, self._set = 65536, self.pwm.duty_u16
+        else:
+            full, self._set = 1024, self.pwm.duty
+        period = 1000000 // freq
+        self.lo = lo * SCALE
+        self.hi = hi * SCALE
+        # duty = (base + pos * slope) >> SHIFT，base/slope 已含脉宽和周期换算
+        self.base = (min_us * full << SHIFT) // period
+        self.slope = ((max_us - min_us) * full << SHIFT) // (period * span * SCALE)
+
+    def duty(self, pos):
+        """位置（0.1°）对应的占空比值，不写输出"""
+        if pos < self.lo:
+            pos = self.lo
+        elif pos > self.hi:
+            pos = self.hi
+        return (self.base + pos * self.slope) >> SHIFT
+
+    def write(self, pos):
+        if pos < self.lo:
+            pos = self.lo
+        elif pos > self.hi:
+            pos = self.hi
+        self._set((self.base + pos * self.slope) >> SHIFT)
+
+    def angle(self, deg):
+        self.write(int(deg * SCALE))
+
+    def off(self):
+        self._set(0)
+
+    def deinit(self):
+        self.pwm.deinit()
+
+
+def bench(servos, frames=500):
+    """把所有舵机来回扫一遍，返回 (每秒写入次数, 每帧写全部舵机的平均 us)"""
+    n = len(servos)
+    writes = [s.write for s in servos]
+    t0 = time.ticks_us()
+    for f in range(frames):
+        pos = (f * 7) % 1800
+        for w in writes:
+            w(pos)
+    us = time.ticks_diff(time.ticks_us(), t0) or 1
+    return frames * n * 1000000 // us, us // frames
@@ -0,0 +1,158 @@
+# base/supervisor.py
+# 看门狗监督：所有登记的任务都在期限内心跳才喂 machine.WDT，否则由看门狗复位芯片
+# - watch(name, deadline_ms)：登记任务；beat(name)：心跳（缺省为当前示例）
+# - 崩溃计数（累计/连续/看门狗复位次数、最后运行的示例）保存在 RTC 内存，软复位和看门狗复位后仍在
+# - backoff_ms()：连续崩溃时重启示例的指数退避时间
+#
+# 注意：ESP32 的 WDT 一旦启动就无法关闭，start() 之后要一直有定时器在喂狗，
+# 因此只在 autorun.json 里配置了 watchdog 时由启动器调用。定时器固定使用 Timer(3)，
+# 避开示例常用的 Timer(0)。
+
+import struct
+import time
+
+try:
+    import machine
+except ImportError:
+    machine = None
+
+from base import log
+
+TIMER_ID = 3
+BACKOFF_BASE_MS = 1000
+BACKOFF_MAX_MS = 60000
+
+_RTC_FMT = "<4sHHH16s"   # magic, 累计崩溃, 连续崩溃, 看门狗复位, 最后运行的示例
+_RTC_MAGIC = b"SUPV"
+
+_wdt = None
+_timer = None
+_tasks = {}      # 任务名 -> [最后心跳 ticks_ms, 期限 ms]
+_current = None  # beat() 缺省的任务名（当前示例）
+_stale = None    # 上一次检查时超时的任务，只在变化时打印
+feeds = 0
+misses = 0
+
+
+def start(timeout_ms=8000, period_ms=1000):
+    """启动看门狗和检查定时器；period_ms 要明显小于 timeout_ms"""
+    global _wdt, _timer
+    if _wdt is not None or machine is None:
+        return
+    _wdt = machine.WDT(timeout=timeout_ms)
+    _timer = machine.Timer(TIMER_ID)
+    _timer.init(period=period_ms, mode=machine.Timer.PERIODIC, callback=_check)
+    log.info("sup", "看门狗已启动: timeout=%dms 检查周期=%dms", timeout_ms, period_ms)
+
+
+def running():
+    return _wdt is not None
+
+
+def watch(name, deadline_ms, current=False):
+    """登记任务，登记时视为刚心跳过；current=True 时 beat() 缺省指向它"""
+    global _current
+    _tasks[name] = [time.ticks_ms(), deadline_ms]
+    if current:
+        _current = name
+
+
+def unwatch(name):
+    global _current
+    _tasks.pop(name, None)
+    if _current == name:
+        _current = None
+
+
+def beat(name=None):
+    """心跳；任务未登记时什么都不做，示例可以无条件调用"""
+    t = _tasks.get(name or _current)
+    if t is not None:
+        t[0] = time.ticks_ms()
+
+
+def _check(_t):
+    global _stale, feeds, misses
+    now = time.ticks_ms()
+    stale = None
+    for name, (last, deadline) in _tasks.items():
+        if time.ticks_diff(now, last) > deadline:
+            stale = name
+            break
+    if stale is None:
+        _wdt.feed()
+        feeds += 1
+    else:
+        misses += 1
+        if stale != _stale:
+            log.warn("sup", "任务 %s 超过期限未心跳，停止喂狗", stale)
+    _stale = stale
+
+
+# ---------- RTC 内存中的崩溃计数 ----------
+
+def _rtc_load():
+    try:
+        raw = machine.RTC().memory()
+        magic, total, consec, wdt, name = struct.unpack(_RTC_FMT, raw[:struct.calcsize(_RTC_FMT)])
+        if magic == _RTC_MAGIC:
+            return [total, consec, wdt, name.rstrip(b"\0").decode()]
+    except (AttributeError, ValueError, TypeError, OSError):
+        pass
+    return [0, 0, 0, ""]
+
+
+def _rtc_save(state):
+    try:
+        name = state[3].encode()[:16]
+        machine.RTC().memory(struct.pack(_RTC_FMT, _RTC_MAGIC, state[0] & 0xFFFF,
+                                         state[1] & 0xFFFF, state[2] & 0xFFFF, name))
+    except (AttributeError, OSError):
+        pass
+
+
+def crash_stats():
+    """(累计崩溃, 连续崩溃, 看门狗复位, 最后运行的示例)"""
+    return tuple(_rtc_load())
+
+
+def boot_check():
+    """开机调用：上次是看门狗复位时计为最后运行示例的一次崩溃，返回连续崩溃次数"""
+    state = _rtc_load()
+    if machine and machine.reset_cause() == machine.WDT_RESET:
+        state[0] += 1
+        state[1] += 1
+        state[2] += 1
+        _rtc_save(state)
+        log.warn("sup", "看门狗复位，最后运行: %s，连续崩溃 %d 次", state[3] or "-", state[1])
+    return state[1]
+
+
+def record_start(name):
+    state = _rtc_load()
+    state[3] = name
+    _rtc_save(state)
+
+
+def record_crash():
+    """记录一次崩溃，返回连续崩溃次数"""
+    state = _rtc_load()
+    state[0] += 1
+    state[1] += 1
+    _rtc_save(state)
+    return state[1]
+
+
+def record_stable():
+    """示例稳定运行后清零连续崩溃次数"""
+    state = _rtc_load()
+    if state[1]:
+        state[1] = 0
+        _rtc_save(state)
+
+
+def backoff_ms(consecutive):
+    """连续崩溃 n 次后的重启等待：1s, 2s, 4s ... 封顶 60s"""
+    if consecutive <= 0:
+        return 0
+    return min(BACKOFF_BASE_MS << min(consecutive - 1, 16), BACKOFF_MAX_MS)
@@ -0,0 +1,152 @@
+# base/workpool.py
+# 固定线程池 + 有界任务队列：替代“每次按键起一个线程”
+# - 线程在 start() 时一次性创建，之后不再为每个任务申请线程栈
+# - 每种任务（kind）同一时刻最多排队/运行一个，重复提交按策略合并：
+#     "drop"  忙时丢弃（默认）
+#     "merge" 运行中再提交则结束后补跑一次，排队中再提交直接合并
+# - stats() 给出每种任务的排队延迟/执行耗时和队列深度
+#
+# ESP32 上 _thread 的锁是带所有权的互斥量，不能由别的线程释放，
+# 所以空闲线程按 POLL_MS 轮询队列，任务延迟的上限约为一个轮询周期。
+
+import time
+import _thread
+
+from base import log
+
+POLL_MS = 10
+
+
+class _Kind:
+    __slots__ = ("submitted", "done", "dropped", "merged", "errors",
+                 "queued", "running", "rerun", "wait_sum", "wait_max", "run_sum", "run_max")
+
+    def __init__(self):
+        self.submitted = self.done = self.dropped = self.merged = self.errors = 0
+        self.queued = self.running = self.rerun = False
+        self.wait_sum = self.wait_max = self.run_sum = self.run_max = 0
+
+
+class WorkerPool:
+    def __init__(self, workers=2, maxlen=4, stack_size=None):
+        self.workers = workers
+        self.maxlen = maxlen
+        self.stack_size = stack_size
+        self.max_depth = 0
+        self.rejected = 0      # 队列满被拒绝的次数
+        self._queue = []       # (kind, fn, 提交时 ticks_ms)
+        self._kinds = {}
+        self._mu = _thread.allocate_lock()
+        self._alive = 0
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        if self.stack_size:
+            _thread.stack_size(self.stack_size)
+        for i in range(self.workers):
+            _thread.start_new_thread(self._worker, (i,))
+        return self
+
+    def stop(self, timeout_ms=5000):
+        """通知线程退出，等待正在执行的任务完成；返回是否全部退出"""
+        self._running = False
+        with self._mu:
+            for kind, _, _ in self._queue:
+                self._kinds[kind].queued = False
+            self._queue = []
+        t0 = time.ticks_ms()
+        while self._alive and time.ticks_diff(time.ticks_ms(), t0) < timeout_ms:
+            time.sleep_ms(POLL_MS)
+        return self._alive == 0
+
+    def submit(self, kind, fn, coalesce="drop"):
+        """提交任务，返回 True 表示已入队（或已合并到正在运行的同类任务）"""
+        with self._mu:
+            k = self._kinds.get(kind)
+            if k is None:
+                k = self._kinds[kind] = _Kind()
+            k.submitted += 1
+            if k.queued or k.running:
+                if coalesce != "merge":
+                    k.dropped += 1
+                    return False
+                if k.running and not k.queued:
+                    k.rerun = True   # 结束后补跑一次
+                k.merged += 1
+                return True
+            if len(self._queue) >= self.maxlen:
+                self.rejected += 1
+                return False
+            self._queue.append((kind, fn, time.ticks_ms()))
+            k.queued = True
+            if len(self._queue) > self.max_depth:
+                self.max_depth = len(self._queue)
+            return True
+
+    def depth(self):
+        return len(self._queue)
+
+    def busy(self, kind):
+        k = self._kinds.get(kind)
+        return bool(k and (k.queued or k.running))
+
+    def _worker(self, idx):
+        with self._mu:
+            self._alive += 1
+        try:
+            while self._running:
+                with self._mu:
+                    job = self._queue.pop(0) if self._queue else None
+                    if job:
+                        k = self._kinds[job[0]]
+                        k.queued = False
+                        k.running = True
+                if job is None:
+                    time.sleep_ms(POLL_MS)
+                    continue
+                self._run(job, k)
+        finally:
+            with self._mu:
+                self._alive -= 1
+
+    def _run(self, job, k):
+        kind, fn, t_submit = job
+        t0 = time.ticks_ms()
+        wait = time.ticks_diff(t0, t_submit)
+        try:
+            fn()
+        except Exception as e:
+            k.errors += 1
+            log.warn("pool", "任务 %s 异常: %r", kind, e)
+        cost = time.ticks_diff(time.ticks_ms(), t0)
+        with self._mu:
+            k.done += 1
+            k.wait_sum += wait
+            k.run_sum += cost
+            if wait > k.wait_max:
+                k.wait_max = wait
+            if cost > k.run_max:
+                k.run_max = cost
+            k.running = False
+            if k.rerun and self._running:
+                # 合并的那次提交：重新排到队尾
+                k.rerun = False
+                k.queued = True
+                self._queue.append((kind, fn, time.ticks_ms()))
+
+    def stats(self):
+        """{kind: {...}}，另含 '_queue': 当前/最大深度和拒绝数"""
+        out = {"_queue": {"depth": len(self._queue), "max_depth": self.max_depth,
+                          "rejected": self.rejected, "workers": self._alive}}
+        for name, k in self._kinds.items():
+            n = k.done or 1
+            out[name] = {
+                "submitted": k.submitted, "done": k.done, "dropped": k.dropped,
+                "merged": k.merged, "errors": k.errors,
+                "wait_avg_ms": k.wait_sum // n, "wait_max_ms": k.wait_max,
+                "run_avg_ms": k.run_sum // n, "run_max_ms": k.run_max,
+            }
+        return out
@@ -1,10 +1,32 @@
 # 在上电启动时执行：把 /base 和 /examples 放进模块搜索路径
 import sys
+import time
+_t0 = time.ticks_us()
 for p in ("/base", "/examples"):
     if p not in sys.path:
         sys.path.append(p)
         print(f"load module {p} done")
+
+# 可选的启动耗时分析：存在 /bootprof 标志文件才启用（内容为 store 时只保存报告）
+try:
+    with open("/bootprof") as _f:
+        _mode = _f.read().strip() or "print"
+except OSError:
+    _mode = None
+if _mode:
+    import bootprof  # 平铺导入，避免过早锁定 base 包的搜索目录
+    bootprof.start(_t0, _mode)
+    bootprof.phase("boot: sys.path")
+
+# 预编译字节码：/mpy 下新鲜的 .mpy 优先于源码（tools/mpy_sync.py 生成）
+import mpycache
+mpycache.install()
+if _mode:
+    bootprof.phase("boot: mpycache")
+
 import esp
 esp.osdebug(None)  # 关掉调试输出，可选
+if _mode:
+    bootprof.phase("boot: esp.osdebug")
 
 print("Boot OK")
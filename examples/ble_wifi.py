@@ -1,3 +1,6 @@
+# META description: BLE WiFi配网系统，手机配置WiFi
+# META pins: BLE广播，无特定GPIO
+# META needs: BLE, WiFi
 import network
 import time
 import bluetooth
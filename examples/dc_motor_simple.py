@@ -1,5 +1,8 @@
 # dc_motor_simple.py
 # ESP32 使用 GPIO15 控制直流电机（单方向 + PWM 调速）
+# META description: 直流电机PWM调速控制
+# META pins: 电机控制:GPIO15
+# META needs: PWM x1
 
 from machine import Pin, PWM
 from base.log import debug, info, warn
@@ -1,6 +1,9 @@
 # i2s_max98357a_final.py
 # 适配2W喇叭的MAX98357A音频播放（测试音+正弦波双模式）
 # 兼容：ESP32_GENERIC/S3/C3/S2 | 喇叭：2W/8Ω（最优）/4Ω（兼容）
+# META description: MAX98357A I2S音频播放，测试音/正弦波
+# META pins: BCLK:26, LRC:25, DIN:22, SD:15
+# META needs: I2S
 
 import math
 import time
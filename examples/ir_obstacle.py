@@ -1,22 +1,23 @@
 # ir_obstacle.py
 # 红外避障模块（TCRT5000 / KY-032） + 日志输出
+# META description: 红外避障检测模块
+# META pins: 红外传感器:GPIO32
+# META needs: 无
 
 from machine import Pin
-import time
 from base.log import debug, info, warn
+from base import runtime
 
 # ======================
 # 配置参数
 # ======================
-IR_PIN = 32          # 红外避障输出引脚
-DEBOUNCE_MS = 50     # 去抖时间（红外模块很快，但反射会抖）
+IR_PIN = 32          # 红外避障输出引脚（反射会抖，交给 base.debounce 统一去抖）
 
 # ======================
 # 初始化引脚
 # ======================
 ir = Pin(IR_PIN, Pin.IN)
 _last_state = ir.value()
-_last_ms = time.ticks_ms()
 
 info("IR", "红外避障模块初始化完成 pin=%d 当前值=%d", IR_PIN, _last_state)
 
@@ -30,28 +31,26 @@ def obstacle_changed(state):
         info("IR", "前方无障碍（HIGH）")
 
 # ======================
-# 主循环逻辑
+# 主协程：等待引脚边沿，不再轮询
 # ======================
-def run():
-    global _last_state, _last_ms
+async def main():
+    global _last_state
 
     info("IR", "开始监控红外避障状态...")
+    runtime.panel("ir", lambda: ("IR: %s" % ("OBSTACLE" if _last_state == 0 else "clear"),))
+    edge = runtime.Edge(ir, debounce=True)
 
     while True:
-        now = time.ticks_ms()
-        state = ir.value()
-
-        # 只有状态变化才处理
+        state, _ = await edge.wait()
+        # 只有状态变化才处理（由 base.debounce 去抖）
         if state != _last_state:
-            # 做去抖
-            if time.ticks_diff(now, _last_ms) > DEBOUNCE_MS:
-                debug("IR", "状态变化: %d -> %d", _last_state, state)
-                _last_state = state
-                obstacle_changed(state)
+            debug("IR", "状态变化: %d -> %d", _last_state, state)
+            _last_state = state
+            obstacle_changed(state)
 
-            _last_ms = now
 
-        time.sleep_ms(20)
+def run():
+    runtime.run(main())
 
 
 # ======================
@@ -1,15 +1,19 @@
 # buttons_thread_demo.py
-# 4 个按键：LED 轮询控制；蜂鸣器 / 呼吸灯 / RGB 通过中断 + 线程执行
+# 4 个按键经 base.debounce 统一去抖：LED 跟随按键；蜂鸣器 / 呼吸灯 / RGB 提交到固定线程池执行
 # 数码管 TM1637 持续递增显示，并打印部分日志
+# META description: 4按键控制：LED轮询、蜂鸣器、呼吸灯、RGB LED
+# META pins: 按键:25,26,27,14 | LED:15 | 蜂鸣器:16 | PWM:4 | RGB:17 | TM1637:18,19
+# META needs: PWM x2, _thread, NeoPixel
 
 import time
 import random
 import neopixel
 import math
-import _thread
 from machine import Pin, PWM
 from tm1637 import TM1637
 from base.log import debug, info, warn   # 使用 base/log.py 的 d/i/w
+from base import debounce, events, resources, scheduler
+from base.workpool import WorkerPool
 
 # ======================
 # 硬件引脚配置
@@ -33,14 +37,13 @@ pwm_led    = PWM(Pin(4), freq=1000, duty=0)
 np         = neopixel.NeoPixel(Pin(17), 1)
 tm         = TM1637(clk=Pin(18), dio=Pin(19))
 
-# 按键去抖（仅对中断按键）
-BTN_DEBOUNCE_MS = 150
-_last_buzzer_ms = 0
-_last_pwm_ms    = 0
-_last_rgb_ms    = 0
+# 线程池：三种任务各占一个线程即可并行，队列只需容纳每种一个
+POOL_WORKERS = 3
+POOL_QUEUE   = 3
+pool = WorkerPool(workers=POOL_WORKERS, maxlen=POOL_QUEUE)
 
 # ======================
-# 功能函数（在线程中执行）
+# 功能函数（在线程池中执行）
 # ======================
 
 def buzzer_3sec():
@@ -90,87 +93,36 @@ def rgb_random_3times():
         info("RGB", "RGB 变色结束")
 
 # ======================
-# 中断回调（IRQ -> 起线程）
+# 按键事件（base.debounce 干净边沿 -> 提交到线程池，忙时丢弃）
 # ======================
 
-# 忙碌标志，防止重复起线程
-_flag_buzzer = False
-_flag_pwm    = False
-_flag_rgb    = False
-
-def _start_thread_safe(flag_name, target):
-    """根据标志位安全启动新线程"""
-    global _flag_buzzer, _flag_pwm, _flag_rgb
-
-    if flag_name == "buzzer":
-        if _flag_buzzer:
-            return
-        _flag_buzzer = True
-    elif flag_name == "pwm":
-        if _flag_pwm:
-            return
-        _flag_pwm = True
-    elif flag_name == "rgb":
-        if _flag_rgb:
-            return
-        _flag_rgb = True
-
-    def wrapper():
-        try:
-            target()
-        finally:
-            global _flag_buzzer, _flag_pwm, _flag_rgb
-            if flag_name == "buzzer":
-                _flag_buzzer = False
-            elif flag_name == "pwm":
-                _flag_pwm = False
-            elif flag_name == "rgb":
-                _flag_rgb = False
-            debug("THREAD", "%s 线程结束，标志位已清零" % flag_name)
-
-    try:
-        _thread.start_new_thread(wrapper, ())
-        debug("THREAD", "启动 %s 线程" % flag_name)
-    except Exception as e:
-        warn("THREAD", "启动 %s 线程失败: %r" % (flag_name, e))
-        if flag_name == "buzzer":
-            _flag_buzzer = False
-        elif flag_name == "pwm":
-            _flag_pwm = False
-        elif flag_name == "rgb":
-            _flag_rgb = False
-
-def buzzer_irq(pin):
-    global _last_buzzer_ms
-    now = time.ticks_ms()
-    if time.ticks_diff(now, _last_buzzer_ms) < BTN_DEBOUNCE_MS:
-        return
-    _last_buzzer_ms = now
-    debug("IRQ", "蜂鸣器按键触发")
-    _start_thread_safe("buzzer", buzzer_3sec)
-
-def pwm_irq(pin):
-    global _last_pwm_ms
-    now = time.ticks_ms()
-    if time.ticks_diff(now, _last_pwm_ms) < BTN_DEBOUNCE_MS:
-        return
-    _last_pwm_ms = now
-    debug("IRQ", "呼吸灯按键触发")
-    _start_thread_safe("pwm", breathing_3sec)
-
-def rgb_irq(pin):
-    global _last_rgb_ms
-    now = time.ticks_ms()
-    if time.ticks_diff(now, _last_rgb_ms) < BTN_DEBOUNCE_MS:
-        return
-    _last_rgb_ms = now
-    debug("IRQ", "RGB 按键触发")
-    _start_thread_safe("rgb", rgb_random_3times)
-
-# 绑定中断
-btn_buzzer.irq(trigger=Pin.IRQ_FALLING, handler=buzzer_irq)
-btn_pwm.irq(trigger=Pin.IRQ_FALLING, handler=pwm_irq)
-btn_rgb.irq(trigger=Pin.IRQ_FALLING, handler=rgb_irq)
+def _submit(kind, target):
+    if pool.submit(kind, target):
+        debug("POOL", "提交 %s，队列深度=%d" % (kind, pool.depth()))
+    else:
+        debug("POOL", "%s 忙，丢弃本次按键" % kind)
+
+def _on_press(kind, target, label):
+    def handler(level, ts_us):
+        if level == 0:  # 按下
+            debug("KEY", "%s按键触发" % label)
+            _submit(kind, target)
+    return handler
+
+def _on_led_btn(level, ts_us):
+    # 按下点亮，松开熄灭
+    if level == 0:
+        led_pin.on()
+        debug("KEY", "LED 点亮")
+    else:
+        led_pin.off()
+        debug("KEY", "LED 熄灭")
+
+# 登记按键
+events.subscribe(debounce.add(BTN_LED_PIN, name="LED"), _on_led_btn)
+events.subscribe(debounce.add(BTN_BUZZER_PIN, name="BUZZER"), _on_press("buzzer", buzzer_3sec, "蜂鸣器"))
+events.subscribe(debounce.add(BTN_PWM_PIN, name="PWM"), _on_press("pwm", breathing_3sec, "呼吸灯"))
+events.subscribe(debounce.add(BTN_RGB_PIN, name="RGB"), _on_press("rgb", rgb_random_3times, "RGB "))
 
 # ======================
 # 初始化状态
@@ -181,45 +133,48 @@ np[0] = (0, 0, 0)
 np.write()
 tm.number(0)
 
-info("MAIN", "系统启动（中断 + 线程版）")
+info("MAIN", "系统启动（统一去抖 + 线程池版）")
 info("MAIN", "按键：LED=%d, BUZZER=%d, PWM=%d, RGB=%d" %
      (BTN_LED_PIN, BTN_BUZZER_PIN, BTN_PWM_PIN, BTN_RGB_PIN))
 
 # ======================
-# 主循环：LED 轮询 + 数码管递增 + 心跳日志
+# 主循环：数码管递增；心跳日志由 base.scheduler 每秒执行
 # ======================
 
+_n = 0
+
+def _print_pool_stats():
+    for kind, st in pool.stats().items():
+        info("POOL", "%s %s" % (kind, st))
+
+
+def _heartbeat():
+    msg = "n=%d buzzer_busy=%d pwm_busy=%d rgb_busy=%d queue=%d led_btn=%d" % (
+        _n, pool.busy("buzzer"), pool.busy("pwm"), pool.busy("rgb"),
+        pool.depth(), debounce.value(BTN_LED_PIN)
+    )
+    info("HB", msg)
+
+
 def run():
-    n = 0
-    last_led_state = btn_led.value()
-    last_hb = time.ticks_ms()
-
-    while True:
-        # LED 按键轮询控制（按下点亮，松开熄灭）
-        curr_led_state = btn_led.value()
-        if curr_led_state != last_led_state:
-            if curr_led_state == 0:
-                led_pin.on()
-                debug("MAIN", "LED 点亮")
-            else:
-                led_pin.off()
-                debug("MAIN", "LED 熄灭")
-            last_led_state = curr_led_state
-
-        # 数码管递增显示（0~9999）
-        tm.number(n)
-        n = (n + 1) % 10000
-
-        # 每秒打印一次心跳
-        now = time.ticks_ms()
-        if time.ticks_diff(now, last_hb) >= 1000:
-            last_hb = now
-            msg = "n=%d buzzer_busy=%d pwm_busy=%d rgb_busy=%d led_btn=%d" % (
-                n, _flag_buzzer, _flag_pwm, _flag_rgb, curr_led_state
-            )
-            info("HB", msg)
-
-        time.sleep_ms(100)
+    global _n
+
+    pool.start()
+    resources.register(pool, pool.stop)
+    hb = scheduler.every(1000, _heartbeat)
+
+    try:
+        while True:
+            # 数码管递增显示（0~9999）
+            tm.number(_n)
+            _n = (_n + 1) % 10000
+
+            time.sleep_ms(100)
+    finally:
+        info("HB", "心跳任务: %s" % hb.stats())
+        hb.cancel()
+        pool.stop()
+        _print_pool_stats()
 
 
 if __name__ == "__main__":
@@ -1,22 +1,24 @@
 # pir_sensor.py
 # ESP32 + HC-SR501 / SR602 人体红外感应模块
 # 输出高电平 = 检测到人体移动
+# META description: HC-SR501/SR602人体红外感应模块检测
+# META pins: PIR传感器:GPIO32
+# META needs: 无
 
 from machine import Pin
-import time
 from base.log import debug, info, warn
+from base import runtime
 
 # ======================
 # 配置模块
 # ======================
 PIR_PIN = 32        # 人体感应输出引脚
-DEBOUNCE_MS = 200   # 去抖，人体模块本身慢，一般 200ms 足够
+# 去抖交给 base.debounce（输出本身是干净的数字电平，20ms 足够）
 
 # ======================
 # 初始化硬件
 # ======================
 pir = Pin(PIR_PIN, Pin.IN)
-_last_ms = 0
 _last_state = pir.value()
 
 info("PIR", "人体感应模块已初始化 pin=%d 当前状态=%d", PIR_PIN, _last_state)
@@ -31,28 +33,26 @@ def pir_changed(new_state):
         info("PIR", "人体离开，恢复静止 (LOW)")
 
 # ======================
-# 主循环：监控 PIR 状态
+# 主协程：等待 PIR 电平变化
 # ======================
-def run():
-    global _last_ms, _last_state
+async def main():
+    global _last_state
 
     info("PIR", "开始监控人体感应数据...")
+    runtime.panel("pir", lambda: ("PIR: %s" % ("MOTION" if _last_state else "idle"),))
+    edge = runtime.Edge(pir, debounce=True)
 
     while True:
-        now = time.ticks_ms()
-        state = pir.value()
-
-        # 状态变化才处理
+        state, _ = await edge.wait()
+        # 状态变化才处理（由 base.debounce 去抖）
         if state != _last_state:
-            # 去抖判断
-            if time.ticks_diff(now, _last_ms) > DEBOUNCE_MS:
-                debug("PIR", "状态变化: %d -> %d", _last_state, state)
-                _last_state = state
-                pir_changed(state)
+            debug("PIR", "状态变化: %d -> %d", _last_state, state)
+            _last_state = state
+            pir_changed(state)
 
-            _last_ms = now
 
-        time.sleep_ms(50)
+def run():
+    runtime.run(main())
 
 # ======================
 # 运行本文件时自动启动
@@ -1,15 +1,22 @@
 
-# K1 长按 -> GPIO15 锁存，HC-SR04 非阻塞声波测距 + 统一 Screen 显示
+# HC-SR04 非阻塞声波测距 + base.runtime 显示面板，四键手势（base.gesture）：
+#   K1 长按 -> GPIO15 锁存，K1 双击 -> 解除锁存
+#   K2 单击 -> 冻结/恢复读数
+#   K3 / K4 单击或长按连发 -> 近距报警阈值 +1 / -1 cm
+# META description: HC-SR04超声波测距，四键手势：锁存/冻结/报警阈值
+# META pins: 按键:25,26,27,14 | 锁存输出:15 | 超声波:TRIG-22, ECHO-21
+# META needs: OLED(I2C0)
 
 import time
 import micropython
-from machine import Pin, Timer
-from base.display import screen  # 使用你封装好的 Screen
+from machine import Pin
+from base import events, gesture, runtime
 
 micropython.alloc_emergency_exception_buf(128)
 
 # 硬件参数
-BTN_PINS       = (25, 26, 27, 14)  # 四键保留，K1 = 第一个
+BTN_PINS       = (25, 26, 27, 14)  # K1..K4
+BTN_NAMES      = ("K1", "K2", "K3", "K4")
 
 LATCH_OUT_PIN  = 15
 TRIG_PIN       = 22
@@ -17,24 +24,22 @@ ECHO_PIN       = 21
 
 MEAS_PERIOD_MS = 100
 LONG_PRESS_MS  = 1200
-DEBOUNCE_MS    = 30
+DOUBLE_MS      = 300
+REPEAT_MS      = 150
+ALARM_MIN_CM   = 2
+ALARM_MAX_CM   = 400
 
-# 按键及锁存
-buttons   = [Pin(p, Pin.IN, Pin.PULL_UP) for p in BTN_PINS]
-btn1      = buttons[0]
+# 锁存输出
 latch_out = Pin(LATCH_OUT_PIN, Pin.OUT, value=0)
 
 # 超声波
 trig  = Pin(TRIG_PIN, Pin.OUT, value=0)
 echo  = Pin(ECHO_PIN, Pin.IN)
-timer = Timer(0)
 
-# K1 状态
-_last_raw     = btn1.value()
-_stable       = _last_raw
-_change_time  = time.ticks_ms()
-_press_start  = None
+# 按键状态
 _latched      = False
+_hold         = False   # 冻结读数
+_alarm_cm     = 20
 
 # 测距状态
 _t_start      = 0
@@ -42,7 +47,7 @@ _has_start    = False
 _distance_cm  = None
 
 
-def _timer_cb(_t):
+def _trigger():
     # 产生约 10us 脉冲
     trig.off()
     trig.on()
@@ -51,59 +56,63 @@ def _timer_cb(_t):
     trig.off()
 
 
-def _echo_irq(pin):
+def _on_echo(value, ts_us):
+    # 时间戳是中断发生时刻，分发延迟不影响测距
     global _t_start, _has_start, _distance_cm
-    if pin.value():  # 上升沿
-        _t_start = time.ticks_us()
+    if value:  # 上升沿
+        _t_start = ts_us
         _has_start = True
     elif _has_start:  # 下降沿
-        dt = time.ticks_diff(time.ticks_us(), _t_start)  # us
-        _distance_cm = dt * 0.01715  # 声速换算 cm
+        dt = time.ticks_diff(ts_us, _t_start)  # us
+        if not _hold:
+            _distance_cm = dt * 0.01715  # 声速换算 cm
         _has_start = False
 
 
-def _update_key1():
-    global _last_raw, _stable, _change_time, _press_start, _latched
+def _clamp_alarm(v):
+    return max(ALARM_MIN_CM, min(ALARM_MAX_CM, v))
 
-    raw = btn1.value()
-    now = time.ticks_ms()
 
-    # 去抖：检测原始跳变
-    if raw != _last_raw:
-        _last_raw = raw
-        _change_time = now
-
-    # 超过去抖时间后，更新稳态
-    if time.ticks_diff(now, _change_time) > DEBOUNCE_MS and raw != _stable:
-        _stable = raw
-        if raw == 0:        # 按下
-            _press_start = now
-        else:               # 松开
-            _press_start = None
-
-    # 长按触发锁存
-    if _stable == 0 and not _latched and _press_start is not None:
-        if time.ticks_diff(now, _press_start) >= LONG_PRESS_MS:
+def _on_key(name, g):
+    global _latched, _hold, _alarm_cm
+    if name == "K1":
+        if g == gesture.LONG and not _latched:
             latch_out.on()
             _latched = True
+        elif g == gesture.DOUBLE and _latched:
+            latch_out.off()
+            _latched = False
+    elif name == "K2" and g == gesture.CLICK:
+        _hold = not _hold
+    elif name in ("K3", "K4") and g in (gesture.CLICK, gesture.LONG, gesture.REPEAT):
+        _alarm_cm = _clamp_alarm(_alarm_cm + (1 if name == "K3" else -1))
 
 
-def _update_screen():
+def _lines():
     status = "LATCH ON" if _latched else "READY"
+    alarm = "Alarm < %d cm" % _alarm_cm
     if _distance_cm is None:
-        screen.show_lines(status, "Measuring...")
-    else:
-        screen.show_lines(status, "Distance: %.2f cm" % _distance_cm)
+        return status, "Measuring...", alarm
+    near = " NEAR!" if _distance_cm < _alarm_cm else ""
+    return (status + (" HOLD" if _hold else ""),
+            "Distance: %.2f cm" % _distance_cm, alarm + near)
 
 
-def run():
-    echo.irq(trigger=Pin.IRQ_RISING | Pin.IRQ_FALLING, handler=_echo_irq)
-    timer.init(mode=Timer.PERIODIC, period=MEAS_PERIOD_MS, callback=_timer_cb)
+async def main():
+    events.subscribe(events.pin_source(echo, Pin.IRQ_RISING | Pin.IRQ_FALLING, "ECHO"), _on_echo)
+    # 按键只在边沿和手势计时到点时处理，不再周期扫描
+    gesture.Button(BTN_PINS[0], _on_key, name="K1", long_ms=LONG_PRESS_MS, double_ms=DOUBLE_MS)
+    gesture.Button(BTN_PINS[1], _on_key, name="K2", long_ms=0)
+    for i in (2, 3):
+        gesture.Button(BTN_PINS[i], _on_key, name=BTN_NAMES[i],
+                       long_ms=LONG_PRESS_MS // 2, repeat_ms=REPEAT_MS)
+    runtime.panel("sonar", _lines)
+    # 触发测距是事件循环里的周期任务，不再占用硬件定时器
+    await runtime.every(MEAS_PERIOD_MS, _trigger)
 
-    while True:
-        _update_key1()
-        _update_screen()
-        time.sleep_ms(60)
+
+def run():
+    runtime.run(main())
 
 
 if __name__ == "__main__":
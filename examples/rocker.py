@@ -1,4 +1,7 @@
 # 摇杆
+# META description: PS2摇杆模拟输入检测
+# META pins: VRX:GPIO34, VRY:GPIO35, SW:GPIO32
+# META needs: ADC x2
 import time
 from machine import Pin, ADC
 
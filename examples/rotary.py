@@ -1,11 +1,15 @@
 # encoder_oled_min.py
 # ESP32 旋钮编码器：SW=GPIO19, DT=GPIO21, CLK=GPIO22
-# CLK 下降沿 IRQ 判方向 + SW IRQ 去抖；通过 base.display 的 screen 显示
+# CLK 下降沿经 base.events 总线（中断里同时采 DT）判方向 + SW 经 base.debounce 去抖；
+# 通过 base.runtime 的显示面板显示
+# META description: 旋钮编码器控制，通过中断检测旋转和按键
+# META pins: SW=GPIO19, DT=GPIO21, CLK=GPIO22
+# META needs: OLED(I2C0)
 
 import time
 import micropython
 from machine import Pin
-from base.display import screen  # 统一屏幕/串口输出
+from base import events, runtime
 
 micropython.alloc_emergency_exception_buf(128)
 
@@ -19,8 +23,6 @@ STEP                = 1          # 每一“格”的步进
 MIN_VAL             = -100       # 最小值
 MAX_VAL             =  100       # 最大值
 CLK_MIN_INTERVAL_US = 1500       # CLK 边沿最小间隔(去抖)
-SW_DEBOUNCE_MS      = 80         # SW 按键去抖
-SCREEN_REFRESH_MS   = 60         # 屏幕刷新节流
 
 # ========= 硬件对象 =========
 sw  = Pin(PIN_SW,  Pin.IN, Pin.PULL_UP)   # 按下=0
@@ -34,7 +36,6 @@ ccw_count      = 0
 sw_press_count = 0
 
 last_clk_us = 0
-last_sw_ms  = 0
 sw_state    = 1  # 1=未按, 0=按下
 
 
@@ -47,16 +48,15 @@ def _clamp(v):
     return v
 
 
-# ========= IRQ =========
-def _clk_irq(pin):
-    # 仅在 CLK 的下降沿处理，方向由 DT 电平决定
+# ========= CLK 事件 =========
+def _on_clk(dt_value, ts_us):
+    # 仅在 CLK 的下降沿处理，方向由中断发生时的 DT 电平决定
     global val, cw_count, ccw_count, last_clk_us
-    now = time.ticks_us()
-    if time.ticks_diff(now, last_clk_us) < CLK_MIN_INTERVAL_US:
+    if time.ticks_diff(ts_us, last_clk_us) < CLK_MIN_INTERVAL_US:
         return
-    last_clk_us = now
+    last_clk_us = ts_us
 
-    if dt.value():          # DT=1 一个方向
+    if dt_value:            # DT=1 一个方向
         val = _clamp(val + STEP)
         cw_count += 1
     else:                   # DT=0 反方向
@@ -64,33 +64,29 @@ def _clk_irq(pin):
         ccw_count += 1
 
 
-def _sw_irq(pin):
-    # SW 按下接地：下降沿表示“按下”
-    global last_sw_ms, sw_press_count, sw_state, val
-    now = time.ticks_ms()
-    if time.ticks_diff(now, last_sw_ms) < SW_DEBOUNCE_MS:
-        return
-    last_sw_ms = now
-
-    raw = pin.value()
-    # 按下沿：清零计数
-    if raw == 0 and sw_state == 1:
-        sw_state = 0
-        sw_press_count += 1
-        val = 0
-    # 松开沿：恢复状态
-    elif raw == 1 and sw_state == 0:
-        sw_state = 1
+# 中断里只把 DT 电平和时间戳写进总线，方向判断在主线程
+events.subscribe(events.pin_source(clk, Pin.IRQ_FALLING, "CLK", read=dt.value), _on_clk)
 
 
-# 绑定中断
-clk.irq(trigger=Pin.IRQ_FALLING, handler=_clk_irq)
-sw.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=_sw_irq)
+# ========= SW 协程 =========
+async def _sw_task():
+    global sw_press_count, sw_state, val
+    edge = runtime.Edge(sw, Pin.IRQ_FALLING | Pin.IRQ_RISING, debounce=True)
+    while True:
+        raw, _ = await edge.wait()
+        # 按下沿：清零计数
+        if raw == 0 and sw_state == 1:
+            sw_state = 0
+            sw_press_count += 1
+            val = 0
+        # 松开沿：恢复状态
+        elif raw == 1 and sw_state == 0:
+            sw_state = 1
 
 
 # ========= 显示 =========
-def _update_screen():
-    screen.show_lines(
+def _lines():
+    return (
         "Rotary Encoder",
         "VAL: %d" % val,
         "CW/CCW: %d/%d" % (cw_count, ccw_count),
@@ -99,20 +95,15 @@ def _update_screen():
 
 
 # ========= 主程序 =========
-def run():
+async def main():
     global last_clk_us
     last_clk_us = time.ticks_us()
+    runtime.panel("rotary", _lines)
+    await _sw_task()
 
-    last_screen = time.ticks_ms()
-    _update_screen()
 
-    while True:
-        now = time.ticks_ms()
-        if time.ticks_diff(now, last_screen) >= SCREEN_REFRESH_MS:
-            _update_screen()
-            last_screen = now
-
-        time.sleep_ms(2)
+def run():
+    runtime.run(main())
 
 
 if __name__ == "__main__":
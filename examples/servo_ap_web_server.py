@@ -1,11 +1,15 @@
 # servo_ap_web_server.py
 # ESP32 热点 + Web服务器 控制舵机
+# META description: WiFi热点+Web页面控制舵机角度
+# META pins: 舵机PWM:GPIO27
+# META needs: WiFi AP, PWM x1
 
 import network
 import time
 import socket
-from machine import Pin, PWM
 from base.log import debug, info, warn
+from base.servo import Servo
+from base import supervisor
 
 # ======================
 # 配置舵机参数
@@ -16,15 +20,14 @@ MIN_US = 500            # 0° 脉宽 0.5ms
 MAX_US = 2500           # 180° 脉宽 2.5ms
 
 
-# ESP32 PWM 通道：duty范围 0~1023
-PWM_MAX = 1023
-
 # ======================
 # 配置热点AP参数
 # ======================
 AP_SSID = "ESP32-Servo-Controller"
 AP_PASSWORD = "12345678"
 AP_CHANNEL = 11
+ACCEPT_TIMEOUT_S = 1
+CLIENT_TIMEOUT_S = 3
 
 # 舵机预设角度
 SERVO_ANGLES = [0, 45, 90, 135]  # 4个预设角度
@@ -32,26 +35,16 @@ SERVO_ANGLES = [0, 45, 90, 135]  # 4个预设角度
 # ======================
 # 舵机初始化
 # ======================
-servo = PWM(Pin(SERVO_PIN), freq=FREQ, duty=0)
+# 角度 -> duty_u16 的换算在构造时预先算好，写入时只做整数运算
+servo = Servo(SERVO_PIN, min_us=MIN_US, max_us=MAX_US, freq=FREQ)
 info("SERVO", "舵机已初始化: pin=%d freq=%dHz", SERVO_PIN, FREQ)
 
-# ======================
-# 工具函数：角度转 duty
-# ======================
-def angle_to_duty(angle):
-    angle = max(0, min(180, angle))
-    us = MIN_US + (MAX_US - MIN_US) * angle / 180
-    duty = int(PWM_MAX * us / 20000)  # 20ms = 20000us
-    debug("CALC", "角度=%d° -> us=%d -> duty=%d", angle, us, duty)
-    return duty
-
 # ======================
 # 设置舵机角度
 # ======================
 def servo_angle(angle):
-    duty = angle_to_duty(angle)
-    servo.duty(duty)
-    info("SERVO", "设置角度=%d° duty=%d", angle, duty)
+    servo.angle(angle)
+    info("SERVO", "设置角度=%d° duty_u16=%d", angle, servo.duty(angle * 10))
     time.sleep_ms(400)  # 舵机需要时间移动
 
 # ======================
@@ -269,6 +262,8 @@ def start_web_server(port=80):
     server = socket.socket()
     server.bind(addr)
     server.listen(1)
+    # accept 每秒超时一次用来给看门狗心跳，否则空闲等连接会被当成卡死
+    server.settimeout(ACCEPT_TIMEOUT_S)
 
     info("SERVER", "Web服务器已启动: 端口=%d", port)
     print(f"Web服务器监听端口: {port}")
@@ -304,8 +299,13 @@ def run():
         # 4. 主循环处理请求
         info("MAIN", "进入主循环，等待客户端连接")
         while True:
+            supervisor.beat()
             try:
                 client, addr = server.accept()
+            except OSError:
+                continue  # accept 超时，回到循环顶部心跳
+            try:
+                client.settimeout(CLIENT_TIMEOUT_S)  # 慢客户端不能拖住主循环
                 info("MAIN", "客户端连接: %s", str(addr))
 
                 # 接收请求数据
@@ -328,7 +328,7 @@ def run():
             server.close()
         if 'ap' in locals():
             ap.active(False)
-        servo.duty(0)  # 关闭舵机信号
+        servo.off()  # 关闭舵机信号
         info("MAIN", "服务器已关闭")
 
 # ======================
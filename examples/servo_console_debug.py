@@ -1,5 +1,8 @@
 # servo_console_debug.py
 # ESP32 控制台调试360度舵机
+# META description: 360度舵机控制台调试（速度/方向/角度）
+# META pins: 舵机PWM:GPIO27
+# META needs: PWM x1
 
 import time
 from machine import Pin, PWM
@@ -1,15 +1,22 @@
 # spider_robot_servo_debug.py
 # ESP32 12舵机4足蜘蛛机器人调试代码
+# 动作由 base.motion 驱动：12 个舵机在 50Hz 帧里同时插值，speed_ms 就是整个动作的时长
+# 姿势和步态是关键帧表（GAIT_TABLES / flash 上的 /gaits 文件），由 base.gait 播放
+# META description: 12舵机4足蜘蛛机器人调试（姿势/步态）
+# META pins: FL:13,14,16 | FR:17,18,19 | BL:21,22,23 | BR:25,26,27
+# META needs: PWM x12
 
+import os
 import time
-from machine import Pin, PWM
+from base import gait
 from base.log import debug, info, warn
+from base.motion import Motion, SCALE
+from base.servo import Servo, bench
 
 # ======================
 # 蜘蛛机器人舵机配置
 # ======================
 FREQ = 50               # 舵机固定频率 50Hz
-PWM_MAX = 1023         # ESP32 PWM 通道：duty范围 0~1023
 
 # 180度舵机脉宽参数（根据实际舵机调试）
 MIN_US = 1000          # 最小脉宽 1.0ms (0度)
@@ -48,8 +55,13 @@ ANGLE_LIMITS = {
     'KNEE': {'min': 60, 'max': 120}      # 膝关节角度限制
 }
 
+LEGS = ('FL', 'FR', 'BL', 'BR')
+JOINTS = ('HIP', 'THIGH', 'KNEE')
+SERVO_KEYS = [f"{leg}_{joint}" for leg in LEGS for joint in JOINTS]
+
 # 初始化舵机对象
 servos = {}
+motion = None   # base.motion.Motion，通道顺序同 SERVO_KEYS
 
 # 创建GPIO引脚到舵机标识的反向映射
 GPIO_TO_SERVO = {}
@@ -68,33 +80,26 @@ def init_servos():
         for joint_name, pin in leg_config.items():
             servo_key = f"{leg_name}_{joint_name}"
             try:
-                servos[servo_key] = PWM(Pin(pin), freq=FREQ, duty=0)
+                # 限位和 角度->duty_u16 换算按关节预先算好，写入路径只有整数运算
+                limits = ANGLE_LIMITS[joint_name]
+                servos[servo_key] = Servo(pin, min_us=MIN_US, max_us=MAX_US,
+                                          lo=limits['min'], hi=limits['max'], freq=FREQ)
                 info("SERVO", "舵机已初始化: %s -> GPIO%d", servo_key, pin)
             except Exception as e:
                 warn("SERVO", "舵机初始化失败: %s -> GPIO%d, 错误: %s", servo_key, pin, str(e))
 
+    global motion, player
+    motion = Motion([servos[key].write if key in servos else _skip for key in SERVO_KEYS],
+                    names=SERVO_KEYS)
+    player = gait.Player(motion)
+    load_gaits()
+
     info("INIT", "舵机初始化完成，共%d个舵机", len(servos))
     return len(servos) == 12
 
-# ======================
-# 工具函数：角度转 duty
-# ======================
-def angle_to_duty(angle, joint_type):
-    """
-    角度转换为PWM duty
-    angle: 0-180度
-    joint_type: 关节类型 (HIP, THIGH, KNEE)
-    """
-    # 应用角度限制
-    limits = ANGLE_LIMITS.get(joint_type, {'min': 0, 'max': 180})
-    angle = max(limits['min'], min(limits['max'], angle))
-
-    # 角度转换为脉宽
-    us = MIN_US + (MAX_US - MIN_US) * angle / 180
-    duty = int(PWM_MAX * us / 20000)  # 20ms = 20000us
-
-    debug("CALC", "%s关节: 角度=%d° -> 脉宽=%.1fus -> duty=%d", joint_type, angle, us, duty)
-    return duty
+def _skip(pos):
+    """初始化失败的舵机：运动引擎照常插值，但不写输出"""
+    pass
 
 # ======================
 # 单个舵机控制
@@ -120,6 +125,24 @@ def format_servo_key_with_pin(servo_key):
         return f"{servo_key}(GPIO{pin})"
     return servo_key
 
+def move_servos(targets, speed_ms=0, wait=True):
+    """
+    多个舵机同时插值到目标角度
+    targets: {"FL_HIP": 角度, ...}，或 {'FL': {'HIP': 角度, ...}, ...}
+    speed_ms: 整个动作的时长(毫秒)，0表示立即设置
+    wait: False 时立即返回，可用 motion.wait() / await motion.done() 等待
+    """
+    flat = {}
+    for key, value in targets.items():
+        if isinstance(value, dict):
+            for joint, angle in value.items():
+                flat[f"{key}_{joint}"] = angle
+        else:
+            flat[key] = value
+    motion.move(flat, speed_ms)
+    if wait:
+        motion.wait(sleep=time.sleep_ms)
+
 def set_servo_angle(leg, joint, angle, speed_ms=0):
     """
     设置单个舵机角度
@@ -136,16 +159,9 @@ def set_servo_angle(leg, joint, angle, speed_ms=0):
         return False
 
     try:
-        duty = angle_to_duty(angle, joint)
-
-        if speed_ms > 0:
-            # 平滑移动（简化版本，实际应用中需要更复杂的插值）
-            servos[servo_key].duty(duty)
-            time.sleep(speed_ms / 1000.0)
-        else:
-            servos[servo_key].duty(duty)
-
-        debug("SERVO", "设置舵机: %s 角度=%d° duty=%d", servo_info, angle, duty)
+        move_servos({servo_key: angle}, speed_ms)
+        debug("SERVO", "设置舵机: %s 角度=%d° duty_u16=%d", servo_info, angle,
+              servos[servo_key].duty(int(angle * SCALE)))
         return True
 
     except Exception as e:
@@ -157,32 +173,141 @@ def set_servo_angle(leg, joint, angle, speed_ms=0):
 # ======================
 def set_leg_angles(leg, hip_angle=None, thigh_angle=None, knee_angle=None, speed_ms=0):
     """
-    同时控制一条腿的三个关节
-    leg: 腿部标识 (FL, FR, BL, BR)
+    同时控制一条（或几条）腿的三个关节，所有关节一起运动
+    leg: 腿部标识 (FL, FR, BL, BR)，或标识的元组，如 ('FL', 'BR')
     speed_ms: 移动时间(毫秒)
     """
-    success_count = 0
+    legs = (leg,) if isinstance(leg, str) else leg
+    targets = {}
     angle_parts = []
 
-    if hip_angle is not None:
-        if set_servo_angle(leg, 'HIP', hip_angle, speed_ms):
-            success_count += 1
-            angle_parts.append(f"HIP:{hip_angle}°")
+    for joint, angle in (('HIP', hip_angle), ('THIGH', thigh_angle), ('KNEE', knee_angle)):
+        if angle is None:
+            continue
+        angle_parts.append(f"{joint}:{angle}°")
+        for l in legs:
+            if f"{l}_{joint}" in servos:
+                targets[f"{l}_{joint}"] = angle
 
-    if thigh_angle is not None:
-        if set_servo_angle(leg, 'THIGH', thigh_angle, speed_ms):
-            success_count += 1
-            angle_parts.append(f"THIGH:{thigh_angle}°")
+    if targets:
+        move_servos(targets, speed_ms)
+        debug("LEG", "%s腿设置角度: %s (耗时%dms)", "+".join(legs), ", ".join(angle_parts), speed_ms)
 
-    if knee_angle is not None:
-        if set_servo_angle(leg, 'KNEE', knee_angle, speed_ms):
-            success_count += 1
-            angle_parts.append(f"KNEE:{knee_angle}°")
+    return len(targets)
+
+# ======================
+# 姿势与步态表（数据而不是代码，由 base.gait 播放）
+# ======================
+# 每行: (过渡时长ms, FL, FR, BL, BR)，每条腿 (HIP, THIGH, KNEE)，None 表示不动。
+# 时长是名义值，播放时按 speed_ms 整体缩放；/gaits 下的同名文件会覆盖这里的表。
+GAIT_DIR = '/gaits'
+
+STAND = (90, 90, 90)
+SIT = (90, 90, 120)
+CROUCH = (90, 120, 60)
+FORWARD = (90, 60, 100)
+BACKWARD = (90, 120, 80)
+LIFT = (None, 45, 60)      # 抬腿：大腿前摆、膝关节伸直
+DOWN = (None, 90, 90)      # 放腿：回到站立位置
+_ = (None, None, None)
+
+GAIT_TABLES = {
+    'stand':    [(1000, STAND, STAND, STAND, STAND)],
+    'sit':      [(1000, SIT, SIT, SIT, SIT)],
+    'crouch':   [(1000, CROUCH, CROUCH, CROUCH, CROUCH)],
+    'forward':  [(800, FORWARD, FORWARD, FORWARD, FORWARD)],
+    'backward': [(800, BACKWARD, BACKWARD, BACKWARD, BACKWARD)],
+    'left_up':  [(600, LIFT, _, LIFT, _)],
+    'diagonal_up': [(600, LIFT, _, _, LIFT)],
+    # 单腿一步（FL），其它腿用通道交换得到
+    'step':     [(250, LIFT, _, _, _), (500, _, _, _, _),
+                 (250, DOWN, _, _, _), (500, _, _, _, _)],
+    # 对角两组轮流，一个循环两步
+    'tripod':   [(400, LIFT, _, _, LIFT), (800, _, _, _, _),
+                 (400, DOWN, _, _, DOWN), (800, _, _, _, _),
+                 (400, _, LIFT, LIFT, _), (800, _, _, _, _),
+                 (400, _, DOWN, DOWN, _), (800, _, _, _, _)],
+    # 左侧腿向后、右侧腿向前，再回站立；右转是它的左右镜像
+    'turn_left': [(600, BACKWARD, FORWARD, BACKWARD, FORWARD),
+                  (600, STAND, STAND, STAND, STAND)],
+}
+
+gaits = {}      # 名字 -> base.gait.Gait
+player = None   # base.gait.Player
+
+
+def _table_to_gait(name, rows):
+    flat = []
+    for row in rows:
+        r = [row[0]]
+        for leg in row[1:]:
+            r.extend(leg)
+        flat.append(r)
+    return gait.frames(len(SERVO_KEYS), flat, name)
+
+
+def _leg_perm(pairs):
+    """通道置换：pairs 中每对腿互换三个关节的数据"""
+    perm = list(range(len(SERVO_KEYS)))
+    n = len(JOINTS)
+    for a, b in pairs:
+        ia, ib = LEGS.index(a) * n, LEGS.index(b) * n
+        for j in range(n):
+            perm[ia + j], perm[ib + j] = ib + j, ia + j
+    return perm
+
+
+# 左右镜像：FL<->FR、BL<->BR（各关节角度定义两侧一致，不需要反转角度）
+MIRROR_LR = (_leg_perm((('FL', 'FR'), ('BL', 'BR'))), ())
 
-    if angle_parts:
-        debug("LEG", "%s腿设置角度: %s (耗时%dms)", leg, ", ".join(angle_parts), speed_ms)
 
-    return success_count
+def load_gaits():
+    """内置表 + GAIT_DIR 下的 .gait（二进制）/ .txt（文本）文件"""
+    gaits.clear()
+    for name, rows in GAIT_TABLES.items():
+        gaits[name] = _table_to_gait(name, rows)
+    try:
+        files = os.listdir(GAIT_DIR)
+    except OSError:
+        return
+    for fn in files:
+        if not (fn.endswith('.gait') or fn.endswith('.txt')):
+            continue
+        try:
+            g = gait.load(f"{GAIT_DIR}/{fn}")
+            if g.channels != len(SERVO_KEYS):
+                warn("GAIT", "%s: %d 通道，需要 %d", fn, g.channels, len(SERVO_KEYS))
+                continue
+            gaits[g.name] = g
+            info("GAIT", "已加载步态文件 %s (%d 帧, %dms)", fn, len(g), g.duration_ms())
+        except (OSError, ValueError) as e:
+            warn("GAIT", "步态文件 %s 无效: %s", fn, str(e))
+
+
+def save_gaits():
+    """把当前全部步态存为 GAIT_DIR 下的二进制 .gait 文件"""
+    try:
+        os.mkdir(GAIT_DIR)
+    except OSError:
+        pass
+    for name, g in gaits.items():
+        gait.save(g, f"{GAIT_DIR}/{name}.gait")
+    info("GAIT", "已保存 %d 个步态到 %s", len(gaits), GAIT_DIR)
+
+
+def play(name, speed_ms=None, loops=1, speed=1, mirror=None, wait=True):
+    """
+    播放步态表
+    speed_ms: 整段（一个循环）的时长，给出时覆盖 speed；0 表示尽快到位
+    loops: 循环次数，0 无限循环（需 player.stop()）
+    mirror: (perm, flip)，如 MIRROR_LR
+    """
+    g = gaits[name]
+    if speed_ms is not None:
+        speed = g.duration_ms() / max(speed_ms, 1)
+    player.play(g, loops=loops, speed=speed, mirror=mirror)
+    if wait:
+        player.wait(sleep=time.sleep_ms)
 
 # ======================
 # 姿势控制
@@ -190,66 +315,19 @@ def set_leg_angles(leg, hip_angle=None, thigh_angle=None, knee_angle=None, speed
 def stand_up_pose(speed_ms=1000):
     """站立姿势 - 所有关节回到中间位置"""
     info("POSE", "切换到站立姿势...")
-
-    # 站立姿势角度
-    stand_angles = {
-        'FL': {'HIP': 90, 'THIGH': 90, 'KNEE': 90},
-        'FR': {'HIP': 90, 'THIGH': 90, 'KNEE': 90},
-        'BL': {'HIP': 90, 'THIGH': 90, 'KNEE': 90},
-        'BR': {'HIP': 90, 'THIGH': 90, 'KNEE': 90}
-    }
-
-    for leg, angles in stand_angles.items():
-        set_leg_angles(leg,
-                      hip_angle=angles['HIP'],
-                      thigh_angle=angles['THIGH'],
-                      knee_angle=angles['KNEE'],
-                      speed_ms=speed_ms)
-
-    time.sleep(speed_ms / 1000.0)
+    play('stand', speed_ms)
     info("POSE", "站立姿势完成")
 
 def sit_pose(speed_ms=1000):
     """坐下姿势 - 膝关节弯曲"""
     info("POSE", "切换到坐下姿势...")
-
-    # 坐下姿势角度
-    sit_angles = {
-        'FL': {'HIP': 90, 'THIGH': 90, 'KNEE': 120},
-        'FR': {'HIP': 90, 'THIGH': 90, 'KNEE': 120},
-        'BL': {'HIP': 90, 'THIGH': 90, 'KNEE': 120},
-        'BR': {'HIP': 90, 'THIGH': 90, 'KNEE': 120}
-    }
-
-    for leg, angles in sit_angles.items():
-        set_leg_angles(leg,
-                      hip_angle=angles['HIP'],
-                      thigh_angle=angles['THIGH'],
-                      knee_angle=angles['KNEE'],
-                      speed_ms=speed_ms)
-
-    time.sleep(speed_ms / 1000.0)
+    play('sit', speed_ms)
     info("POSE", "坐下姿势完成")
 
 def crouch_pose(speed_ms=1000):
     """蹲下姿势 - 所有关节都收缩"""
     info("POSE", "切换到蹲下姿势...")
-
-    crouch_angles = {
-        'FL': {'HIP': 90, 'THIGH': 120, 'KNEE': 60},
-        'FR': {'HIP': 90, 'THIGH': 120, 'KNEE': 60},
-        'BL': {'HIP': 90, 'THIGH': 120, 'KNEE': 60},
-        'BR': {'HIP': 90, 'THIGH': 120, 'KNEE': 60}
-    }
-
-    for leg, angles in crouch_angles.items():
-        set_leg_angles(leg,
-                      hip_angle=angles['HIP'],
-                      thigh_angle=angles['THIGH'],
-                      knee_angle=angles['KNEE'],
-                      speed_ms=speed_ms)
-
-    time.sleep(speed_ms / 1000.0)
+    play('crouch', speed_ms)
     info("POSE", "蹲下姿势完成")
 
 # ======================
@@ -265,18 +343,14 @@ def wave_gait(leg, step_count=4, speed_ms=500):
     # 步态序列：FL -> BR -> FR -> BL -> FL
     gait_sequence = ['FL', 'BR', 'FR', 'BL']
     start_index = gait_sequence.index(leg) if leg in gait_sequence else 0
+    # 'step' 表每步 = 抬腿 speed/2 + 停 speed + 放腿 speed/2 + 停 speed
+    speed = 500 / speed_ms
 
     for step in range(step_count):
         current_leg = gait_sequence[(start_index + step) % 4]
-
         print(f"第{step + 1}步: 抬起{current_leg}腿")
-        # 抬腿（膝关节伸直，大腿关节向前）
-        set_leg_angles(current_leg, knee_angle=60, thigh_angle=45, speed_ms=speed_ms//2)
-        time.sleep(speed_ms / 1000.0)
-
-        # 放腿（回到站立位置）
-        set_leg_angles(current_leg, knee_angle=90, thigh_angle=90, speed_ms=speed_ms//2)
-        time.sleep(speed_ms / 1000.0)
+        # 表里是 FL 的动作，与当前腿互换通道即可
+        play('step', speed=speed, mirror=(_leg_perm((('FL', current_leg),)), ()))
 
     info("GAIT", "波浪步态完成")
 
@@ -285,77 +359,41 @@ def tripod_gait(step_count=4, speed_ms=800):
     三脚步态 - 对角腿同时移动
     """
     info("GAIT", "开始三脚步态...")
-
-    for step in range(step_count):
-        if step % 2 == 0:
-            # 第1组：FL和BR抬起
-            print(f"第{step + 1}步: FL和BR腿抬起")
-            set_leg_angles('FL', knee_angle=60, thigh_angle=45, speed_ms=speed_ms//2)
-            set_leg_angles('BR', knee_angle=60, thigh_angle=45, speed_ms=speed_ms//2)
-            time.sleep(speed_ms / 1000.0)
-
-            set_leg_angles('FL', knee_angle=90, thigh_angle=90, speed_ms=speed_ms//2)
-            set_leg_angles('BR', knee_angle=90, thigh_angle=90, speed_ms=speed_ms//2)
-        else:
-            # 第2组：FR和BL抬起
-            print(f"第{step + 1}步: FR和BL腿抬起")
-            set_leg_angles('FR', knee_angle=60, thigh_angle=45, speed_ms=speed_ms//2)
-            set_leg_angles('BL', knee_angle=60, thigh_angle=45, speed_ms=speed_ms//2)
-            time.sleep(speed_ms / 1000.0)
-
-            set_leg_angles('FR', knee_angle=90, thigh_angle=90, speed_ms=speed_ms//2)
-            set_leg_angles('BL', knee_angle=90, thigh_angle=90, speed_ms=speed_ms//2)
-
-        time.sleep(speed_ms / 1000.0)
-
+    # 'tripod' 表一个循环两步：FL+BR 一步，FR+BL 一步
+    play('tripod', loops=(step_count + 1) // 2, speed=800 / speed_ms)
     info("GAIT", "三脚步态完成")
 
 def turn_left(speed_ms=600):
     """左转"""
     info("GAIT", "开始左转...")
-
-    # 左转时左侧腿向后，右侧腿向前
-    turn_angles = {
-        'FL': {'THIGH': 120, 'KNEE': 80},  # 左前腿向后
-        'BL': {'THIGH': 120, 'KNEE': 80},  # 左后腿向后
-        'FR': {'THIGH': 60, 'KNEE': 100},  # 右前腿向前
-        'BR': {'THIGH': 60, 'KNEE': 100}   # 右后腿向前
-    }
-
-    for leg, angles in turn_angles.items():
-        set_leg_angles(leg,
-                      hip_angle=90,
-                      thigh_angle=angles['THIGH'],
-                      knee_angle=angles['KNEE'],
-                      speed_ms=speed_ms)
-
-    time.sleep(speed_ms / 1000.0)
-    stand_up_pose(speed_ms)
+    play('turn_left', speed=600 / speed_ms)
     info("GAIT", "左转完成")
 
 def turn_right(speed_ms=600):
     """右转"""
     info("GAIT", "开始右转...")
-
-    # 右转时右侧腿向后，左侧腿向前
-    turn_angles = {
-        'FL': {'THIGH': 60, 'KNEE': 100},   # 左前腿向前
-        'BL': {'THIGH': 60, 'KNEE': 100},   # 左后腿向前
-        'FR': {'THIGH': 120, 'KNEE': 80},   # 右前腿向后
-        'BR': {'THIGH': 120, 'KNEE': 80}    # 右后腿向后
-    }
-
-    for leg, angles in turn_angles.items():
-        set_leg_angles(leg,
-                      hip_angle=90,
-                      thigh_angle=angles['THIGH'],
-                      knee_angle=angles['KNEE'],
-                      speed_ms=speed_ms)
-
-    time.sleep(speed_ms / 1000.0)
-    stand_up_pose(speed_ms)
+    # 右转时右侧腿向后，左侧腿向前：左转的左右镜像
+    play('turn_left', speed=600 / speed_ms, mirror=MIRROR_LR)
     info("GAIT", "右转完成")
 
+def gait_console():
+    """列出全部步态，选择后按给定倍速、循环次数、是否镜像播放"""
+    names = sorted(gaits)
+    for i, name in enumerate(names, 1):
+        g = gaits[name]
+        print(f"  {i:>2}. {name:<12} {len(g)} 帧 {g.duration_ms()}ms")
+    try:
+        name = names[int(input("选择步态序号: ").strip()) - 1]
+        speed = float(input("倍速 (默认1): ").strip() or "1")
+        loops = int(input("循环次数 (默认1): ").strip() or "1")
+        mirror = MIRROR_LR if input("左右镜像? (y/N): ").strip().lower() == 'y' else None
+    except (ValueError, IndexError):
+        print("❌ 无效输入")
+        return
+    t0 = time.ticks_ms()
+    play(name, loops=max(loops, 1), speed=speed, mirror=mirror)
+    print(f"✅ {name} 播放完成，实际 {time.ticks_diff(time.ticks_ms(), t0)}ms")
+
 # ======================
 # 测试函数
 # ======================
@@ -434,9 +472,7 @@ def test_all_servos():
 
     for angle, desc in test_angles:
         info("TEST", "测试%s位置 %d°...", desc, angle)
-        for leg in LEGS_CONFIG.keys():
-            for joint in ['HIP', 'THIGH', 'KNEE']:
-                set_servo_angle(leg, joint, angle, speed_ms=200)
+        move_servos({key: angle for key in servos}, speed_ms=200)
         time.sleep(2)
 
     # 回到中间位置
@@ -471,6 +507,38 @@ def calibration_mode():
 
     info("CAL", "校准模式完成")
 
+def benchmark_writes(frames=500):
+    """舵机写入基准：12 个舵机来回扫，对比定点+duty_u16 与旧的浮点换算+duty()"""
+    print("\n=== 舵机写入基准 ===")
+    print("⚠️ 舵机会在限位范围内快速扫动，结束后回到站立姿势")
+    group = [servos[key] for key in SERVO_KEYS if key in servos]
+    joints = [key.split('_', 1)[1] for key in SERVO_KEYS if key in servos]
+    if not group:
+        print("❌ 没有可用的舵机")
+        return
+
+    rate, frame_us = bench(group, frames)
+    print(f"  定点 + duty_u16: {rate} 次/秒, 写 {len(group)} 个舵机 {frame_us}us/帧")
+
+    # 旧写法：每次 dict 查限位 + 浮点换算 + 10 位 duty()（不含原来的 debug 日志）
+    pwms = [s.pwm for s in group]
+    t0 = time.ticks_us()
+    for f in range(frames):
+        angle = (f * 7) % 1800 / SCALE
+        for i in range(len(pwms)):
+            limits = ANGLE_LIMITS[joints[i]]
+            a = max(limits['min'], min(limits['max'], angle))
+            us = MIN_US + (MAX_US - MIN_US) * a / 180
+            pwms[i].duty(int(1023 * us / 20000))
+    us = time.ticks_diff(time.ticks_us(), t0) or 1
+    print(f"  浮点 + duty():   {frames * len(pwms) * 1000000 // us} 次/秒, "
+          f"{us // frames}us/帧")
+    print(f"  运动引擎: {motion.frames} 帧, 单帧最长 {motion.frame_us_max}us "
+          f"(帧间隔 {motion.frame_ms}ms)")
+
+    # 扫动绕过了运动引擎，直接写回站立姿势
+    stand_up_pose(speed_ms=0)
+
 # ======================
 # 控制菜单
 # ======================
@@ -487,6 +555,7 @@ def show_menu():
     print("5. 单腿测试")
     print("6. 全舵机测试")
     print("7. 校准模式")
+    print("8. 舵机写入基准（12舵机）")
 
     print("\n🕷️ 腿部单独调试:")
     print("31. 前左腿 (FL) 调试 - GPIO 13,14,16")
@@ -513,6 +582,10 @@ def show_menu():
     print("25. 对角腿抬起 (FL+BR)")
     print("26. 对角腿抬起 (FR+BL)")
 
+    print("\n🎞️ 步态表:")
+    print(f"41. 播放步态表（倍速/循环/镜像，含 {GAIT_DIR} 下的文件）")
+    print(f"42. 保存全部步态到 {GAIT_DIR}")
+
     print("\n0. 退出程序")
     print("="*60)
 
@@ -576,23 +649,17 @@ def debug_leg_by_gpio(hip_gpio, thigh_gpio, knee_gpio, speed_ms=500):
         for hip_angle, thigh_angle, knee_angle, desc in debug_sequence:
             print(f"  📍 {desc}: HIP={hip_angle}° THIGH={thigh_angle}° KNEE={knee_angle}°")
 
-            # 分别控制三个关节
-            if hip_servo and hip_servo in servos:
-                leg, joint = hip_servo.split('_', 1)
-                set_servo_angle(leg, joint, hip_angle, current_speed)
-                print(f"    ✅ {hip_servo}(GPIO{hip_gpio}) -> {hip_angle}°")
-
-            if thigh_servo and thigh_servo in servos:
-                leg, joint = thigh_servo.split('_', 1)
-                set_servo_angle(leg, joint, thigh_angle, current_speed)
-                print(f"    ✅ {thigh_servo}(GPIO{thigh_gpio}) -> {thigh_angle}°")
+            # 三个关节同时运动，动作时长 current_speed
+            targets = {}
+            for servo, gpio, angle in ((hip_servo, hip_gpio, hip_angle),
+                                       (thigh_servo, thigh_gpio, thigh_angle),
+                                       (knee_servo, knee_gpio, knee_angle)):
+                if servo and servo in servos:
+                    targets[servo] = angle
+                    print(f"    ✅ {servo}(GPIO{gpio}) -> {angle}°")
+            move_servos(targets, current_speed)
 
-            if knee_servo and knee_servo in servos:
-                leg, joint = knee_servo.split('_', 1)
-                set_servo_angle(leg, joint, knee_angle, current_speed)
-                print(f"    ✅ {knee_servo}(GPIO{knee_gpio}) -> {knee_angle}°")
-
-            time.sleep(current_speed / 1000.0 + 0.5)  # 动作时间+暂停
+            time.sleep(0.5)  # 暂停
 
         print(f"✅ {leg_name} 腿调试完成")
         return True
@@ -680,52 +747,32 @@ def custom_gpio_debug():
 def legs_forward():
     """所有腿向前伸展"""
     print("🦵 所有腿向前伸展...")
-    forward_angles = {
-        'FL': {'HIP': 90, 'THIGH': 60, 'KNEE': 100},
-        'FR': {'HIP': 90, 'THIGH': 60, 'KNEE': 100},
-        'BL': {'HIP': 90, 'THIGH': 60, 'KNEE': 100},
-        'BR': {'HIP': 90, 'THIGH': 60, 'KNEE': 100}
-    }
-
-    for leg, angles in forward_angles.items():
-        set_leg_angles(leg, angles['HIP'], angles['THIGH'], angles['KNEE'], speed_ms=800)
+    play('forward')
 
 def legs_backward():
     """所有腿向后伸展"""
     print("🦵 所有腿向后伸展...")
-    backward_angles = {
-        'FL': {'HIP': 90, 'THIGH': 120, 'KNEE': 80},
-        'FR': {'HIP': 90, 'THIGH': 120, 'KNEE': 80},
-        'BL': {'HIP': 90, 'THIGH': 120, 'KNEE': 80},
-        'BR': {'HIP': 90, 'THIGH': 120, 'KNEE': 80}
-    }
-
-    for leg, angles in backward_angles.items():
-        set_leg_angles(leg, angles['HIP'], angles['THIGH'], angles['KNEE'], speed_ms=800)
+    play('backward')
 
 def left_side_up():
     """左侧腿抬起"""
     print("🦵 左侧腿抬起...")
-    set_leg_angles('FL', knee_angle=60, thigh_angle=45, speed_ms=600)
-    set_leg_angles('BL', knee_angle=60, thigh_angle=45, speed_ms=600)
+    play('left_up')
 
 def right_side_up():
     """右侧腿抬起"""
     print("🦵 右侧腿抬起...")
-    set_leg_angles('FR', knee_angle=60, thigh_angle=45, speed_ms=600)
-    set_leg_angles('BR', knee_angle=60, thigh_angle=45, speed_ms=600)
+    play('left_up', mirror=MIRROR_LR)
 
 def diagonal_up_fl_br():
     """对角腿抬起 (FL+BR)"""
     print("🦵 对角腿抬起 (FL+BR)...")
-    set_leg_angles('FL', knee_angle=60, thigh_angle=45, speed_ms=600)
-    set_leg_angles('BR', knee_angle=60, thigh_angle=45, speed_ms=600)
+    play('diagonal_up')
 
 def diagonal_up_fr_bl():
     """对角腿抬起 (FR+BL)"""
     print("🦵 对角腿抬起 (FR+BL)...")
-    set_leg_angles('FR', knee_angle=60, thigh_angle=45, speed_ms=600)
-    set_leg_angles('BL', knee_angle=60, thigh_angle=45, speed_ms=600)
+    play('diagonal_up', mirror=MIRROR_LR)
 
 # ======================
 # 主程序
@@ -777,6 +824,8 @@ def run():
                 test_all_servos()
             elif choice == 7:
                 calibration_mode()
+            elif choice == 8:
+                benchmark_writes()
 
             # 腿部单独调试
             elif choice == 31:
@@ -822,6 +871,12 @@ def run():
             elif choice == 26:
                 diagonal_up_fr_bl()
 
+            # 步态表
+            elif choice == 41:
+                gait_console()
+            elif choice == 42:
+                save_gaits()
+
             else:
                 print("❌ 无效选择，请输入有效数字")
 
@@ -839,9 +894,13 @@ def run():
     finally:
         # 清理资源 - 关闭所有舵机信号
         info("MAIN", "清理舵机资源...")
+        if player:
+            player.stop()
+        elif motion:
+            motion.stop()
         for servo_key, servo in servos.items():
             try:
-                servo.duty(0)
+                servo.off()
                 servo_info = format_servo_key_with_pin(servo_key)
                 debug("CLEAN", "关闭舵机信号: %s", servo_info)
             except:
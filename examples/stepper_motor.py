@@ -1,10 +1,14 @@
 # stepper_keys_angles.py
 # ESP32 + 28BYJ-48(ULN2003) + 4键非阻塞控制
+# META description: 28BYJ-48步进电机控制，4按键控制不同角度
+# META pins: 电机:15,2,0,4 | 按键:32,33,12,13
+# META needs: 无
 
 import time
 import micropython
 from machine import Pin
 from base.log import debug, info, warn   # 使用你的新日志函数
+from base import debounce, events, supervisor
 
 micropython.alloc_emergency_exception_buf(128)
 
@@ -12,8 +16,6 @@ micropython.alloc_emergency_exception_buf(128)
 MOTOR_PINS = (15, 2, 0, 4)  # ULN2003 IN1-IN4
 KEY_PINS = (32, 33, 12, 13)
 
-DEBOUNCE_MS = 40
-
 STEPS_PER_REV = 4096
 STEP_DELAY_US = 1200
 RELEASE_WHEN_IDLE = True
@@ -34,14 +36,11 @@ HALFSTEP_SEQ = (
 
 # ========== 硬件初始化 ==========
 in_pins = [Pin(p, Pin.OUT, value=0) for p in MOTOR_PINS]
-keys    = [Pin(p, Pin.IN, Pin.PULL_UP) for p in KEY_PINS]
 
 # ========== 运行状态 ==========
 seq_idx = 0
 steps_remaining = 0
 last_step_us = 0
-_last_k_ms = [0,0,0,0]
-_pending =   [0,0,0,0]
 
 # ========== 步进电机基本操作 ==========
 def _write(a,b,c,d):
@@ -73,53 +72,22 @@ def step_once(direction):
     _write(*HALFSTEP_SEQ[seq_idx])
 
 
-# ========== Soft Handler（软件中断） ==========
-def _process_soft(i):
-    debug("SOFT", "进入 soft handler: K%d", i+1)
-
-    _pending[i] = 0
-    now = time.ticks_ms()
-
-    if time.ticks_diff(now, _last_k_ms[i]) < DEBOUNCE_MS:
-        debug("SOFT", "K%d soft 去抖丢弃", i+1)
-        return
-
-    _last_k_ms[i] = now
-
-    key_val = keys[i].value()
-    debug("SOFT", "K%d 软处理中读取 key value=%d", i+1, key_val)
-
-    if key_val == 0:
-        deg = ANGLE_MAP[i+1]
-        debug("KEY", "K%d 按下 -> 目标角度 %+d°", i+1, deg)
-        enqueue(angle_to_steps(deg))
-
-
-# ========== IRQ Handler（硬件中断） ==========
-def _mk_irq(i):
-    def irq(pin):
-        debug("IRQ", "IRQ 触发: K%d (pin value=%d)", i+1, pin.value())
-
-        now = time.ticks_ms()
-        # if time.ticks_diff(now, _last_k_ms[i]) < DEBOUNCE_MS:
-        #     debug("IRQ", "K%d IRQ 去抖丢弃", i+1)
-        #     return
-        #
-        # _last_k_ms[i] = now
-
-        if not _pending[i]:
-            _pending[i] = 1
-            debug("IRQ", "K%d schedule soft handler", i+1)
-            try:
-                micropython.schedule(lambda _: _process_soft(i), 0)
-            except Exception as e:
-                warn("IRQ", "schedule 失败: %s，主循环将兜底", e)
-    return irq
+# ========== 按键事件（base.debounce 去抖后由 base.events 在主线程分发） ==========
+def _on_key(i):
+    def handler(level, ts_us):
+        debug("KEY", "K%d 去抖后电平=%d", i+1, level)
+        if level == 0:
+            deg = ANGLE_MAP[i+1]
+            debug("KEY", "K%d 按下 -> 目标角度 %+d°", i+1, deg)
+            enqueue(angle_to_steps(deg))
+    return handler
 
 def bind_irqs():
-    for i, kp in enumerate(keys):
-        kp.irq(trigger=Pin.IRQ_FALLING, handler=_mk_irq(i))
-    info("IRQ", "4 个按键 IRQ 已绑定: %s", KEY_PINS)
+    # 不再每键一个 IRQ：全部按键由去抖器的同一个定时采样任务读取
+    for i, kp in enumerate(KEY_PINS):
+        src = debounce.add(kp, name="K%d" % (i+1))
+        events.subscribe(src, _on_key(i))
+    info("KEY", "4 个按键已登记去抖: %s", KEY_PINS)
 
 
 # ========== 步进电机自检 ==========
@@ -158,12 +126,6 @@ def run():
     last_hb = time.ticks_ms()
 
     while True:
-        # 如果 schedule 忙，兜底处理 pending
-        for i2 in range(4):
-            if _pending[i2]:
-                debug("MAIN", "兜底处理 pending: K%d", i2+1)
-                _process_soft(i2)
-
         # 步进任务调度
         if steps_remaining != 0:
             now_us = time.ticks_us()
@@ -186,11 +148,13 @@ def run():
         else:
             time.sleep_ms(2)
 
-        # 心跳日志
+        # 心跳日志（连续步进时主循环不 sleep，这里顺便给看门狗心跳）
         if time.ticks_diff(time.ticks_ms(), last_hb) >= 1000:
             last_hb = time.ticks_ms()
-            ks = "".join(str(k.value()) for k in keys)
-            info("HB", "rem=%+d idx=%d keys=%s", steps_remaining, seq_idx, ks)
+            supervisor.beat()
+            ks = "".join(str(debounce.value(k)) for k in KEY_PINS)
+            info("HB", "rem=%+d idx=%d keys=%s dropped=%d", steps_remaining, seq_idx, ks,
+                 events.dropped)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
 # wifi_connect.py  或写在 main.py 里
+# META description: WiFi STA连接测试
+# META pins: WiFi网络连接，无特定GPIO
+# META needs: WiFi
 
 import network
 import time
@@ -27,6 +27,7 @@ class I2cLcd:
         self, i2c: I2C, addr: int, rows=2, cols=16,
         backlight=True, bl_active_high=True,  # 有些背包背光位是“低有效”
         debug=False,
+        fast=False,  # 快速模式：不用固定延时（清屏/归位读忙标志 BF，其它按 37us 执行时间等到点），非 debug 时跳过背光探测
         # 允许修改位图（极少数背包映射不同）
         mask_rs=0x01, mask_rw=0x02, mask_en=0x04, mask_bl=0x08,
         d4=0x10, d5=0x20, d6=0x40, d7=0x80
@@ -34,6 +35,9 @@ class I2cLcd:
         self.i2c, self.addr = i2c, addr
         self.rows, self.cols = rows, cols
         self.debug = debug
+        self.fast = fast
+        self._buf4 = bytearray(4)  # 快速模式下一次 I2C 事务写完一个字节的两个半字节
+        self._ready_at = time.ticks_us()  # 快速模式：控制器执行完上一条写入的时刻
 
         # 位图
         self.MASK_RS = mask_rs
@@ -47,18 +51,25 @@ class I2cLcd:
         self._bl_state = bool(backlight)
         self._bl_mask = self.MASK_BL if (self._bl_state == self._bl_active_high) else 0
 
-        self._log("init: addr=0x%02X rows=%d cols=%d backlight=%s bl_active_high=%s",
-                  addr, rows, cols, backlight, bl_active_high)
+        self._log("init: addr=0x%02X rows=%d cols=%d backlight=%s bl_active_high=%s fast=%s",
+                  addr, rows, cols, backlight, bl_active_high, fast)
 
-        time.sleep_ms(50)  # 上电等待
+        time.sleep_ms(40 if fast else 50)  # 上电等待（手册要求 VCC 2.7V 后 >40ms）
 
-        # 试探：直接切几次背光，确认 I2C 是否通
-        self._probe_backlight()
+        # 试探：直接切几次背光，确认 I2C 是否通（约 720ms，快速模式仅 debug 时做）
+        if debug or not fast:
+            self._probe_backlight()
 
         # 进入 4 位模式（HD44780 规定的“三次0x3 + 一次0x2”序列）
-        self._write4(self._nibble(0x03)); time.sleep_ms(5)
-        self._write4(self._nibble(0x03)); time.sleep_ms(5)
-        self._write4(self._nibble(0x03)); time.sleep_ms(2)
+        # 此阶段 BF 还不能读，只能按手册最小值延时：>4.1ms, >100us, >100us
+        if fast:
+            self._write4(self._nibble(0x03)); time.sleep_ms(5)
+            self._write4(self._nibble(0x03)); time.sleep_us(150)
+            self._write4(self._nibble(0x03)); time.sleep_us(150)
+        else:
+            self._write4(self._nibble(0x03)); time.sleep_ms(5)
+            self._write4(self._nibble(0x03)); time.sleep_ms(5)
+            self._write4(self._nibble(0x03)); time.sleep_ms(2)
         self._write4(self._nibble(0x02))
 
         # 基本设置
@@ -108,13 +119,56 @@ class I2cLcd:
         # 先高 4 位，再低 4 位
         hi = self._nibble((byte >> 4) & 0x0F)
         lo = self._nibble(byte & 0x0F)
+        if self.fast:
+            # PCF8574 每收到一个字节就锁存到输出口，4 个字节合成一次 I2C 事务：
+            # EN↑/EN↓ 的脉宽由 I2C 字节时间（100kHz 下约 90us）自然保证
+            ctrl = (self.MASK_RS if rs else 0) | self._bl_mask_now()
+            buf = self._buf4
+            buf[0] = hi | ctrl | self.MASK_EN
+            buf[1] = hi | ctrl
+            buf[2] = lo | ctrl | self.MASK_EN
+            buf[3] = lo | ctrl
+            # 上一条普通指令/数据还没执行完才等；I2C 事务本身超过 37us 时（100k/400kHz
+            # 都是）这里不会空转，更快的总线也不会写早
+            while time.ticks_diff(self._ready_at, time.ticks_us()) > 0:
+                pass
+            self.i2c.writeto(self.addr, buf)
+            # 从最后一个 EN↓ 起算：执行 37us + 地址计数器更新 4us
+            self._ready_at = time.ticks_add(time.ticks_us(), 41)
+            return
         self._write4(hi, rs=rs)
         self._write4(lo, rs=rs)
 
+    def _read_busy(self):
+        # 读 BF：D4~D7 输出 1（PCF8574 准双向口作输入），RS=0, RW=1
+        base = self.D4 | self.D5 | self.D6 | self.D7 | self.MASK_RW | self._bl_mask_now()
+        self.i2c.writeto(self.addr, bytes([base | self.MASK_EN]))
+        hi = self.i2c.readfrom(self.addr, 1)[0]
+        # 4 位模式下低半字节（地址计数器）也必须时钟一次，否则下次读写错位
+        self.i2c.writeto(self.addr, bytes([base, base | self.MASK_EN, base]))
+        return bool(hi & self.D7)
+
+    def _wait_ready(self, timeout_us=5000):
+        # 轮询 BF，直到控制器空闲；超时（如背包未接 RW）则退回到最坏延时
+        start = time.ticks_us()
+        while self._read_busy():
+            if time.ticks_diff(time.ticks_us(), start) > timeout_us:
+                self._log("BF timeout, fallback delay")
+                time.sleep_ms(2)
+                break
+        # 恢复为写方向（RW=0），避免 D4~D7 保持高电平输入态
+        self.i2c.writeto(self.addr, bytes([self._bl_mask_now()]))
+        self._ready_at = time.ticks_us()
+
     def _cmd(self, cmd):
         self._log("CMD: 0x%02X", cmd)
         self._send8(cmd, rs=False)
-        if cmd in (_LCD_CLR, _LCD_HOME):
+        if self.fast:
+            # 普通指令只需 37us，由 _send8 在下一次写入前按时间等到点；
+            # 只有清屏/归位（最长 1.52ms）需要读 BF 等待
+            if cmd in (_LCD_CLR, _LCD_HOME):
+                self._wait_ready()
+        elif cmd in (_LCD_CLR, _LCD_HOME):
             time.sleep_ms(2)
         else:
             time.sleep_us(50)
@@ -145,6 +199,15 @@ class I2cLcd:
         self._log("DAT: 0x%02X (%r)", b, chr(b) if 32 <= b < 127 else '.')
         self._send8(b, rs=True)
 
+    def custom_char(self, location, charmap):
+        # 写 CGRAM：location 0~7，charmap 为 8 行 5 位点阵；写完后光标停在 CGRAM，
+        # 调用方需要 move_to() 回到 DDRAM 再写字符
+        location &= 0x07
+        self._log("CGRAM: slot=%d", location)
+        self._cmd(_LCD_CGRAM | (location << 3))
+        for i in range(8):
+            self._send8(charmap[i] & 0x1F, rs=True)
+
     def putstr(self, s):
         for ch in s:
             if ch == '\n':
@@ -0,0 +1,132 @@
+# lcd_glyph.py —— LCD1602 自定义字符（CGRAM）管理
+# HD44780 只有 8 个 CGRAM 槽位：按逻辑名把字形映射到槽位，LRU 淘汰；
+# 已驻留的字形直接复用字符码，不重复上传，动画/进度条每帧只写 DDRAM。
+#
+# 用法：
+#     from i2c_lcd_min import I2cLcd
+#     from lcd_glyph import GlyphManager
+#     lcd = I2cLcd(i2c, 0x27, fast=True)
+#     gm = GlyphManager(lcd)
+#     gm.put(0, 0, ("arrow_up", "heart"))
+#     gm.bar(0, 1, 16, value, 100)
+
+# 内置字形：每个 8 字节，低 5 位有效
+GLYPHS = {
+    # 横向进度条：bar1 ~ bar5 分别点亮 1~5 列
+    "bar1": b"\x10\x10\x10\x10\x10\x10\x10\x10",
+    "bar2": b"\x18\x18\x18\x18\x18\x18\x18\x18",
+    "bar3": b"\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c",
+    "bar4": b"\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e",
+    "bar5": b"\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f",
+    # 箭头
+    "arrow_up":    b"\x04\x0e\x15\x04\x04\x04\x04\x00",
+    "arrow_down":  b"\x04\x04\x04\x04\x15\x0e\x04\x00",
+    "arrow_left":  b"\x00\x04\x08\x1f\x08\x04\x00\x00",
+    "arrow_right": b"\x00\x04\x02\x1f\x02\x04\x00\x00",
+    # 图标
+    "heart":  b"\x00\x0a\x1f\x1f\x0e\x04\x00\x00",
+    "bell":   b"\x04\x0e\x0e\x0e\x1f\x00\x04\x00",
+    "degree": b"\x0c\x12\x12\x0c\x00\x00\x00\x00",
+    "check":  b"\x00\x01\x03\x16\x1c\x08\x00\x00",
+}
+
+_BAR_CELLS = ("bar1", "bar2", "bar3", "bar4", "bar5")
+
+
+class GlyphManager:
+    def __init__(self, lcd, glyphs=None, slots=8):
+        self.lcd = lcd
+        self.glyphs = dict(GLYPHS)
+        if glyphs:
+            self.glyphs.update(glyphs)
+        self.slots = slots
+        self._slot_name = [None] * slots  # 槽位 -> 驻留的字形名
+        self._slot_used = [0] * slots     # 槽位最近使用序号（LRU）
+        self._tick = 0
+        # 统计
+        self.hits = 0
+        self.uploads = 0
+
+    def define(self, name, charmap):
+        # 注册/更新字形；已驻留且点阵变化时作废槽位，下次使用时重新上传
+        charmap = bytes(charmap)
+        if self.glyphs.get(name) == charmap:
+            return
+        self.glyphs[name] = charmap
+        for i in range(self.slots):
+            if self._slot_name[i] == name:
+                self._slot_name[i] = None
+                self._slot_used[i] = 0
+
+    def slot(self, name, pinned=()):
+        # 返回字形对应的字符码（0~7）；不在 CGRAM 时按 LRU 淘汰一个槽位再上传
+        # pinned：本帧已在用、不能被淘汰的槽位
+        self._tick += 1
+        names = self._slot_name
+        if name in names:
+            i = names.index(name)
+            self._slot_used[i] = self._tick
+            self.hits += 1
+            return i
+
+        if name not in self.glyphs:
+            raise KeyError(name)
+
+        victim = -1
+        oldest = None
+        for i in range(self.slots):
+            if i in pinned:
+                continue
+            if names[i] is None:
+                victim = i
+                break
+            if oldest is None or self._slot_used[i] < oldest:
+                oldest = self._slot_used[i]
+                victim = i
+        if victim < 0:
+            raise ValueError("more than %d glyphs in one frame" % self.slots)
+
+        self.lcd.custom_char(victim, self.glyphs[name])
+        names[victim] = name
+        self._slot_used[victim] = self._tick
+        self.uploads += 1
+        return victim
+
+    def put(self, col, row, items):
+        # items：字形名或普通单字符的序列；先确保全部驻留，再一次性写 DDRAM
+        codes = []
+        pinned = []
+        for it in items:
+            if len(it) == 1:
+                codes.append(it)
+            else:
+                i = self.slot(it, pinned)
+                pinned.append(i)
+                codes.append(i)
+        # 上传 CGRAM 会移走地址计数器，这里统一回到 DDRAM
+        self.lcd.move_to(col, row)
+        for c in codes:
+            self.lcd.putchar(c)
+
+    def bar(self, col, row, width, value, max_value):
+        # 横向进度条：width 个字符格，每格 5 列，分辨率 width*5
+        # value / max_value 可以是 int 或 float（如传感器读数）
+        if max_value <= 0:
+            value, max_value = 0, 1
+        cols = int(value * width * 5 // max_value)
+        cols = max(0, min(width * 5, cols))
+        items = []
+        for _ in range(width):
+            if cols >= 5:
+                items.append("bar5")
+                cols -= 5
+            elif cols > 0:
+                items.append(_BAR_CELLS[cols - 1])
+                cols = 0
+            else:
+                items.append(" ")
+        self.put(col, row, items)
+
+    def stats(self):
+        return {"hits": self.hits, "uploads": self.uploads,
+                "resident": [n for n in self._slot_name if n is not None]}
@@ -0,0 +1,197 @@
+"""
+Append-only raw-block data logger for sdcard.SDCard (no filesystem).
+
+Reserves a contiguous run of card blocks and appends fixed-size records
+with multi-block writeblocks calls, so capture rate is bounded by SPI
+speed instead of FAT metadata updates.  The region must not overlap a
+mounted filesystem (e.g. partition the card smaller and log after the
+partition; by default the region is placed at the end of the device).
+
+Region layout (block offsets from start):
+
+    0, 1    superblock A/B, written alternately (highest valid seq wins)
+    2 ...   data blocks: 10-byte header + packed records
+
+Superblock: "RLOG" magic, version, generation, record size, region size,
+head (number of complete data blocks), seq, CRC32.
+Data block header: "RB", generation, block index, record count.
+
+After a crash the superblock head may lag behind; opening the log scans
+forward from head over blocks with the current generation and index, so
+every block that reached the card is recovered.  tools/rawlog_extract.py
+reads a card image on the host and dumps the records.
+
+Example:
+
+    import machine, sdcard, rawlog
+    sd = sdcard.SDCard(machine.SPI(2), machine.Pin(5))
+    log = rawlog.RawLog(sd, nblocks=65536, fmt="<IHH")
+    log.pack(time.ticks_ms(), adc1, adc2)
+    ...
+    log.flush()
+"""
+
+import binascii
+import struct
+
+_BLOCK = 512
+_MAGIC = b"RLOG"
+_VERSION = 1
+_SB_FMT = "<4sHHHIII"  # magic, version, gen, record size, nblocks, head, seq
+_SB_SIZE = struct.calcsize(_SB_FMT)
+_HDR_FMT = "<2sHIH"  # "RB", gen, block index, record count
+_HDR_SIZE = struct.calcsize(_HDR_FMT)
+_DATA_START = 2
+
+
+class RawLog:
+    def __init__(self, dev, start=None, nblocks=2048, record_size=None, fmt=None,
+                 batch=8, sync_every=4, reset=False):
+        if fmt is not None:
+            record_size = struct.calcsize(fmt)
+        assert record_size and record_size <= _BLOCK - _HDR_SIZE, "invalid record size"
+        assert nblocks > _DATA_START + batch, "region too small"
+        if start is None:
+            start = dev.ioctl(4, 0) - nblocks
+        self.dev = dev
+        self.start = start
+        self.nblocks = nblocks
+        self.fmt = fmt
+        self.record_size = record_size
+        self.per_block = (_BLOCK - _HDR_SIZE) // record_size
+        self.batch = batch
+        self.sync_every = sync_every
+
+        self.buf = bytearray(batch * _BLOCK)
+        self.mv = memoryview(self.buf)
+        self.sbbuf = bytearray(_BLOCK)
+        self.gen = 0
+        self.seq = 0
+        self.head = 0  # data block index of buf[0]
+        self.blk = 0   # current block within buf
+        self.nrec = 0  # records in current block
+        self.flushes = 0
+        self.blocks_written = 0
+
+        if reset or not self._load():
+            self._format()
+
+    # ---- superblock ----
+    def _read_sb(self, i):
+        self.dev.readblocks(self.start + i, self.sbbuf)
+        sb = self.sbbuf
+        crc = struct.unpack_from("<I", sb, _SB_SIZE)[0]
+        if crc != binascii.crc32(sb[:_SB_SIZE]) & 0xFFFFFFFF:
+            return None
+        f = struct.unpack_from(_SB_FMT, sb, 0)
+        if f[0] != _MAGIC or f[1] != _VERSION:
+            return None
+        return f
+
+    def _write_sb(self):
+        self.seq += 1
+        sb = self.sbbuf
+        for i in range(_BLOCK):
+            sb[i] = 0
+        struct.pack_into(_SB_FMT, sb, 0, _MAGIC, _VERSION, self.gen,
+                         self.record_size, self.nblocks, self.head, self.seq)
+        struct.pack_into("<I", sb, _SB_SIZE, binascii.crc32(sb[:_SB_SIZE]) & 0xFFFFFFFF)
+        self.dev.writeblocks(self.start + (self.seq & 1), sb)
+        self.dev.ioctl(3, 0)
+
+    def _format(self):
+        sbs = [f for f in (self._read_sb(0), self._read_sb(1)) if f]
+        # new generation so blocks from an earlier log are not recovered
+        self.gen = (max(f[2] for f in sbs) + 1) & 0xFFFF if sbs else 1
+        self.seq = max(f[6] for f in sbs) if sbs else 0
+        self.head = 0
+        self.blk = 0
+        self.nrec = 0
+        self._write_sb()
+
+    def _load(self):
+        sbs = [f for f in (self._read_sb(0), self._read_sb(1)) if f]
+        if not sbs:
+            return False
+        f = max(sbs, key=lambda f: f[6])
+        if f[3] != self.record_size or f[4] != self.nblocks:
+            return False
+        self.gen, self.head, self.seq = f[2], f[5], f[6]
+        self.blk = 0
+        self.nrec = 0
+
+        # recover blocks written after the last superblock update
+        blk = self.mv[:_BLOCK]
+        while self.head < self.nblocks - _DATA_START:
+            self.dev.readblocks(self.start + _DATA_START + self.head, blk)
+            magic, gen, index, nrec = struct.unpack_from(_HDR_FMT, blk, 0)
+            if magic != b"RB" or gen != self.gen or index != self.head:
+                break
+            if nrec < self.per_block:
+                # partially filled block: keep appending into it
+                self.nrec = nrec
+                break
+            self.head += 1
+        return True
+
+    # ---- appending ----
+    def _slot(self):
+        # byte offset for the next record, moving on to a new block as needed
+        if self.nrec == self.per_block:
+            self.blk += 1
+            self.nrec = 0
+            if self.blk == self.batch:
+                self._write_batch()
+        if self.head + self.blk >= self.nblocks - _DATA_START:
+            raise OSError(28)  # ENOSPC
+        off = self.blk * _BLOCK
+        self.nrec += 1
+        struct.pack_into(_HDR_FMT, self.buf, off, b"RB", self.gen, self.head + self.blk, self.nrec)
+        return off + _HDR_SIZE + (self.nrec - 1) * self.record_size
+
+    def _write_batch(self):
+        self.dev.writeblocks(self.start + _DATA_START + self.head, self.buf)
+        self.blocks_written += self.batch
+        self.head += self.batch
+        self.blk = 0
+        self.flushes += 1
+        if self.flushes % self.sync_every == 0:
+            self._write_sb()
+
+    def append(self, record):
+        off = self._slot()
+        self.mv[off : off + self.record_size] = record
+
+    def pack(self, *values):
+        struct.pack_into(self.fmt, self.buf, self._slot(), *values)
+
+    def flush(self):
+        # write complete blocks plus the partial current block, then the
+        # superblock; the partial block is rewritten as it fills up
+        n = self.blk + (1 if self.nrec else 0)
+        if n:
+            self.dev.writeblocks(self.start + _DATA_START + self.head, self.mv[: n * _BLOCK])
+            self.blocks_written += n
+        if self.nrec == self.per_block:
+            self.head += n
+            self.blk = 0
+            self.nrec = 0
+        elif self.blk:
+            self.mv[:_BLOCK] = self.mv[self.blk * _BLOCK : (self.blk + 1) * _BLOCK]
+            self.head += self.blk
+            self.blk = 0
+        self._write_sb()
+
+    def close(self):
+        self.flush()
+
+    def records(self):
+        return (self.head + self.blk) * self.per_block + self.nrec
+
+    def stats(self):
+        return {
+            "records": self.records(),
+            "head": self.head,
+            "blocks_written": self.blocks_written,
+            "free_blocks": self.nblocks - _DATA_START - self.head - self.blk,
+        }
@@ -0,0 +1,179 @@
+"""
+LRU block cache for block devices such as sdcard.SDCard.
+
+Wraps any object with the simple block-device protocol (readblocks,
+writeblocks, ioctl) and exposes the same protocol, so it can be mounted
+in place of the raw device:
+
+    import machine, os, sdcard, sdcache
+    sd = sdcard.SDCard(machine.SPI(2), machine.Pin(5))
+    dev = sdcache.BlockCache(sd, slots=16)
+    os.mount(dev, '/sd')
+    ...
+    print(dev.stats())
+
+Single-block reads and writes (FAT sectors, directory entries) go through
+the cache.  Single-block writes are write-back: they are flushed to the
+device on eviction or when the filesystem issues the sync ioctl (3),
+which is then passed on to the device.  The erase ioctl (6) drops the
+cached copy of the block before passing it on.
+Multi-block transfers are treated as bulk streams: they are passed
+straight to the device so they don't evict metadata, but are kept
+coherent with any cached copies.
+"""
+
+_BLOCK = 512
+
+
+class BlockCache:
+    def __init__(self, dev, slots=8):
+        assert slots > 0, "need at least one slot"
+        self.dev = dev
+        self.slots = slots
+        self.data = bytearray(slots * _BLOCK)
+        self.data_mv = memoryview(self.data)
+        self.block = [-1] * slots    # slot -> block number, -1 when free
+        self.used = [0] * slots      # slot -> last use tick (LRU)
+        self.dirty = [False] * slots
+        self.index = {}              # block number -> slot
+        self.tick = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writebacks = 0
+
+    def _slot_mv(self, slot):
+        return self.data_mv[slot * _BLOCK : (slot + 1) * _BLOCK]
+
+    def _touch(self, slot):
+        self.tick += 1
+        self.used[slot] = self.tick
+
+    def _write_back(self, slot):
+        self.dev.writeblocks(self.block[slot], self._slot_mv(slot))
+        self.dirty[slot] = False
+        self.writebacks += 1
+
+    def _alloc(self, block_num):
+        # pick a free slot, otherwise evict the least recently used one
+        victim = 0
+        oldest = None
+        for i in range(self.slots):
+            if self.block[i] < 0:
+                victim = i
+                break
+            if oldest is None or self.used[i] < oldest:
+                oldest = self.used[i]
+                victim = i
+        if self.block[victim] >= 0:
+            if self.dirty[victim]:
+                self._write_back(victim)
+            del self.index[self.block[victim]]
+        self.block[victim] = block_num
+        self.dirty[victim] = False
+        self.index[block_num] = victim
+        self._touch(victim)
+        return victim
+
+    def _drop(self, slot):
+        # forget a slot whose contents are not valid (failed device read)
+        del self.index[self.block[slot]]
+        self.block[slot] = -1
+        self.dirty[slot] = False
+
+    def readblocks(self, block_num, buf):
+        nblocks, err = divmod(len(buf), _BLOCK)
+        assert nblocks and not err, "Buffer length is invalid"
+        index = self.index
+
+        if nblocks == 1:
+            slot = index.get(block_num)
+            if slot is None:
+                self.misses += 1
+                slot = self._alloc(block_num)
+                try:
+                    self.dev.readblocks(block_num, self._slot_mv(slot))
+                except Exception:
+                    # never leave a half-filled or stale slot indexed as this block
+                    self._drop(slot)
+                    raise
+            else:
+                self.hits += 1
+                self._touch(slot)
+            buf[:] = self._slot_mv(slot)
+            return
+
+        # bulk read: fetch the whole run from the device, then overlay any
+        # cached copies (they may be newer than the card if dirty)
+        self.misses += nblocks
+        self.dev.readblocks(block_num, buf)
+        if index:
+            mv = memoryview(buf)
+            for i in range(nblocks):
+                slot = index.get(block_num + i)
+                if slot is not None and self.dirty[slot]:
+                    mv[i * _BLOCK : (i + 1) * _BLOCK] = self._slot_mv(slot)
+
+    def writeblocks(self, block_num, buf):
+        nblocks, err = divmod(len(buf), _BLOCK)
+        assert nblocks and not err, "Buffer length is invalid"
+        index = self.index
+
+        if nblocks == 1:
+            slot = index.get(block_num)
+            if slot is None:
+                slot = self._alloc(block_num)
+            else:
+                self._touch(slot)
+            self._slot_mv(slot)[:] = buf
+            self.dirty[slot] = True
+            return
+
+        # bulk write: write through, and refresh any cached copies so they
+        # are clean and identical to what is now on the card
+        self.dev.writeblocks(block_num, buf)
+        if index:
+            mv = memoryview(buf)
+            for i in range(nblocks):
+                slot = index.get(block_num + i)
+                if slot is not None:
+                    self._slot_mv(slot)[:] = mv[i * _BLOCK : (i + 1) * _BLOCK]
+                    self.dirty[slot] = False
+
+    def sync(self):
+        # flush dirty slots in block order so the card sees ascending writes
+        dirty = [i for i in range(self.slots) if self.dirty[i]]
+        dirty.sort(key=lambda i: self.block[i])
+        for i in dirty:
+            self._write_back(i)
+
+    def invalidate(self):
+        self.sync()
+        for i in range(self.slots):
+            self.block[i] = -1
+            self.dirty[i] = False
+        self.index = {}
+
+    def discard(self, block_num):
+        slot = self.index.pop(block_num, None)
+        if slot is not None:
+            self.block[slot] = -1
+            self.dirty[slot] = False
+            self.used[slot] = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writebacks": self.writebacks,
+            "dirty": sum(1 for d in self.dirty if d),
+        }
+
+    def ioctl(self, op, arg):
+        if op == 2:  # deinit
+            self.sync()
+        elif op == 3:  # sync
+            self.sync()
+        elif op == 6:  # erase: the cached copy, dirty or not, is now stale
+            self.discard(arg)
+        return self.dev.ioctl(op, arg)
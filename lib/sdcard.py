@@ -21,10 +21,23 @@ Example usage on ESP8266:
 """
 
 from micropython import const
+from array import array
+import micropython
+import sys
 import time
 
 
 _CMD_TIMEOUT = const(100)
+# SDHC/SDXC spec: write busy is at most 250 ms (500 ms for SDXC)
+_WRITE_TIMEOUT_MS = const(500)
+_BUSY_CHUNK = const(16)
+# erase busy allowance: fixed part plus a per-block part
+_ERASE_TIMEOUT_MS = const(1000)
+_ERASE_TIMEOUT_PER_BLOCK_US = const(250)
+# SDHC/SDXC spec: read access time is at most 100 ms
+_READ_TIMEOUT_MS = const(200)
+# retries per transfer once CRC mode is on (see enable_crc)
+_CRC_RETRIES = const(3)
 
 _R1_IDLE_STATE = const(1 << 0)
 # R1_ERASE_RESET = const(1 << 1)
@@ -37,22 +50,116 @@ _TOKEN_CMD25 = const(0xFC)
 _TOKEN_STOP_TRAN = const(0xFD)
 _TOKEN_DATA = const(0xFE)
 
+# candidate SPI clocks for tune_baudrate(), ascending
+_TUNE_RATES = (4000000, 8000000, 10000000, 13333333, 16000000, 20000000, 26666666, 40000000)
+
+_crc16_table = None
+_crc7_table = None
+
+
+def _init_crc_tables():
+    # precompute CRC16-CCITT (XMODEM) and CRC7 tables on first use
+    global _crc16_table, _crc7_table
+    t16 = array("H", range(256))
+    t7 = bytearray(256)
+    for i in range(256):
+        c = i << 8
+        for _ in range(8):
+            c = ((c << 1) ^ 0x1021) if c & 0x8000 else (c << 1)
+        t16[i] = c & 0xFFFF
+        # CRC7 kept left-aligned in a byte (poly 0x09 << 1)
+        c = i
+        for _ in range(8):
+            c = ((c << 1) ^ 0x12) if c & 0x80 else (c << 1)
+        t7[i] = c & 0xFF
+    _crc16_table = t16
+    _crc7_table = t7
+
+
+if sys.implementation.name == "micropython":
+
+    @micropython.viper
+    def _crc16_viper(buf, n: int, table) -> int:
+        p = ptr8(buf)
+        t = ptr16(table)
+        crc = 0
+        for i in range(n):
+            crc = ((crc << 8) ^ t[((crc >> 8) ^ p[i]) & 0xFF]) & 0xFFFF
+        return crc
+
+else:
+    _crc16_viper = None
+
+
+def crc16(buf):
+    # CRC16-CCITT (XMODEM), as used by SD data blocks
+    if _crc16_table is None:
+        _init_crc_tables()
+    if _crc16_viper is not None:
+        return _crc16_viper(buf, len(buf), _crc16_table)
+    table = _crc16_table
+    crc = 0
+    for b in buf:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ b]
+    return crc
+
+
+def crc7(buf, n=5):
+    # CRC7 of the first n bytes, as used by SD command frames
+    if _crc7_table is None:
+        _init_crc_tables()
+    table = _crc7_table
+    crc = 0
+    for i in range(n):
+        crc = table[crc ^ buf[i]]
+    return crc >> 1
+
 
 class SDCard:
-    def __init__(self, spi, cs, baudrate=1320000):
+    def __init__(self, spi, cs, baudrate=1320000, auto_baudrate=False, readahead=0, crc=False):
         self.spi = spi
         self.cs = cs
+        self.baudrate = baudrate
+        # verify the CRC16 of every data block read (off by default)
+        self.check_crc = False
+        # send real CRC7/CRC16 to the card (CMD59 CRC_ON), see enable_crc()
+        self.crc_on = False
+        # transfers failing with EIO are retried this often; only set by
+        # enable_crc(), since without CRC a retry would hide corrupt data
+        self.retries = 0
+        self.crc_errors = 0
+        self.retry_count = 0
+        # send ACMD23 before multi-block writes; cleared if the card rejects it
+        self.pre_erase = True
+        # the filesystem sends the erase ioctl (6) one block at a time; a
+        # full CMD38 erase per block is slower than not erasing, and an SD
+        # card needs no erase before writing, so it is ignored unless set.
+        # Use erase(block, count) for explicit range erases.
+        self.erase_ioctl = False
 
         self.cmdbuf = bytearray(6)
+        self.crcbuf = bytearray(2)
+        self.wcrcbuf = bytearray(2)
         self.dummybuf = bytearray(512)
         self.tokenbuf = bytearray(1)
+        self.busybuf = bytearray(_BUSY_CHUNK)
         for i in range(512):
             self.dummybuf[i] = 0xFF
         self.dummybuf_memoryview = memoryview(self.dummybuf)
 
+        # read-ahead for sequential readers, see set_readahead()
+        self.set_readahead(readahead)
+
         # initialise the card
         self.init_card(baudrate)
 
+        if crc:
+            self.enable_crc()
+
+        if auto_baudrate:
+            rate = self.tune_baudrate()
+            print("[SDCard] auto baudrate:", rate)
+
     def init_spi(self, baudrate):
         try:
             master = self.spi.MASTER
@@ -113,6 +220,7 @@ class SDCard:
             raise OSError("can't set 512 block size")
 
         # set to high data rate now that it's initialised
+        self.baudrate = baudrate
         self.init_spi(baudrate)
 
     def init_card_v1(self):
@@ -154,7 +262,7 @@ class SDCard:
         buf[2] = arg >> 16
         buf[3] = arg >> 8
         buf[4] = arg
-        buf[5] = crc
+        buf[5] = (crc7(buf) << 1 | 1) if self.crc_on else crc
         self.spi.write(buf)
 
         if skip1:
@@ -182,18 +290,28 @@ class SDCard:
         self.spi.write(b"\xff")
         return -1
 
-    def readinto(self, buf):
-        self.cs(0)
-
-        # read until start byte (0xff)
-        for i in range(_CMD_TIMEOUT):
-            self.spi.readinto(self.tokenbuf, 0xFF)
-            if self.tokenbuf[0] == _TOKEN_DATA:
+    def set_readahead(self, nblocks):
+        # When a read continues exactly where the previous one ended, fetch
+        # up to nblocks extra blocks in the same CMD18 run into a spare
+        # buffer; following sequential reads are then served from memory.
+        self.readahead = nblocks
+        self.ra_buf = bytearray(nblocks * 512) if nblocks else None
+        self.ra_mv = memoryview(self.ra_buf) if nblocks else None
+        self.ra_start = 0
+        self.ra_count = 0
+        self.next_block = -1
+
+    def read_block(self, buf):
+        # receive one data block with CS already asserted; returns False on
+        # timeout or CRC mismatch.  Polls the start token without sleeping.
+        tok = self.tokenbuf
+        start = time.ticks_ms()
+        while True:
+            self.spi.readinto(tok, 0xFF)
+            if tok[0] == _TOKEN_DATA:
                 break
-            time.sleep_ms(1)
-        else:
-            self.cs(1)
-            raise OSError("timeout waiting for response")
+            if time.ticks_diff(time.ticks_ms(), start) > _READ_TIMEOUT_MS:
+                return False
 
         # read data
         mv = self.dummybuf_memoryview
@@ -202,83 +320,188 @@ class SDCard:
         self.spi.write_readinto(mv, buf)
 
         # read checksum
-        self.spi.write(b"\xff")
-        self.spi.write(b"\xff")
+        self.spi.readinto(self.crcbuf, 0xFF)
 
-        self.cs(1)
-        self.spi.write(b"\xff")
+        if self.check_crc and crc16(buf) != (self.crcbuf[0] << 8 | self.crcbuf[1]):
+            self.crc_errors += 1
+            return False
+        return True
 
-    def write(self, token, buf):
+    def readinto(self, buf):
         self.cs(0)
-
-        # send: start of block, data, checksum
-        self.spi.read(1, token)
-        self.spi.write(buf)
-        self.spi.write(b"\xff")
+        ok = self.read_block(buf)
+        self.cs(1)
         self.spi.write(b"\xff")
+        if not ok:
+            raise OSError(5)  # EIO
+
+    def wait_ready(self, timeout_ms=_WRITE_TIMEOUT_MS):
+        # the card holds DO low while busy; poll in chunks instead of one
+        # byte per call, and give up after timeout_ms
+        buf = self.busybuf
+        start = time.ticks_ms()
+        while True:
+            self.spi.readinto(buf, 0xFF)
+            if buf[_BUSY_CHUNK - 1] != 0:
+                return True
+            if time.ticks_diff(time.ticks_ms(), start) > timeout_ms:
+                return False
+
+    def write_block(self, token, buf, offset=0):
+        # send the 512-byte block at buf[offset:] with CS already asserted;
+        # returns True when the card accepted the data and finished
+        # programming it.  Blocks inside a larger buffer are sent through a
+        # memoryview slice, so the data itself is never copied.
+        if offset or len(buf) != 512:
+            buf = memoryview(buf)[offset : offset + 512]
+        self.tokenbuf[0] = token
+        self.spi.write(self.tokenbuf)
+        self.spi.write(buf)
+        if self.crc_on:
+            crc = crc16(buf)
+            self.wcrcbuf[0] = crc >> 8
+            self.wcrcbuf[1] = crc
+            self.spi.write(self.wcrcbuf)
+        else:
+            self.spi.write(b"\xff\xff")  # dummy CRC
 
-        # check the response
-        if (self.spi.read(1, 0xFF)[0] & 0x1F) != 0x05:
-            self.cs(1)
-            self.spi.write(b"\xff")
-            return
+        # check the data response token
+        self.spi.readinto(self.tokenbuf, 0xFF)
+        resp = self.tokenbuf[0] & 0x1F
+        if resp != 0x05:
+            if resp == 0x0B:  # data rejected due to CRC error
+                self.crc_errors += 1
+            return False
 
-        # wait for write to finish
-        while self.spi.read(1, 0xFF)[0] == 0:
-            pass
+        return self.wait_ready()
 
+    def write(self, token, buf):
+        self.cs(0)
+        ok = self.write_block(token, buf)
         self.cs(1)
         self.spi.write(b"\xff")
+        if not ok:
+            raise OSError(5)  # EIO
 
     def write_token(self, token):
         self.cs(0)
         self.spi.read(1, token)
         self.spi.write(b"\xff")
         # wait for write to finish
-        while self.spi.read(1, 0xFF)[0] == 0x00:
-            pass
+        ok = self.wait_ready()
 
         self.cs(1)
         self.spi.write(b"\xff")
+        if not ok:
+            raise OSError(5)  # EIO
+
+    def enable_crc(self, on=True):
+        # CMD59: turn CRC checking on the card on/off; with it on, commands
+        # carry a real CRC7, writes a real CRC16 and reads are verified
+        self.crc_on = True
+        r = self.cmd(59, 1 if on else 0, 0)
+        self.crc_on = on and r == 0
+        self.check_crc = self.crc_on
+        self.retries = _CRC_RETRIES if self.crc_on else 0
+        if r != 0:
+            raise OSError(5)  # EIO
+
+    def stats(self):
+        return {
+            "baudrate": self.baudrate,
+            "crc_errors": self.crc_errors,
+            "retries": self.retry_count,
+        }
 
     def readblocks(self, block_num, buf):
+        for _ in range(self.retries):
+            try:
+                return self.readblocks_once(block_num, buf)
+            except OSError:
+                self.retry_count += 1
+        return self.readblocks_once(block_num, buf)
+
+    def readblocks_once(self, block_num, buf):
+        nblocks = len(buf) // 512
+        assert nblocks and not len(buf) % 512, "Buffer length is invalid"
+        mv = memoryview(buf)
+
+        # serve leading blocks from the read-ahead buffer
+        i = block_num - self.ra_start
+        if self.ra_count and 0 <= i < self.ra_count:
+            n = min(nblocks, self.ra_count - i)
+            mv[: n * 512] = self.ra_mv[i * 512 : (i + n) * 512]
+            block_num += n
+            nblocks -= n
+            self.next_block = block_num
+            if not nblocks:
+                return
+            mv = mv[n * 512 :]
+
+        prefetch = 0
+        if self.readahead and block_num == self.next_block:
+            prefetch = max(0, min(self.readahead, self.sectors - block_num - nblocks))
+
         # workaround for shared bus, required for (at least) some Kingston
         # devices, ensure MOSI is high before starting transaction
         self.spi.write(b"\xff")
 
-        nblocks = len(buf) // 512
-        assert nblocks and not len(buf) % 512, "Buffer length is invalid"
-        if nblocks == 1:
+        if nblocks == 1 and not prefetch:
             # CMD17: set read address for single block
             if self.cmd(17, block_num * self.cdv, 0, release=False) != 0:
                 # release the card
                 self.cs(1)
                 raise OSError(5)  # EIO
             # receive the data and release card
-            self.readinto(buf)
+            self.readinto(mv)
         else:
             # CMD18: set read address for multiple blocks
             if self.cmd(18, block_num * self.cdv, 0, release=False) != 0:
                 # release the card
                 self.cs(1)
                 raise OSError(5)  # EIO
+            # stream the whole run with CS held low
+            self.ra_count = 0
+            ok = True
             offset = 0
-            mv = memoryview(buf)
             while nblocks:
-                # receive the data and release card
-                self.readinto(mv[offset : offset + 512])
+                if not self.read_block(mv[offset : offset + 512]):
+                    ok = False
+                    break
                 offset += 512
                 nblocks -= 1
-            if self.cmd(12, 0, 0xFF, skip1=True):
+                block_num += 1
+            if ok and prefetch:
+                ra = self.ra_mv
+                for i in range(prefetch):
+                    if not self.read_block(ra[i * 512 : (i + 1) * 512]):
+                        prefetch = i
+                        break
+                self.ra_start = block_num
+                self.ra_count = prefetch
+            if self.cmd(12, 0, 0xFF, skip1=True) or not ok:
+                self.ra_count = 0
                 raise OSError(5)  # EIO
+            self.next_block = block_num
+            return
+        self.next_block = block_num + 1
 
     def writeblocks(self, block_num, buf):
+        for _ in range(self.retries):
+            try:
+                return self.writeblocks_once(block_num, buf)
+            except OSError:
+                self.retry_count += 1
+        return self.writeblocks_once(block_num, buf)
+
+    def writeblocks_once(self, block_num, buf):
         # workaround for shared bus, required for (at least) some Kingston
         # devices, ensure MOSI is high before starting transaction
         self.spi.write(b"\xff")
 
         nblocks, err = divmod(len(buf), 512)
         assert nblocks and not err, "Buffer length is invalid"
+        self.ra_count = 0
         if nblocks == 1:
             # CMD24: set write address for single block
             if self.cmd(24, block_num * self.cdv, 0) != 0:
@@ -287,20 +510,116 @@ class SDCard:
             # send the data
             self.write(_TOKEN_DATA, buf)
         else:
+            # ACMD23: pre-erase hint so the card can prepare nblocks at once;
+            # a card that rejects it is not sent it again
+            if self.pre_erase and (self.cmd(55, 0, 0) != 0 or self.cmd(23, nblocks & 0x7FFFFF, 0) != 0):
+                self.pre_erase = False
+                print("[SDCard] ACMD23 rejected, pre-erase disabled")
             # CMD25: set write address for first block
-            if self.cmd(25, block_num * self.cdv, 0) != 0:
+            if self.cmd(25, block_num * self.cdv, 0, release=False) != 0:
+                self.cs(1)
                 raise OSError(5)  # EIO
-            # send the data
+            # send the data, keeping CS asserted for the whole run
             offset = 0
-            mv = memoryview(buf)
+            ok = True
             while nblocks:
-                self.write(_TOKEN_CMD25, mv[offset : offset + 512])
+                if not self.write_block(_TOKEN_CMD25, buf, offset):
+                    ok = False
+                    break
                 offset += 512
                 nblocks -= 1
+            self.cs(1)
+            self.spi.write(b"\xff")
             self.write_token(_TOKEN_STOP_TRAN)
+            if not ok:
+                raise OSError(5)  # EIO
+
+    def tune_baudrate(self, rates=_TUNE_RATES, block_num=0, nblocks=4, rounds=4, margin=1):
+        # Step the SPI clock up through rates, reading the same known blocks
+        # with CRC16 checking at each step.  Stop at the first rate that fails
+        # (CRC/timeout/EIO or data differing from the reference read), then
+        # back off by margin steps from the highest stable rate.
+        # Returns the chosen baudrate, which can be pinned in config.
+        safe = self.baudrate
+        ref = bytearray(nblocks * 512)
+        buf = bytearray(nblocks * 512)
+        check_crc = self.check_crc
+        self.check_crc = True
+        readahead = self.readahead
+        self.readahead = 0
+        self.ra_count = 0
+        retries = self.retries
+        self.retries = 0
+        stable = []
+        try:
+            self.readblocks(block_num, ref)
+            self.readblocks(block_num, buf)
+            if buf != ref:
+                raise OSError("SD card reads unstable at %d" % safe)
+            for rate in rates:
+                if rate <= safe:
+                    continue
+                self.init_spi(rate)
+                try:
+                    for _ in range(rounds):
+                        self.readblocks(block_num, buf)
+                        if buf != ref:
+                            raise OSError(5)
+                        self.readblocks(block_num, memoryview(buf)[:512])
+                        if buf[:512] != ref[:512]:
+                            raise OSError(5)
+                except OSError:
+                    # drop back to a safe clock and end any half-finished CMD18
+                    self.init_spi(safe)
+                    self.cmd(12, 0, 0xFF, skip1=True)
+                    break
+                stable.append(rate)
+        finally:
+            self.check_crc = check_crc
+            self.readahead = readahead
+            self.retries = retries
+
+        if len(stable) > margin:
+            self.baudrate = stable[-1 - margin]
+        self.init_spi(self.baudrate)
+        return self.baudrate
+
+    def erase(self, block_num, count=1):
+        # CMD32/CMD33: first and last block to erase, CMD38: erase (R1b)
+        assert count > 0 and block_num + count <= self.sectors, "erase range is invalid"
+        self.ra_count = 0
+        self.spi.write(b"\xff")
+        if self.cmd(32, block_num * self.cdv, 0) != 0:
+            raise OSError(5)  # EIO
+        if self.cmd(33, (block_num + count - 1) * self.cdv, 0) != 0:
+            raise OSError(5)  # EIO
+        if self.cmd(38, 0, 0, release=False) != 0:
+            self.cs(1)
+            raise OSError(5)  # EIO
+        ok = self.wait_ready(_ERASE_TIMEOUT_MS + count * _ERASE_TIMEOUT_PER_BLOCK_US // 1000)
+        self.cs(1)
+        self.spi.write(b"\xff")
+        if not ok:
+            raise OSError(5)  # EIO
+
+    def sync(self):
+        # writes are synchronous; just make sure the card is no longer busy
+        self.cs(0)
+        ok = self.wait_ready()
+        self.cs(1)
+        self.spi.write(b"\xff")
+        if not ok:
+            raise OSError(5)  # EIO
 
     def ioctl(self, op, arg):
+        if op == 3:  # sync
+            self.sync()
+            return 0
         if op == 4:  # get number of blocks
             return self.sectors
         if op == 5:  # get block size in bytes
             return 512
+        if op == 6:  # erase a block
+            if self.erase_ioctl:
+                self.erase(arg)
+            return 0
@@ -2,76 +2,87 @@
 # 菜单选择器：读取examples文件夹中的示例，显示文件名、功能和针脚信息
 # 选择项目后执行对应的run()方法，然后返回主菜单
 
+import gc
 import os
 import sys
+import time
+
+try:
+    import json
+except ImportError:
+    import ujson as json
 
 # 添加base和examples到系统路径
 sys.path.append('base')
 sys.path.append('examples')
 
+from base import resources
+
+# boot.py 启用了启动耗时分析时才存在，未启用时不产生任何导入开销
+bootprof = sys.modules.get('bootprof')
+if bootprof:
+    bootprof.phase('main: imports')
+
+EXAMPLES_DIR = 'examples'
+INDEX_FILE = 'examples/.index.json'  # 解析结果缓存，按 mtime/size 失效
+
+_DEFAULT_INFO = {'description': '未知功能', 'pins': '未定义', 'needs': '未定义'}
+_index = {}
+_launches = {}  # 模块名 -> 本次开机的启动次数，用于区分冷/热启动
+STABLE_MS = 60000  # 无人值守模式下运行超过这么久才算稳定，清零连续崩溃计数
+
+
+def parse_meta(path):
+    """文本方式解析示例文件头部的 META 注释，不导入模块
+
+    示例文件开头的注释中声明：
+        # META description: 功能描述
+        # META pins: 针脚信息
+        # META needs: 资源需求（PWM/Timer/WiFi 等）
+    读到第一行代码即停止，只读取文件头部。
+    """
+    info = dict(_DEFAULT_INFO)
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    break
+                if line.startswith('# META ') and ':' in line:
+                    key, value = line[7:].split(':', 1)
+                    info[key.strip()] = value.strip()
+    except OSError:
+        pass
+    return info
+
+
+def _load_index():
+    try:
+        with open(INDEX_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index):
+    try:
+        with open(INDEX_FILE, 'w') as f:
+            json.dump(index, f)
+    except OSError:
+        print("警告：无法写入示例索引缓存")
+
+
 def extract_file_info(filename):
-    """从Python文件中提取功能描述和针脚信息"""
-    examples_info = {
-        'rotary.py': {
-            'description': '旋钮编码器控制，通过中断检测旋转和按键',
-            'pins': 'SW=GPIO19, DT=GPIO21, CLK=GPIO22'
-        },
-        'light_and_bee.py': {
-            'description': '4按键控制：LED轮询、蜂鸣器、呼吸灯、RGB LED',
-            'pins': '按键:25,26,27,14 | LED:15 | 蜂鸣器:16 | PWM:4 | RGB:17 | TM1637:18,19'
-        },
-        'stepper_motor.py': {
-            'description': '28BYJ-48步进电机控制，4按键控制不同角度',
-            'pins': '电机:15,2,0,4 | 按键:32,33,12,13'
-        },
-        'steering.py': {
-            'description': 'SG90/MG90S舵机控制，测试不同角度',
-            'pins': '舵机PWM:GPIO27'
-        },
-        'dc_motor_simple.py': {
-            'description': '直流电机PWM调速控制',
-            'pins': '电机控制:GPIO15'
-        },
-        'person_sensor.py': {
-            'description': 'HC-SR501/SR602人体红外感应模块检测',
-            'pins': 'PIR传感器:GPIO32'
-        },
-        'ir_obstacle.py': {
-            'description': '红外避障检测模块',
-            'pins': '红外传感器:GPIO32'
-        },
-        'phonotelemeter.py': {
-            'description': 'HC-SR04超声波测距，K1长按锁存',
-            'pins': '按键:25,26,27,14 | 锁存输出:15 | 超声波:TRIG-22, ECHO-21'
-        },
-        'rocker.py': {
-            'description': 'PS2摇杆模拟输入检测',
-            'pins': 'VRX:GPIO34, VRY:GPIO35, SW:GPIO32'
-        },
-        'wifi_simple_test.py': {
-            'description': '简化WiFi连接测试，避免重启问题',
-            'pins': 'WiFi网络连接，无特定GPIO'
-        },
-        'wifi_websocket.py': {
-            'description': 'WiFi连接+WebSocket通信，发送helloworld',
-            'pins': 'WiFi网络连接，无特定GPIO'
-        },
-        'ble_wifi_simple.py': {
-            'description': 'BLE WiFi配网系统，手机配置WiFi',
-            'pins': 'BLE广播，无特定GPIO'
-        }
-    }
-
-    return examples_info.get(filename, {
-        'description': '未知功能',
-        'pins': '未定义'
-    })
+    """从示例索引中获取功能描述、针脚和资源需求"""
+    return _index.get(filename, _DEFAULT_INFO)
+
 
 def get_examples():
-    """获取examples文件夹中的所有Python文件"""
+    """获取examples文件夹中的所有Python文件，并刷新META索引"""
+    global _index
     examples = []
     try:
-        files = os.listdir('examples')
+        files = os.listdir(EXAMPLES_DIR)
         for file in sorted(files):
             if file.endswith('.py') and not file.startswith('__'):
                 examples.append(file)
@@ -79,6 +90,23 @@ def get_examples():
         print("错误：无法读取examples文件夹")
         return []
 
+    cached = _load_index()
+    index = {}
+    changed = len(cached) != len(examples)
+    for file in examples:
+        st = os.stat(EXAMPLES_DIR + '/' + file)
+        size, mtime = st[6], st[8]
+        entry = cached.get(file)
+        if not entry or entry.get('size') != size or entry.get('mtime') != mtime:
+            entry = parse_meta(EXAMPLES_DIR + '/' + file)
+            entry['size'] = size
+            entry['mtime'] = mtime
+            changed = True
+        index[file] = entry
+    if changed:
+        _save_index(index)
+    _index = index
+
     return examples
 
 def display_menu(examples):
@@ -97,49 +125,135 @@ def display_menu(examples):
         print(f"{i:<4} {filename:<20} {desc:<25} {pins}")
 
     print("-"*60)
-    print("0. 退出程序")
+    print("0. 退出程序    多个序号用逗号分隔可同时运行协程示例，如 1,3")
     print("="*60)
 
 def get_user_choice(max_choice):
-    """获取用户选择"""
+    """获取用户选择；逗号分隔多个序号时返回列表（同时运行协程示例）"""
     while True:
         try:
             choice = input("\n请输入选择的项目序号 (0-{}): ".format(max_choice))
-            choice = int(choice)
-            if 0 <= choice <= max_choice:
-                return choice
+            choices = [int(c) for c in choice.split(',')]
+            if all(1 <= c <= max_choice for c in choices) or choices == [0]:
+                return choices[0] if len(choices) == 1 else choices
             else:
                 print("无效选择，请输入0到{}之间的数字".format(max_choice))
         except ValueError:
             print("无效输入，请输入数字")
 
-def run_example(filename):
-    """运行选中的示例"""
-    print(f"\n正在运行: {filename}")
+def _unload_example(module_name, module):
+    """释放示例占用的外设和 IRQ，并把模块从 sys.modules 中删除"""
+    released = resources.release_all()
+    if module is not None:
+        released += resources.release_module(module)
+    if module_name in sys.modules:
+        del sys.modules[module_name]
+    return released
+
+def _import_example(module_name, free_before):
+    """导入示例并打印导入耗时、来源和导入期间分配的堆"""
+    since = bootprof.mark() if bootprof else None
+    t0 = time.ticks_ms()
+    module = __import__(module_name)
+    import_ms = time.ticks_diff(time.ticks_ms(), t0)
+    # 导入后不回收，空闲内存的下降近似为编译/导入时的堆峰值
+    import_heap = free_before - gc.mem_free()
+    count = _launches.get(module_name, 0)
+    _launches[module_name] = count + 1
+    src = getattr(module, '__file__', '')
+    print(f"{module_name}: 导入 {import_ms} ms ({'热' if count else '冷'}启动, "
+          f"{'.mpy' if src.endswith('.mpy') else '.py'}), 导入期间分配 {import_heap} 字节")
+    if bootprof:
+        print(bootprof.report(since))
+    return module
+
+def launch(filename, args=None, ctl=None):
+    """运行示例：运行前后统计堆内存，退出后卸载模块并报告泄漏
+
+    filename: 单个文件名，或文件名列表（同时运行，要求每个示例都提供 async main()）
+    args: 列表按位置、对象按关键字传给 run()/main()
+    ctl:  remote.Control，非空时示例的 sleep（或协程运行时的钩子）会轮询命令以便热切换
+    返回 'done' / 'switch' / 'interrupt' / 'error'
+    """
+    filenames = [filename] if isinstance(filename, str) else list(filename)
+    title = ", ".join(filenames)
+    print(f"\n正在运行: {title}")
     print("="*40)
 
+    module_names = [f.replace('.py', '') for f in filenames]
+    modules = []
+    result = 'done'
+    # 上次运行可能异常残留，确保每次都是全新导入
+    for name in module_names:
+        if name in sys.modules:
+            del sys.modules[name]
+    gc.collect()
+    free_before = gc.mem_free()
+    # 运行前已在的模块；运行中首次导入、有意常驻的库（base.runtime、asyncio 等）不算泄漏
+    resident = set(sys.modules)
+
     try:
         # 动态导入模块
-        module_name = filename.replace('.py', '')
-        if module_name in sys.modules:
-            # 如果模块已加载，先重新加载
-            import importlib
-            module = importlib.reload(sys.modules[module_name])
+        for name in module_names:
+            modules.append(_import_example(name, free_before))
+
+        if isinstance(args, dict):
+            pos, kw = (), args
         else:
-            module = __import__(module_name)
+            pos, kw = tuple(args or ()), {}
 
-        # 检查是否有run函数
-        if hasattr(module, 'run'):
+        if all(hasattr(m, 'main') for m in modules):
+            # 协程示例：放进同一个 asyncio 事件循环
+            from base import runtime
+            print("调用main()协程...")
+            if len(modules) == 1:
+                coros = [modules[0].main(*pos, **kw)]
+            else:
+                coros = [m.main() for m in modules]
+            runtime.run(*coros, hook=ctl.check if ctl else None)
+        elif len(modules) > 1:
+            print("同时运行多个示例需要每个示例都提供 async main()")
+        elif hasattr(modules[0], 'run'):
+            # 检查是否有run函数
             print("调用run()方法...")
-            module.run()
+            if ctl:
+                ctl.attach(modules[0])
+            modules[0].run(*pos, **kw)
         else:
-            print(f"警告: {filename} 没有run()方法")
+            print(f"警告: {title} 没有run()方法")
             print("该示例可能直接执行代码，请在手动运行时查看效果")
 
     except KeyboardInterrupt:
-        print(f"\n\n用户中断，停止运行 {filename}")
+        if ctl and ctl.pending is not None:
+            result = 'switch'
+            print(f"\n\n收到远程命令，停止运行 {title}")
+        else:
+            result = 'interrupt'
+            print(f"\n\n用户中断，停止运行 {title}")
     except Exception as e:
-        print(f"\n运行 {filename} 时出错: {e}")
+        result = 'error'
+        print(f"\n运行 {title} 时出错: {e}")
+    finally:
+        released = 0
+        for i, name in enumerate(module_names):
+            released += _unload_example(name, modules[i] if i < len(modules) else None)
+        modules = None
+        gc.collect()
+        free_after = gc.mem_free()
+        loaded = sorted(n for n in sys.modules if n not in resident)
+        if loaded:
+            # 新常驻模块的内存混在差值里，分不出真正的泄漏，单独列出
+            print(f"\n内存: 运行前空闲 {free_before} 字节, 卸载后空闲 {free_after} 字节, "
+                  f"减少 {free_before - free_after} 字节（含首次导入的常驻模块 {', '.join(loaded)}）, "
+                  f"释放外设 {released} 个")
+        else:
+            print(f"\n内存: 运行前空闲 {free_before} 字节, 卸载后空闲 {free_after} 字节, "
+                  f"泄漏 {free_before - free_after} 字节, 释放外设 {released} 个")
+    return result
+
+def run_example(filename):
+    """菜单模式：运行示例，结束后等待回车返回主菜单"""
+    launch(filename)
 
     print("\n按Enter键返回主菜单...")
     try:
@@ -148,10 +262,91 @@ def run_example(filename):
         print("\n直接返回主菜单...")
         return
 
+def remote_config():
+    """读取 autorun.json；只在文件存在时才导入 base.remote"""
+    try:
+        os.stat('autorun.json')
+    except OSError:
+        return None
+    from base import remote
+    return remote.load_config()
+
+def headless(cfg):
+    """无人值守模式：按配置自动运行示例，之后由 UART/UDP 命令切换，不需要复位
+
+    示例崩溃后按指数退避自动重启；配置了 watchdog 时示例的 sleep 兼作心跳，
+    卡死超过 deadline_ms 就停止喂狗，由看门狗复位后重新 autorun。
+    串口上 Ctrl-C（非远程命令引起的中断）退出到交互菜单。
+    """
+    from base import remote, supervisor
+
+    ctl = remote.Control(cfg)
+    examples = get_examples()
+    ctl.examples = tuple(f.replace('.py', '') for f in examples)
+
+    wcfg = cfg.get('watchdog')
+    deadline_ms = 0
+    if wcfg:
+        deadline_ms = wcfg.get('deadline_ms', 5000)
+        supervisor.start(wcfg.get('timeout_ms', 8000), wcfg.get('period_ms', 1000))
+        ctl.on_sleep = supervisor.beat
+    # 上次是看门狗复位或崩溃退出时，先退避再自动启动
+    delay = supervisor.backoff_ms(supervisor.boot_check())
+
+    cmd = ('run', cfg['example'], cfg.get('args')) if cfg.get('example') else None
+
+    while True:
+        if delay:
+            print(f"autorun: {delay} ms 后启动")
+            ctl.status = 'backoff'
+            cmd = ctl.wait(delay) or cmd
+            delay = 0
+        if cmd is None:
+            ctl.status = 'idle'
+            try:
+                cmd = ctl.wait()
+            except KeyboardInterrupt:
+                return
+        op, name, args = cmd
+        cmd = None
+        if op != 'run':
+            continue
+        # "a,b" 同时运行多个协程示例
+        names = name.split(',')
+        if any(n not in ctl.examples for n in names):
+            print(f"autorun: 没有示例 {name}")
+            continue
+        ctl.status = 'running ' + name
+        supervisor.record_start(name)
+        if deadline_ms:
+            supervisor.watch(name, deadline_ms, current=True)
+        t0 = time.ticks_ms()
+        files = [n + '.py' for n in names]
+        result = launch(files[0] if len(files) == 1 else files, args, ctl)
+        supervisor.unwatch(name)
+        if result == 'interrupt':
+            return
+        if result != 'error' or time.ticks_diff(time.ticks_ms(), t0) >= STABLE_MS:
+            supervisor.record_stable()
+        cmd = ctl.take()
+        if result == 'error' and cmd is None:
+            n = supervisor.record_crash()
+            delay = supervisor.backoff_ms(n)
+            print(f"autorun: {name} 崩溃（连续 {n} 次）")
+            cmd = ('run', name, args)
+
 def main():
     """主程序循环"""
     print("ESP32示例项目选择器启动...")
 
+    # 存在 autorun.json 时先进入无人值守模式，Ctrl-C 后回到交互菜单
+    cfg = remote_config()
+    if cfg is not None:
+        if bootprof and not bootprof.finished:
+            bootprof.phase('main: autorun')
+            bootprof.finish()
+        headless(cfg)
+
     while True:
         examples = get_examples()
 
@@ -160,13 +355,19 @@ def main():
             break
 
         display_menu(examples)
+        if bootprof and not bootprof.finished:
+            bootprof.phase('main: menu')
+            bootprof.finish()
         choice = get_user_choice(len(examples))
 
         if choice == 0:
             print("程序退出")
             break
         else:
-            filename = examples[choice - 1]
+            if isinstance(choice, list):
+                filename = [examples[c - 1] for c in choice]
+            else:
+                filename = examples[choice - 1]
             run_example(filename)
 
     print("感谢使用ESP32示例项目选择器！")
@@ -0,0 +1,86 @@
+"""
+Host-side bytecode sync for base/mpycache.py.
+
+Compiles base/, lib/ and examples/ with mpy-cross into build/mpy/ (only
+files whose source changed) and, with --port, uploads them to /mpy/ on
+the board with mpremote:
+
+    python tools/mpy_sync.py                          # compile only
+    python tools/mpy_sync.py --port /dev/cu.usbserial-120
+
+The board prefers a .mpy only while it is at least as new as the .py it
+was built from, so upload sources first and run this afterwards. The
+board clock is set from the host before copying so mtimes stay ordered
+across resets. mpy-cross must match the firmware's .mpy version
+(`pip install mpy-cross==<firmware version>`).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRS = ("base", "lib", "examples")
+
+
+def sources(root):
+    for d in DIRS:
+        src_dir = os.path.join(root, d)
+        for name in sorted(os.listdir(src_dir)):
+            if name.endswith(".py"):
+                yield d, name
+
+
+def compile_all(root, out, mpy_cross, march, force=False):
+    built = []
+    rows = []
+    for d, name in sources(root):
+        src = os.path.join(root, d, name)
+        dst = os.path.join(out, d, name[:-3] + ".mpy")
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if force or not os.path.exists(dst) or os.path.getmtime(dst) < os.path.getmtime(src):
+            # -s keeps tracebacks pointing at the device-side source path;
+            # -march is needed for the @micropython.viper code in lib/sdcard.py
+            cmd = [mpy_cross, "-s", "%s/%s" % (d, name), "-march=" + march, "-o", dst, src]
+            subprocess.run(cmd, check=True)
+            built.append((d, dst))
+        rows.append((d + "/" + name, os.path.getsize(src), os.path.getsize(dst)))
+    return built, rows
+
+
+def upload(built, port, mpremote):
+    cmd = [mpremote, "connect", port, "rtc", "--set"]
+    for d in ("",) + DIRS:
+        # mkdir fails when the directory exists; mpremote keeps going with "+"
+        cmd += ["+", "exec", "import os\ntry:\n os.mkdir('/mpy%s')\nexcept OSError:\n pass" % ("/" + d if d else "")]
+    for d, path in built:
+        cmd += ["+", "fs", "cp", path, ":/mpy/%s/%s" % (d, os.path.basename(path))]
+    subprocess.run(cmd, check=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--out", default=os.path.join(ROOT, "build", "mpy"), help="build directory")
+    ap.add_argument("--port", help="serial port to upload to with mpremote")
+    ap.add_argument("--force", action="store_true", help="rebuild and upload everything")
+    ap.add_argument("--march", default="xtensawin", help="native arch (xtensawin for ESP32/S2/S3)")
+    ap.add_argument("--mpy-cross", default="mpy-cross", help="mpy-cross executable")
+    ap.add_argument("--mpremote", default="mpremote", help="mpremote executable")
+    args = ap.parse_args(argv)
+
+    built, rows = compile_all(ROOT, args.out, args.mpy_cross, args.march, args.force)
+    total_py = total_mpy = 0
+    for name, py, mpy in rows:
+        total_py += py
+        total_mpy += mpy
+        print("%-40s %7d -> %6d bytes" % (name, py, mpy))
+    print("%-40s %7d -> %6d bytes, %d rebuilt" % ("total", total_py, total_mpy, len(built)))
+
+    if args.port and built:
+        upload(built, args.port, args.mpremote)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
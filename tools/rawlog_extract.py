@@ -0,0 +1,91 @@
+"""
+Host-side extractor for lib/rawlog.py regions.
+
+Reads a card image (a dd copy or the raw device, e.g. /dev/sdb) and dumps
+the records of the current generation as CSV (with --fmt) or hex:
+
+    python tools/rawlog_extract.py card.img --start 7000000 --fmt "<IHH" > log.csv
+    python tools/rawlog_extract.py /dev/sdb --nblocks 65536 --fmt "<IHH"
+
+Without --start the region is assumed to be the last --nblocks blocks of
+the image, which is rawlog's default placement.
+"""
+
+import argparse
+import binascii
+import os
+import struct
+import sys
+
+_BLOCK = 512
+_SB_FMT = "<4sHHHIII"
+_SB_SIZE = struct.calcsize(_SB_FMT)
+_HDR_FMT = "<2sHIH"
+_HDR_SIZE = struct.calcsize(_HDR_FMT)
+_DATA_START = 2
+
+
+def read_block(f, n):
+    f.seek(n * _BLOCK)
+    return f.read(_BLOCK)
+
+
+def superblock(f, start):
+    best = None
+    for i in (0, 1):
+        sb = read_block(f, start + i)
+        if len(sb) < _BLOCK:
+            continue
+        crc = struct.unpack_from("<I", sb, _SB_SIZE)[0]
+        if crc != binascii.crc32(sb[:_SB_SIZE]) & 0xFFFFFFFF:
+            continue
+        fields = struct.unpack_from(_SB_FMT, sb, 0)
+        if fields[0] != b"RLOG":
+            continue
+        if best is None or fields[6] > best[6]:
+            best = fields
+    return best
+
+
+def records(f, start):
+    sb = superblock(f, start)
+    if sb is None:
+        raise SystemExit("no valid rawlog superblock at block %d" % start)
+    _, _, gen, record_size, nblocks, head, _ = sb
+    per_block = (_BLOCK - _HDR_SIZE) // record_size
+    # scan past the superblock head to pick up blocks written before a crash
+    for index in range(nblocks - _DATA_START):
+        blk = read_block(f, start + _DATA_START + index)
+        magic, bgen, bindex, nrec = struct.unpack_from(_HDR_FMT, blk, 0)
+        if magic != b"RB" or bgen != gen or bindex != index:
+            break
+        for r in range(min(nrec, per_block)):
+            off = _HDR_SIZE + r * record_size
+            yield blk[off : off + record_size]
+        if nrec < per_block:
+            break
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("image")
+    ap.add_argument("--start", type=int, help="first block of the region")
+    ap.add_argument("--nblocks", type=int, default=2048, help="region size in blocks")
+    ap.add_argument("--fmt", help="struct format of one record, e.g. '<IHH'")
+    args = ap.parse_args(argv)
+
+    with open(args.image, "rb") as f:
+        start = args.start
+        if start is None:
+            f.seek(0, os.SEEK_END)
+            start = f.tell() // _BLOCK - args.nblocks
+        out = sys.stdout
+        for rec in records(f, start):
+            if args.fmt:
+                out.write(",".join(str(v) for v in struct.unpack(args.fmt, rec)) + "\n")
+            else:
+                out.write(binascii.hexlify(rec).decode() + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Throughput/latency benchmark for lib/sdcard.py against the SD emulator.
+
+Runs under CPython or the MicroPython unix port, no card needed:
+
+    python tools/sd_bench.py
+    python tools/sd_bench.py --baud 20000000 --call-us 8
+    python tools/sd_bench.py --driver /tmp/sdcard_old.py   # before/after
+
+Times are modelled on the emulator's virtual bus clock (bit time at the
+given baudrate + per-SPI-call overhead + card delays + driver sleeps),
+so results are deterministic and comparable between driver revisions.
+Wall time on the host is printed for reference only.  Scenarios that use
+options the loaded driver does not have are reported as n/a.
+
+The emulator does not model CPU time, so CRC mode is not in the scenario
+table.  Its cost is the crc16 figure printed at the end: the measured time
+of the loaded driver's crc16 per block (the viper version under
+MicroPython), next to the bus time of one block at --baud.  Only a run
+under MicroPython on the target gives the on-target figure.
+"""
+
+import sys
+import time
+
+sys.path.insert(0, __file__.rsplit("/", 1)[0] if "/" in __file__ else ".")
+import sd_emu  # noqa: E402
+
+try:
+    import random
+except ImportError:
+    random = None
+
+_BLOCK = 512
+
+
+def _wall_ms():
+    if hasattr(time, "ticks_ms"):
+        return time.ticks_ms()
+    return int(time.monotonic() * 1000)
+
+
+def _seq(n, chunk):
+    return [(b, chunk) for b in range(0, n, chunk)]
+
+
+def _rand(n, span, seed=1):
+    if random is None:
+        return [((i * 2654435761) % span, 1) for i in range(n)]
+    random.seed(seed)
+    return [(random.randrange(span), 1) for _ in range(n)]
+
+
+# name, op, kwargs for SDCard(), access pattern
+def scenarios(n):
+    return (
+        ("seq read 1blk", "r", {}, _seq(n, 1)),
+        ("seq read 1blk ra8", "r", {"readahead": 8}, _seq(n, 1)),
+        ("seq read 8blk", "r", {}, _seq(n, 8)),
+        ("rand read 1blk", "r", {}, _rand(n // 2, 1900)),
+        ("seq write 1blk", "w", {}, _seq(n, 1)),
+        ("seq write 8blk", "w", {}, _seq(n, 8)),
+        ("rand write 1blk", "w", {}, _rand(n // 2, 1900)),
+    )
+
+
+def run(driver=None, n=256, baud=20000000, call_us=10, sectors=2048):
+    rows = []
+    for name, op, kw, pattern in scenarios(n):
+        emu = sd_emu.SDCardEmu(sectors=sectors, call_us=call_us)
+        mod = sd_emu.load_sdcard(driver, emu)
+        try:
+            sd = mod["SDCard"](emu, emu.cs, baudrate=baud, **kw)
+        except TypeError:
+            rows.append((name, None))
+            continue
+        buf = bytearray(_BLOCK * max(c for _, c in pattern))
+        mv = memoryview(buf)
+        emu.reset_stats()
+        t0 = _wall_ms()
+        for block, count in pattern:
+            if op == "r":
+                sd.readblocks(block, mv[: count * _BLOCK])
+            else:
+                sd.writeblocks(block, mv[: count * _BLOCK])
+        wall = time.ticks_diff(_wall_ms(), t0) if hasattr(time, "ticks_diff") else _wall_ms() - t0
+        st = emu.stats()
+        nbytes = sum(c for _, c in pattern) * _BLOCK
+        us = max(1, emu.elapsed_us())
+        rows.append((name, {
+            "ops": len(pattern),
+            "kb": nbytes // 1024,
+            "ms": us / 1000,
+            "mbps": nbytes / us,
+            "lat_us": us / len(pattern),
+            "calls": st["spi_calls"],
+            "wall_ms": wall,
+        }))
+    return rows
+
+
+def crc_cost(blocks=64):
+    # per-block CPU cost of the driver's crc16 (viper on MicroPython)
+    # returns (us per block, implementation name) or None
+    mod = sd_emu.load_sdcard()
+    crc16 = mod["crc16"] if "crc16" in mod else None
+    if crc16 is None:
+        return None
+    impl = "viper" if mod.get("_crc16_viper") else "python"
+    buf = bytearray(_BLOCK)
+    crc16(buf)  # build tables
+    if hasattr(time, "ticks_us"):
+        t0 = time.ticks_us()
+        for _ in range(blocks):
+            crc16(buf)
+        return time.ticks_diff(time.ticks_us(), t0) / blocks, impl
+    t0 = time.perf_counter()
+    for _ in range(blocks):
+        crc16(buf)
+    return (time.perf_counter() - t0) * 1e6 / blocks, impl
+
+
+def report(rows, title):
+    print(title)
+    print("%-20s %6s %6s %10s %8s %10s %7s %8s" % (
+        "scenario", "ops", "KB", "model ms", "MB/s", "us/op", "calls", "wall ms"))
+    for name, r in rows:
+        if r is None:
+            print("%-20s %s" % (name, "n/a"))
+            continue
+        print("%-20s %6d %6d %10.1f %8.3f %10.1f %7d %8d" % (
+            name, r["ops"], r["kb"], r["ms"], r["mbps"], r["lat_us"], r["calls"], r["wall_ms"]))
+
+
+def main(argv):
+    opts = {"--driver": None, "--n": "256", "--baud": "20000000", "--call-us": "10"}
+    i = 0
+    while i < len(argv):
+        if argv[i] in opts and i + 1 < len(argv):
+            opts[argv[i]] = argv[i + 1]
+            i += 2
+        else:
+            print(__doc__)
+            return
+    rows = run(opts["--driver"], int(opts["--n"]), int(opts["--baud"]), float(opts["--call-us"]))
+    report(rows, "driver=%s baud=%s call_us=%s" % (
+        opts["--driver"] or "lib/sdcard.py", opts["--baud"], opts["--call-us"]))
+    if opts["--driver"] is None:
+        cost = crc_cost()
+        if cost is not None:
+            bus_us = _BLOCK * 8 * 1000000 / int(opts["--baud"])
+            print("crc16 per 512-byte block: %.1f us (%s %s), bus time per block: %.1f us" % (
+                cost[0], sys.implementation.name, cost[1], bus_us))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,529 @@
+"""
+SD card emulator speaking the SD SPI protocol, for host-side testing.
+
+Provides a fake SPI bus and CS pin that can be passed straight to
+lib/sdcard.SDCard, backed by an in-memory bytearray or an image file.
+Runs under CPython or the MicroPython unix port:
+
+    import sd_emu
+    emu = sd_emu.SDCardEmu(sectors=2048)
+    sdcard = sd_emu.load_sdcard(emu=emu)
+    sd = sdcard["SDCard"](emu, emu.cs)
+    sd.readblocks(0, buf)
+    print(emu.stats())
+
+Implemented commands: CMD0/8/9/12/16/17/18/24/25/32/33/38/55/58/59,
+ACMD23/41.
+
+The emulator keeps a virtual bus clock: every SPI call costs call_us
+(interpreter + driver overhead per call on the target) plus 8 bit times
+per byte at the configured baudrate.  Read access delay, the gap between
+CMD18 blocks and write busy time are expressed in that clock, so polling
+strategies are measured the way they behave on the ESP32.  load_sdcard()
+can hand the driver a time module running on the same clock, which makes
+timeouts and sleep_ms() deterministic and host-speed independent.
+
+Data blocks carry a correct CRC16; with CMD59 CRC_ON, command CRC7 and
+write CRC16 are verified.  Bit errors can be injected per block
+(bit_error_rate) or above a given SPI clock (max_baudrate) to exercise
+CRC, retry and clock tuning code.
+"""
+
+import sys
+import time
+
+# MicroPython helpers used by lib/ modules, missing on CPython
+if not hasattr(time, "ticks_ms"):
+    time.ticks_ms = lambda: int(time.monotonic() * 1000)
+    time.ticks_us = lambda: int(time.monotonic() * 1000000)
+    time.ticks_diff = lambda a, b: a - b
+    time.ticks_add = lambda a, b: a + b
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1000000)
+if "micropython" not in sys.modules:
+    try:
+        import micropython  # noqa: F401
+    except ImportError:
+        import types
+
+        micropython = types.ModuleType("micropython")
+        micropython.const = lambda x: x
+        sys.modules["micropython"] = micropython
+
+try:
+    import random
+except ImportError:
+    random = None
+
+_BLOCK = 512
+
+# card states
+_ST_CMD = 0
+_ST_RD_MULTI = 1
+_ST_WR_WAIT = 2      # waiting for a start token
+_ST_WR_DATA = 3      # receiving 512 data + 2 CRC bytes
+
+
+def crc7(buf):
+    crc = 0
+    for b in buf:
+        for _ in range(8):
+            crc <<= 1
+            if (b ^ crc) & 0x80:
+                crc ^= 0x09
+            b <<= 1
+        crc &= 0x7F
+    return crc
+
+
+def crc16(buf):
+    crc = 0
+    for b in buf:
+        crc ^= b << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        crc &= 0xFFFF
+    return crc
+
+
+class _Image:
+    # block storage: bytearray in memory, or a file opened r+b
+    def __init__(self, image, sectors):
+        if image is None:
+            image = bytearray(sectors * _BLOCK)
+        if isinstance(image, str):
+            self.f = open(image, "r+b")
+            self.f.seek(0, 2)
+            self.sectors = self.f.tell() // _BLOCK
+            self.mem = None
+        else:
+            self.f = None
+            self.mem = image
+            self.sectors = len(image) // _BLOCK
+
+    def read(self, n):
+        if self.mem is not None:
+            return bytes(self.mem[n * _BLOCK : (n + 1) * _BLOCK])
+        self.f.seek(n * _BLOCK)
+        return self.f.read(_BLOCK)
+
+    def write(self, n, data):
+        if self.mem is not None:
+            self.mem[n * _BLOCK : (n + 1) * _BLOCK] = data
+        else:
+            self.f.seek(n * _BLOCK)
+            self.f.write(data)
+
+    def fill(self, first, count, value):
+        blank = bytes((value,)) * _BLOCK
+        for n in range(first, first + count):
+            self.write(n, blank)
+
+    def close(self):
+        if self.f:
+            self.f.close()
+
+
+class _CSPin:
+    OUT = 1
+
+    def __init__(self):
+        self.level = 1
+
+    def init(self, mode=None, value=1):
+        self.level = value
+
+    def value(self, v=None):
+        if v is None:
+            return self.level
+        self.level = v
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+
+class VirtualTime:
+    # time module stand-in running on the emulator's bus clock
+    def __init__(self, emu):
+        self.emu = emu
+
+    def ticks_us(self):
+        return int(self.emu.clock_us)
+
+    def ticks_ms(self):
+        return int(self.emu.clock_us // 1000)
+
+    def ticks_diff(self, a, b):
+        return a - b
+
+    def ticks_add(self, a, b):
+        return a + b
+
+    def sleep_us(self, us):
+        self.emu.clock_us += us
+        self.emu.sleep_us += us
+
+    def sleep_ms(self, ms):
+        self.sleep_us(ms * 1000)
+
+    def sleep(self, s):
+        self.sleep_us(s * 1000000)
+
+
+class _TruncBytearray(bytearray):
+    # MicroPython truncates ints stored into a bytearray, CPython raises
+    def __setitem__(self, i, v):
+        if isinstance(i, int):
+            v &= 0xFF
+        bytearray.__setitem__(self, i, v)
+
+
+def load_sdcard(path=None, emu=None):
+    """
+    Load a copy of the sdcard driver (default lib/sdcard.py, or another
+    revision for before/after comparisons) and return its namespace dict.
+    With emu, the driver's time module runs on the emulator's clock.
+    """
+    if path is None:
+        here = __file__.rsplit("/", 1)[0] if "/" in __file__ else "."
+        path = here + "/../lib/sdcard.py"
+    with open(path) as f:
+        src = f.read()
+    ns = {"__name__": "sdcard"}
+    if sys.implementation.name != "micropython":
+        ns["bytearray"] = _TruncBytearray
+    saved = sys.modules.get("time")
+    if emu is not None:
+        sys.modules["time"] = VirtualTime(emu)
+    try:
+        exec(src, ns)
+    finally:
+        if emu is not None:
+            sys.modules["time"] = saved
+    return ns
+
+
+class SDCardEmu:
+    def __init__(self, image=None, sectors=2048, sdhc=True, call_us=10, read_delay_us=100,
+                 block_gap_us=10, write_busy_us=300, erase_busy_us=2000, init_polls=2,
+                 bit_error_rate=0.0, max_baudrate=None):
+        self.img = _Image(image, sectors)
+        self.sdhc = sdhc
+        self.call_us = call_us              # per SPI call overhead on the target
+        self.read_delay_us = read_delay_us  # CMD17/18 -> first data token
+        self.block_gap_us = block_gap_us    # between CMD18 blocks
+        self.write_busy_us = write_busy_us  # programming time per block
+        self.erase_busy_us = erase_busy_us  # CMD38 busy time
+        self.init_polls = init_polls        # ACMD41 polls before leaving idle
+        self.bit_error_rate = bit_error_rate
+        self.max_baudrate = max_baudrate
+        self.baudrate = 100000
+        self.byte_us = 80.0
+        self.clock_us = 0.0
+        self.cs = _CSPin()
+
+        self.crc_on = False
+        self.idle = True
+        self.app_cmd = False
+        self.acmd41_count = 0
+        self.state = _ST_CMD
+        self.frame = bytearray()
+        self.out = bytearray()
+        self.out_i = 0
+        self.pending = None     # data block waiting for its access delay
+        self.ready_at = 0.0
+        self.busy_until = 0.0
+        self.rd_block = 0
+        self.wr_block = 0
+        self.wr_multi = False
+        self.wr_buf = bytearray()
+        self.pre_erase = 0
+        self.erase_start = -1
+        self.erase_end = -1
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.spi_calls = 0
+        self.spi_bytes = 0
+        self.sleep_us = 0
+        self.start_us = self.clock_us
+        self.cmd_counts = {}
+        self.blocks_read = 0
+        self.blocks_written = 0
+        self.blocks_erased = 0
+        self.injected_errors = 0
+        self.crc_errors = 0
+
+    def elapsed_us(self):
+        return self.clock_us - self.start_us
+
+    def stats(self):
+        return {
+            "bus_us": int(self.elapsed_us()),
+            "sleep_us": int(self.sleep_us),
+            "spi_calls": self.spi_calls,
+            "spi_bytes": self.spi_bytes,
+            "blocks_read": self.blocks_read,
+            "blocks_written": self.blocks_written,
+            "blocks_erased": self.blocks_erased,
+            "injected_errors": self.injected_errors,
+            "crc_errors": self.crc_errors,
+            "cmds": dict(self.cmd_counts),
+        }
+
+    def close(self):
+        self.img.close()
+
+    # ---- SPI bus interface (machine.SPI subset used by sdcard.py) ----
+    def init(self, *args, **kw):
+        self.baudrate = kw.get("baudrate", self.baudrate)
+        self.byte_us = 8000000.0 / self.baudrate
+
+    def _call(self, n):
+        self.spi_calls += 1
+        self.spi_bytes += n
+        self.clock_us += self.call_us
+
+    def write(self, buf):
+        self._call(len(buf))
+        xchg = self._xchg
+        for b in buf:
+            xchg(b)
+
+    def read(self, n, write=0x00):
+        buf = bytearray(n)
+        self.readinto(buf, write)
+        return bytes(buf)
+
+    def readinto(self, buf, write=0x00):
+        self._call(len(buf))
+        xchg = self._xchg
+        for i in range(len(buf)):
+            buf[i] = xchg(write)
+
+    def write_readinto(self, wbuf, rbuf):
+        self._call(len(wbuf))
+        xchg = self._xchg
+        for i in range(len(wbuf)):
+            rbuf[i] = xchg(wbuf[i])
+
+    # ---- byte-level card model ----
+    def _queue(self, data):
+        if self.out_i >= len(self.out):
+            self.out = bytearray(data)
+            self.out_i = 0
+        else:
+            self.out += data
+
+    def _flush_out(self):
+        self.out = bytearray()
+        self.out_i = 0
+        self.pending = None
+
+    def _xchg(self, b):
+        self.clock_us += self.byte_us
+        if self.cs.level:
+            return 0xFF
+        # MISO byte is decided before MOSI is looked at
+        if self.out_i >= len(self.out):
+            if self.pending is not None:
+                if self.clock_us < self.ready_at:
+                    self._input(b)
+                    return 0xFF
+                self._queue(self.pending)
+                self.pending = None
+            elif self.clock_us < self.busy_until:
+                self._input(b)
+                return 0x00
+            elif self.state == _ST_RD_MULTI and not self.frame and b == 0xFF:
+                self._schedule_block(self.rd_block, self.block_gap_us)
+                self.rd_block += 1
+                self._input(b)
+                return 0xFF
+        if self.out_i < len(self.out):
+            r = self.out[self.out_i]
+            self.out_i += 1
+        else:
+            r = 0xFF
+        self._input(b)
+        return r
+
+    def _input(self, b):
+        st = self.state
+        if st == _ST_WR_WAIT:
+            if b == 0xFE or (self.wr_multi and b == 0xFC):
+                self.state = _ST_WR_DATA
+                self.wr_buf = bytearray()
+            elif self.wr_multi and b == 0xFD:
+                # stop transmission: one byte gap, then busy
+                self._queue(b"\xff")
+                self.busy_until = self.clock_us + self.write_busy_us / 4
+                self.state = _ST_CMD
+            elif b != 0xFF and (b & 0xC0) == 0x40:
+                self.state = _ST_CMD
+                self.frame = bytearray([b])
+            return
+        if st == _ST_WR_DATA:
+            self.wr_buf.append(b)
+            if len(self.wr_buf) == _BLOCK + 2:
+                self._write_done()
+            return
+
+        # command frames (also interrupt a CMD18 stream)
+        if self.frame:
+            self.frame.append(b)
+            if len(self.frame) == 6:
+                frame = self.frame
+                self.frame = bytearray()
+                self._command(frame)
+        elif b != 0xFF and (b & 0xC0) == 0x40:
+            if st == _ST_RD_MULTI:
+                self._flush_out()
+            self.frame = bytearray([b])
+
+    def _schedule_block(self, n, delay_us):
+        self.pending = self._data_block(n)
+        self.ready_at = self.clock_us + delay_us
+
+    def _data_block(self, n):
+        if n >= self.img.sectors:
+            return b"\x08"  # data error token: out of range
+        data = bytearray(self.img.read(n))
+        crc = crc16(data)
+        if self._inject():
+            data[(n * 7) % _BLOCK] ^= 0x10
+            self.injected_errors += 1
+        self.blocks_read += 1
+        return b"\xfe" + data + bytes((crc >> 8, crc & 0xFF))
+
+    def _inject(self):
+        if self.max_baudrate and self.baudrate > self.max_baudrate:
+            return True
+        if self.bit_error_rate and random is not None:
+            return random.random() < self.bit_error_rate
+        return False
+
+    def _write_done(self):
+        data = bytes(self.wr_buf[:_BLOCK])
+        crc = self.wr_buf[_BLOCK] << 8 | self.wr_buf[_BLOCK + 1]
+        self.state = _ST_WR_WAIT if self.wr_multi else _ST_CMD
+        if self.crc_on and crc != crc16(data):
+            self.crc_errors += 1
+            self._queue(b"\xeb")  # data rejected, CRC error
+            return
+        if self.wr_block >= self.img.sectors:
+            self._queue(b"\xed")  # data rejected, write error
+            return
+        self.img.write(self.wr_block, data)
+        self.blocks_written += 1
+        self.wr_block += 1
+        self._queue(b"\xe5")  # data accepted
+        self.busy_until = self.clock_us + self.write_busy_us
+
+    def _r1(self, extra=b"", flags=0):
+        self._queue(b"\xff" + bytes((flags | (1 if self.idle else 0),)) + extra)
+
+    def _addr(self, arg):
+        return arg if self.sdhc else arg // _BLOCK
+
+    def _csd(self):
+        csd = bytearray(16)
+        if self.sdhc:
+            c_size = self.img.sectors // 1024 - 1
+            csd[0] = 0x40
+            csd[7] = (c_size >> 16) & 0x3F
+            csd[8] = (c_size >> 8) & 0xFF
+            csd[9] = c_size & 0xFF
+        else:
+            # READ_BL_LEN=9, C_SIZE_MULT=7: sectors = (C_SIZE + 1) * 512
+            c_size = self.img.sectors // 512 - 1
+            csd[5] = 9
+            csd[6] = (c_size >> 10) & 0x03
+            csd[7] = (c_size >> 2) & 0xFF
+            csd[8] = (c_size & 0x03) << 6
+            csd[9] = 0x03
+            csd[10] = 0x80
+        return csd
+
+    def _command(self, frame):
+        cmd = frame[0] & 0x3F
+        arg = frame[1] << 24 | frame[2] << 16 | frame[3] << 8 | frame[4]
+        app = self.app_cmd
+        self.app_cmd = False
+        key = ("A" if app else "") + "CMD%d" % cmd
+        self.cmd_counts[key] = self.cmd_counts.get(key, 0) + 1
+
+        if self.state == _ST_RD_MULTI and cmd != 12:
+            self.state = _ST_CMD
+        crc_ok = cmd in (0, 8) or not self.crc_on or (frame[5] >> 1) == crc7(frame[:5])
+        if cmd == 0:
+            self.idle = True
+            self.crc_on = False
+            self.acmd41_count = 0
+            self.state = _ST_CMD
+            self._r1()
+            return
+        if not crc_ok:
+            self._r1(flags=0x08)  # COM_CRC_ERROR
+            return
+
+        if cmd == 8:
+            self._r1(bytes((0, 0, (arg >> 8) & 0x0F, arg & 0xFF)))
+        elif cmd == 55:
+            self.app_cmd = True
+            self._r1()
+        elif app and cmd == 41:
+            self.acmd41_count += 1
+            if self.acmd41_count > self.init_polls:
+                self.idle = False
+            self._r1()
+        elif app and cmd == 23:
+            self.pre_erase = arg & 0x7FFFFF
+            self._r1()
+        elif cmd == 58:
+            ocr0 = 0x80 | (0x40 if self.sdhc and not self.idle else 0)
+            self._r1(bytes((ocr0, 0xFF, 0x80, 0x00)))
+        elif cmd == 59:
+            self.crc_on = bool(arg & 1)
+            self._r1()
+        elif cmd == 9:
+            csd = self._csd()
+            crc = crc16(csd)
+            self._r1(b"\xff\xfe" + csd + bytes((crc >> 8, crc & 0xFF)))
+        elif cmd == 16:
+            self._r1(flags=0 if arg == _BLOCK else 0x40)
+        elif cmd == 17:
+            self._r1()
+            self._schedule_block(self._addr(arg), self.read_delay_us)
+        elif cmd == 18:
+            self._r1()
+            self.rd_block = self._addr(arg) + 1
+            self._schedule_block(self._addr(arg), self.read_delay_us)
+            self.state = _ST_RD_MULTI
+        elif cmd == 12:
+            self.state = _ST_CMD
+            self._r1()
+        elif cmd == 32:
+            self.erase_start = self._addr(arg)
+            self._r1()
+        elif cmd == 33:
+            self.erase_end = self._addr(arg)
+            self._r1()
+        elif cmd == 38:
+            first, last = self.erase_start, self.erase_end
+            if first < 0 or last < first or last >= self.img.sectors:
+                self._r1(flags=0x10)  # ERASE_SEQ_ERROR
+            else:
+                self.img.fill(first, last - first + 1, 0xFF)
+                self.blocks_erased += last - first + 1
+                self._r1()
+                self.busy_until = self.clock_us + self.erase_busy_us
+            self.erase_start = self.erase_end = -1
+        elif cmd in (24, 25):
+            self.wr_block = self._addr(arg)
+            self.wr_multi = cmd == 25
+            self._r1()
+            self.state = _ST_WR_WAIT
+        else:
+            self._r1(flags=0x04)  # ILLEGAL_COMMAND